@@ -1,2 +1,5 @@
-from .column import CoreColumn
+from .column import CoreColumn, CoreColumnBuilder
+from .composite import CompositeCoreColumn
+from .catalog import CoreCatalog
 from .segmenter import CoreSegmenter
+from .stack import WellStack
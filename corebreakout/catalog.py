@@ -0,0 +1,323 @@
+"""
+Catalog of saved ``CoreColumn`` files across many wells, with depth range queries.
+
+The catalog is built by reading only the headers of saved columns (on a thread pool),
+and stores each column's well, name, location, format, depth range and image shape.
+Depth range queries use an ``IntervalIndex``, and return ``ColumnHandle``s that load
+only the requested interval of each matching column.
+"""
+import os
+import json
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+import dill
+import numpy as np
+
+from corebreakout.column import CoreColumn
+from corebreakout.storage import HDF5Column, load_container, read_header
+
+
+# Saved column formats, in order of preference when a column is saved in several of them
+# (lossy '.cbt' tiles are only used if there is no other format)
+FORMATS = ["cbc", "h5", "npy", "pkl", "cbt"]
+
+# File name suffix of each format (following ``CoreColumn.save``)
+SUFFIXES = {"cbc": ".cbc", "h5": ".h5", "npy": "_image.npy", "pkl": ".pkl", "cbt": ".cbt"}
+
+
+class IntervalIndex:
+    """Static index of closed intervals `[starts[i], stops[i]]` for overlap queries.
+
+    Intervals are sorted by start, along with the running maximum of their stops, so the
+    candidates for a query are found with two binary searches and then filtered.
+    """
+
+    def __init__(self, starts, stops):
+        starts, stops = np.asarray(starts, dtype=float), np.asarray(stops, dtype=float)
+        assert starts.shape == stops.shape, "Must have a stop for each start"
+
+        self.order = np.argsort(starts, kind="stable")
+        self.starts, self.stops = starts[self.order], stops[self.order]
+        self.max_stops = np.maximum.accumulate(self.stops) if self.stops.size else self.stops
+
+    def __len__(self):
+        return self.starts.size
+
+    def overlapping(self, start, stop):
+        """Indices (in original order) of all intervals that overlap `[start, stop]`."""
+        lo = np.searchsorted(self.max_stops, start, side="left")
+        hi = np.searchsorted(self.starts, stop, side="right")
+
+        candidates = np.arange(lo, max(lo, hi))
+        hits = candidates[self.stops[candidates] >= start]
+        return np.sort(self.order[hits])
+
+
+class CatalogEntry:
+    """Header information of one saved column.
+
+    Attributes
+    ----------
+    well, name : str
+        Well the column belongs to, and the stem it was saved with.
+    path : Path
+        Directory the column was saved to.
+    fmt : str
+        Format that the column is read from, one of `FORMATS`.
+    top, base : float
+        Depth range of the column.
+    shape : tuple(int)
+        Shape of the column image.
+    dtype : str
+        Dtype of the column image.
+    mtime : float
+        Modification time of the file the header was read from.
+    """
+
+    FIELDS = ["well", "name", "path", "fmt", "top", "base", "shape", "dtype", "mtime"]
+
+    def __init__(self, well, name, path, fmt, top, base, shape, dtype, mtime):
+        self.well, self.name, self.path, self.fmt = well, name, Path(path), fmt
+        self.top, self.base = float(top), float(base)
+        self.shape, self.dtype = tuple(int(s) for s in shape), str(dtype)
+        self.mtime = float(mtime)
+
+    @property
+    def fpath(self):
+        """The file that the column is read from."""
+        return self.path / (self.name + SUFFIXES[self.fmt])
+
+    @classmethod
+    def read(cls, well, path, name, fmt):
+        """Read the header of column `name` saved in `path` as `fmt`."""
+        path = Path(path)
+        fpath = path / (name + SUFFIXES[fmt])
+
+        if fmt in ("cbc", "cbt"):
+            header = read_header(fpath)
+            top, base = header["top"], header["base"]
+            shape, dtype = header["shape"], header["dtype"]
+
+        elif fmt == "h5":
+            with HDF5Column(fpath) as stored:
+                top, base = stored.top, stored.base
+                shape, dtype = stored.img.shape, stored.img.dtype
+
+        elif fmt == "npy":
+            img = np.load(fpath, mmap_mode="r")
+            shape, dtype = img.shape, img.dtype
+            header_path = path / (name + "_header.json")
+            if header_path.is_file():
+                with open(header_path, "r") as f:
+                    header = json.load(f)
+                top, base = header["top"], header["base"]
+            else:
+                # saved without a header, `top` and `base` default to the end depths
+                depths = np.load(path / (name + "_depths.npy"), mmap_mode="r")
+                top, base = float(depths[0]), float(depths[-1])
+
+        else:
+            with open(fpath, "rb") as f:
+                column = dill.load(f)
+            top, base, shape, dtype = column.top, column.base, column.img.shape, column.img.dtype
+
+        dtype, mtime = np.dtype(dtype).str, os.path.getmtime(fpath)
+        return cls(well, name, path, fmt, top, base, shape, dtype, mtime)
+
+    def load(self, top=None, base=None):
+        """Load the column, or only its interval between `top` and `base`.
+
+        '.cbc' and '.h5' columns read only the blocks/chunks overlapping the interval,
+        '.npy' columns are memory-mapped, and pickles have to be loaded in full.
+        """
+        if top is not None or base is not None:
+            top = max(self.top, top) if top is not None else self.top
+            base = min(self.base, base) if base is not None else self.base
+
+        if self.fmt in ("cbc", "cbt"):
+            # `load_container` reads lazy `TiledImage`s from '.cbt' files
+            return load_container(self.fpath, top=top, base=base)
+
+        if self.fmt == "h5":
+            with HDF5Column(self.fpath) as stored:
+                return stored.slice_depth(top, base) if top is not None else stored.load()
+
+        mmap_mode = "r" if self.fmt == "npy" else None
+        column = CoreColumn.load(self.path, self.name, mmap_mode=mmap_mode)
+        return column.slice_depth(top, base) if top is not None else column
+
+    def to_dict(self):
+        record = {field: getattr(self, field) for field in self.FIELDS}
+        record["path"], record["shape"] = str(self.path), list(self.shape)
+        return record
+
+    def __repr__(self):
+        return (
+            f"CatalogEntry({self.well}/{self.name}.{self.fmt}, "
+            f"(top, base)=({self.top:.3f}, {self.base:.3f}), shape={self.shape})"
+        )
+
+
+class ColumnHandle:
+    """Lazy handle to the interval `[top, base]` of a cataloged column, returned by queries."""
+
+    def __init__(self, entry, top, base):
+        self.entry = entry
+        self.top, self.base = max(entry.top, top), min(entry.base, base)
+
+    @property
+    def well(self):
+        return self.entry.well
+
+    def load(self):
+        """Load the ``CoreColumn`` sliced to this handle's interval."""
+        return self.entry.load(self.top, self.base)
+
+    def __repr__(self):
+        entry = self.entry
+        return f"ColumnHandle({entry.well}/{entry.name}, ({self.top:.3f}, {self.base:.3f}))"
+
+
+class CoreCatalog:
+    """Index of saved ``CoreColumn``s by well, depth range, shape and location.
+
+    Parameters
+    ----------
+    roots : list(str or Path), optional
+        Directories to (recursively) search for saved columns on ``update``.
+    well_fn : callable, optional
+        Function of `(path, name)` giving the well of the column `name` saved in directory
+        `path`. Default=None uses the name of `path`. It is not saved with the catalog,
+        so pass it again to ``load`` if needed for later ``update``s.
+    entries : list(CatalogEntry), optional
+        Initial entries.
+    """
+
+    def __init__(self, roots=(), well_fn=None, entries=()):
+        self.roots = [Path(r) for r in roots]
+        self.well_fn = well_fn or (lambda path, name: Path(path).name)
+        self.entries = list(entries)
+        self._index = None
+
+    @classmethod
+    def scan(cls, roots, well_fn=None, n_jobs=None):
+        """Catalog all columns saved below `roots`, reading headers on `n_jobs` threads."""
+        roots = [roots] if isinstance(roots, (str, Path)) else roots
+        catalog = cls(roots, well_fn=well_fn)
+        catalog.update(n_jobs=n_jobs)
+        return catalog
+
+    def _find(self):
+        """Get `{(path, name): fmt}` of every column saved below `roots`, in its preferred format."""
+        found = {}
+        for root in self.roots:
+            for fmt in reversed(FORMATS):
+                for fpath in Path(root).rglob("*" + SUFFIXES[fmt]):
+                    name = fpath.name[:-len(SUFFIXES[fmt])]
+                    if fmt == "npy" and not (fpath.parent / (name + "_depths.npy")).is_file():
+                        continue
+                    found[(fpath.parent, name)] = fmt
+        return found
+
+    def update(self, n_jobs=None):
+        """Re-scan `roots`, reading headers only of new or modified columns.
+
+        Entries of columns that no longer exist are removed.
+
+        Returns
+        -------
+        added, removed : int
+            Number of entries (re-)read and removed.
+        """
+        found = self._find()
+        current = {(e.path, e.name): e for e in self.entries}
+
+        def is_stale(key, fmt):
+            entry = current.get(key)
+            if entry is None or entry.fmt != fmt:
+                return True
+            return os.path.getmtime(entry.fpath) != entry.mtime
+
+        stale = [(key, fmt) for key, fmt in found.items() if is_stale(key, fmt)]
+        def read(item):
+            (path, name), fmt = item
+            return CatalogEntry.read(self.well_fn(path, name), path, name, fmt)
+
+        with ThreadPoolExecutor(max_workers=n_jobs or os.cpu_count()) as pool:
+            new_entries = list(pool.map(read, stale))
+
+        removed = [key for key in current if key not in found]
+        for entry in new_entries:
+            current[(entry.path, entry.name)] = entry
+        for key in removed:
+            current.pop(key)
+
+        self.entries = sorted(current.values(), key=lambda e: (e.well, e.top, e.name))
+        self._index = None
+
+        return len(new_entries), len(removed)
+
+    @property
+    def wells(self):
+        """Sorted list of unique wells."""
+        return sorted(set(e.well for e in self.entries))
+
+    @property
+    def index(self):
+        """``IntervalIndex`` of entry depth ranges (rebuilt after updates)."""
+        if self._index is None:
+            tops, bases = [e.top for e in self.entries], [e.base for e in self.entries]
+            self._index = IntervalIndex(tops, bases)
+        return self._index
+
+    def __len__(self):
+        return len(self.entries)
+
+    def query(self, top, base, wells=None):
+        """Get ``ColumnHandle``s for the intervals of all columns that overlap `(top, base)`.
+
+        Parameters
+        ----------
+        top, base : float
+            Depth range to query.
+        wells : str or iterable of str, optional
+            Only include columns from these wells, default=None includes all wells.
+
+        Returns
+        -------
+        handles : list(ColumnHandle)
+            Sorted by well and top depth.
+        """
+        assert base > top, "Query boundaries must maintain depth order."
+        if isinstance(wells, str):
+            wells = [wells]
+        wells = None if wells is None else set(wells)
+
+        entries = [self.entries[i] for i in self.index.overlapping(top, base)]
+
+        # skip columns that only touch the query range at one depth (nothing to slice)
+        return [
+            ColumnHandle(e, top, base) for e in entries
+            if (wells is None or e.well in wells) and min(e.base, base) > max(e.top, top)
+        ]
+
+    def save(self, fpath):
+        """Save the catalog (roots and entries) as JSON."""
+        data = {
+            "roots": [str(r) for r in self.roots],
+            "entries": [e.to_dict() for e in self.entries],
+        }
+        with open(fpath, "w") as f:
+            json.dump(data, f)
+
+    @classmethod
+    def load(cls, fpath, well_fn=None):
+        """Load a catalog saved with ``save`` (call ``update`` to pick up any changes)."""
+        with open(fpath, "r") as f:
+            data = json.load(f)
+        entries = [CatalogEntry(**record) for record in data["entries"]]
+        return cls(data["roots"], well_fn=well_fn, entries=entries)
+
+    def __repr__(self):
+        return f"CoreCatalog with {len(self.entries)} columns from {len(self.wells)} wells"
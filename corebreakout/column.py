@@ -2,17 +2,38 @@
 CoreColumn abstraction representing depth-registered single-column images of core material.
 """
 
+import os
+import json
+import hashlib
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 import dill
 import numpy as np
+from PIL import Image
 from matplotlib import ticker
 import matplotlib.pyplot as plt
 
-from corebreakout import utils, defaults
+from corebreakout import utils, defaults, resampling, quantization, features
+from corebreakout.depthaxis import DepthAxis
+from corebreakout.fingerprint import ColumnFingerprint, DEFAULT_CHUNK_ROWS as FINGERPRINT_CHUNK_ROWS
+from corebreakout.gaps import GappedImage
+from corebreakout.labels import LabelTrack
+from corebreakout.pyramid import ImagePyramid
+from corebreakout.ragged import RaggedImage
 from corebreakout.viz import make_depth_ticks
 
 
+# Number of image rows copied per block when writing '.npy' files
+SAVE_BLOCK_ROWS = 4096
+
+# Max rows per exported image strip (JPEG dimensions are limited to 2^16 - 1)
+STRIP_MAX_ROWS = 65000
+
+# Image file extensions for `CoreColumn.export_strips`, keyed by `fmt`
+STRIP_FORMATS = {"jpeg": ".jpeg", "png": ".png", "tiff": ".tiff"}
+
+
 class CoreColumn:
     """Container for depth-registered, single-column images of core material.
 
@@ -20,6 +41,27 @@ class CoreColumn:
     and padding the width of the narrower of ``(LHS.img, RHS.img)`` with zeros if necessary.
 
     Either ``depths`` array or scalar ``top`` and ``base`` values must be provided to constructor.
+
+    When built from ``top`` and ``base`` (or from a ``DepthAxis``), depths are kept as analytic
+    uniform runs and only materialized as an array when ``depths`` is first accessed.
+    Derived depth metadata (``dd``, ``is_uniform``) is cached until ``depths`` is reassigned.
+    A content ``fingerprint`` (used by ``==``, ``diff`` and ``cache_key``) is cached and
+    pickled with the column until ``img`` or ``depths`` is reassigned. NOTE: modifying `img`
+    in place does not reset cached values, so reassign it (or ``refresh=True``) after doing so.
+
+    Columns can be stored in a compact ``quantize``d form, where `img` holds uint8/uint16/float16
+    codes of the values ``img * scale + offset`` (see ``quant``), and ``values`` gives
+    lazily dequantized rows. Slicing, resampling, concatenation and saving keep this form.
+
+    Masked columns can also store `img` as a ``RaggedImage`` (see ``to_ragged``), which packs
+    only the valid pixel extent of each row, and materializes dense rows when indexed.
+
+    Columns concatenated in 'fill' mode store `img` as a ``GappedImage``, which records the
+    ``gaps`` between the source columns as row intervals, instead of allocating zero rows.
+
+    Named categorical ``labels`` (e.g., lithology or facies) are stored as depth-registered
+    ``LabelTrack`` intervals, which are kept through slicing, resampling and concatenation.
+    Per-row label arrays are only computed by ``row_labels``.
     """
 
     def __init__(
@@ -28,9 +70,9 @@ class CoreColumn:
         """
         Parameters
         ----------
-        img : array
+        img : array or RaggedImage
             2D (grayscale) or 3D (RGB) image array representing a single column of core material
-        depths : array, optional
+        depths : array or DepthAxis, optional
             1D array of depths with `size=img.shape[0]` (one value for each row).
             If not provided, depths will be evenly spaced between `top` and `base`.
         top : array, optional
@@ -43,10 +85,12 @@ class CoreColumn:
         add_mode : one of {'fill', 'collapse'}, optional
             How to add to this column. Both methods enforce depth ordering (LHS.base <= RHS.top):
                 - 'fill' is the default. Fills any depth gap with zero image and interpolated depths.
+                  The zero rows are not stored (see ``gaps``), only synthesized when read.
                 - 'collapse' will simply concatenate `img` and `depths` arrays.
             Default is 'fill'.
         """
         self.img = img  # img.setter called
+        self._labels = {}
 
         depths_given, top_given, base_given = (
             depths is not None,
@@ -61,7 +105,7 @@ class CoreColumn:
         if not depths_given:
             self.top, self.base = top, base
             #eps = (base - top) / (2 * self.height)
-            self.depths = np.linspace(top, base, num=self.height)
+            self.depths = DepthAxis.uniform(top, base, self.height)
 
         elif not (top_given and base_given):
             self.depths = depths
@@ -71,14 +115,50 @@ class CoreColumn:
         else:
             self.top, self.base, self.depths = top, base, depths
 
+        # `depths` are monotonic (checked by setter), so only the ends need checking
+        first_depth, last_depth = self._edge_depths()
         assert self.base > self.top, "`top` and `base` must be depth ordered"
-        assert np.all(self.depths >= self.top), "no `depths` can be above `top`"
-        assert np.all(self.depths <= self.base), "no `depths` can be below `base`"
+        assert first_depth >= self.top, "no `depths` can be above `top`"
+        assert last_depth <= self.base, "no `depths` can be below `base`"
 
         # settings for column addition
         self.add_mode = add_mode
         self.add_tol = add_tol or 2 * self.dd
 
+    @classmethod
+    def _trusted(cls, img, depths, top, base, add_tol, add_mode):
+        """Construct without any validation, for internal callers with already-valid arguments.
+
+        `img` must be 3D, and `depths` (array or ``DepthAxis``), `top`, `base`, `add_tol` and
+        `add_mode` must satisfy all of the checks that the constructor and setters would perform.
+        """
+        column = cls.__new__(cls)
+        column._img = img
+        column._pyramid, column._quant, column._labels = None, None, {}
+        column.height, column.width, column.channels = img.shape
+        column._set_depths(depths)
+        column.top, column.base = top, base
+        column._add_tol, column._add_mode = add_tol, add_mode
+        return column
+
+    def __getstate__(self):
+        # analytic depths are re-materialized on demand rather than pickled
+        state = self.__dict__.copy()
+        if state.get("_depth_axis") is not None:
+            state["_depths"] = None
+        state["_meta"] = {}
+        return state
+
+    def __setstate__(self, state):
+        # columns pickled before `DepthAxis` only have a `_depths` array
+        state.setdefault("_depth_axis", None)
+        state.setdefault("_meta", {})
+        state.setdefault("_pyramid", None)
+        state.setdefault("_fingerprint", None)
+        state.setdefault("_quant", None)
+        state.setdefault("_labels", {})
+        self.__dict__.update(state)
+
     @property
     def img(self):
         return self._img
@@ -92,18 +172,80 @@ class CoreColumn:
         else:
             raise ValueError("`img` array must have 2 or 3 dimensions.")
 
+        self._pyramid, self._fingerprint, self._quant = None, None, None
         self.height, self.width, self.channels = self._img.shape
 
+    @property
+    def is_ragged(self):
+        """Whether `img` is stored as a ``RaggedImage``."""
+        return isinstance(self._img, RaggedImage)
+
+    @property
+    def is_gapped(self):
+        """Whether `img` is stored as a ``GappedImage`` (with unstored 'fill' gap rows)."""
+        return isinstance(self._img, GappedImage)
+
+    @property
+    def gaps(self):
+        """`(num_gaps, 2)` row intervals `[start, stop)` of the 'fill' gaps in `img`."""
+        if self.is_gapped:
+            return self._img.gaps
+        return np.zeros((0, 2), dtype=np.int64)
+
+    def is_gap(self, start, stop):
+        """Whether rows `start:stop` are all in a 'fill' gap (checked without reading `img`)."""
+        return self.is_gapped and self._img.is_gap(start, stop)
+
+    @property
+    def quant(self):
+        """`(scale, offset)` of a quantized `img` (values = img * scale + offset), or None."""
+        return self._quant
+
+    @property
+    def is_quantized(self):
+        return self._quant is not None
+
+    @property
+    def values(self):
+        """Image values: `img` itself, or a lazily dequantized view of it if quantized."""
+        if self._quant is None:
+            return self.img
+        return quantization.DequantizedRows(self.img, *self._quant)
+
     @property
     def depths(self):
+        if self._depths is None:
+            self._depths = self._depth_axis.values
         return self._depths
 
     @depths.setter
     def depths(self, arr):
-        assert type(arr) is np.ndarray and arr.ndim == 1, "`depths` must be 1D array"
-        assert arr.size == self.height, "length of `depths` must match image height"
-        assert np.all(np.diff(arr) >= 0), "`depths` must be monotonic"
-        self._depths = arr
+        if isinstance(arr, DepthAxis):
+            assert arr.size == self.height, "length of `depths` must match image height"
+        else:
+            assert isinstance(arr, np.ndarray) and arr.ndim == 1, "`depths` must be 1D array"
+            assert arr.size == self.height, "length of `depths` must match image height"
+            assert np.all(arr[1:] >= arr[:-1]), "`depths` must be monotonic"
+        self._set_depths(arr)
+
+    def _set_depths(self, arr):
+        """Assign (already validated) `depths` array or ``DepthAxis``, and reset cached metadata."""
+        if isinstance(arr, DepthAxis):
+            self._depth_axis, self._depths = arr, None
+        else:
+            self._depth_axis, self._depths = None, arr
+        self._meta, self._fingerprint, self._pyramid = {}, None, None
+
+    def _edge_depths(self):
+        """First and last values of `depths`, without materializing an analytic axis."""
+        if self._depth_axis is not None:
+            return self._depth_axis[0], self._depth_axis[-1]
+        return self._depths[0], self._depths[-1]
+
+    @property
+    def depth_axis(self):
+        """The ``DepthAxis`` of analytic `depths`, or None if `depths` is a plain array."""
+        return self._depth_axis
 
     @property
     def depth_range(self):
@@ -112,8 +254,23 @@ class CoreColumn:
 
     @property
     def dd(self):
-        """Median gap between adjacent ``depths``."""
-        return np.median(np.diff(self.depths))
+        """Median gap between adjacent ``depths`` (cached)."""
+        if "dd" not in self._meta:
+            if self._depth_axis is not None:
+                self._meta["dd"] = self._depth_axis.median_step()
+            else:
+                self._meta["dd"] = np.median(np.diff(self._depths))
+        return self._meta["dd"]
+
+    @property
+    def is_uniform(self):
+        """Whether ``depths`` are evenly spaced, to within floating point tolerance (cached)."""
+        if "is_uniform" not in self._meta:
+            if self._depth_axis is not None:
+                self._meta["is_uniform"] = self._depth_axis.is_uniform
+            else:
+                self._meta["is_uniform"] = bool(np.allclose(np.diff(self._depths), self.dd))
+        return self._meta["is_uniform"]
 
     @property
     def add_tol(self):
@@ -135,9 +292,24 @@ class CoreColumn:
         self._add_mode = mode
 
 
-    def slice_depth(self, top=None, base=None):
+    def slice_depth(self, top=None, base=None, copy=False):
         """Get a sliced CoreColumn between `top` and `base`,
         if it would have an effect and it is possible to do so.
+
+        Row bounds are found with a binary search of the (monotonic) `depths`, and by
+        default the new column's `img` and `depths` are views into this column's arrays.
+
+        Parameters
+        ----------
+        top, base : float, optional
+            Depth boundaries of the slice, default to `self.top` and `self.base`.
+        copy : bool, optional
+            If True, return a column that owns copies of the sliced arrays, default=False.
+
+        Raises
+        ------
+        ValueError
+            If no row depths lie between `top` and `base`.
         """
         top = top or self.top
         base = base or self.base
@@ -150,21 +322,282 @@ class CoreColumn:
         if [top, base] != [self.top, self.base] and (
             top > self.top or base < self.base
         ):
-            idxs = np.logical_and(self.depths >= top, self.depths <= base)
-            # self.img = self.img[idxs]
-            # self.depths = self.depths[idxs]
-            # self.top, self.base = top, base
-            return CoreColumn(
-                self.img[idxs, ...],
-                depths=self.depths[idxs],
-                top=top,
-                base=base,
-                add_mode=self.add_mode,
-                add_tol=self.add_tol,
-            )
+            start, stop = self.rows_between(top, base)
+            if stop <= start:
+                raise ValueError(f"No row depths between {top} and {base}, cannot slice.")
         else:
-            return self
+            if not copy:
+                return self
+            start, stop, top, base = 0, self.height, self.top, self.base
+
+        # lazy images (ragged, gapped, or `storage.TiledImage`) are sliced without reading rows
+        if hasattr(self.img, "slice_rows"):
+            img = self.img.slice_rows(start, stop)
+        else:
+            img = self.img[start:stop]
+        if self._depth_axis is not None:
+            depths = self._depth_axis[start:stop]
+        else:
+            depths = self.depths[start:stop]
+
+        if copy and self.is_ragged:
+            img = RaggedImage(img.values.copy(), img.starts, img.stops, img.shape[1])
+        elif copy and self.is_gapped:
+            img = GappedImage(np.array(img.values), img.gaps, img.fill_value)
+        elif copy:
+            img = np.array(img)
+        if copy:
+            depths = depths if isinstance(depths, DepthAxis) else depths.copy()
+
+        # A contiguous slice of sorted `depths` between `top` and `base` is already valid
+        column = CoreColumn._trusted(img, depths, top, base, self.add_tol, self.add_mode)
+        column._quant = self._quant
+        column._labels = {name: track.slice(top, base) for name, track in self._labels.items()}
+        return column
+
+    def rows_between(self, top, base):
+        """Get the `(start, stop)` row range with `top <= depths <= base`, via binary search."""
+        start = int(self._searchsorted(top, side="left"))
+        stop = int(self._searchsorted(base, side="right"))
+        return start, max(start, stop)
+
+    def _searchsorted(self, v, side="left"):
+        """``np.searchsorted(self.depths, v, side)``, computed analytically when possible."""
+        if self._depth_axis is not None:
+            return self._depth_axis.searchsorted(v, side=side)
+        return np.searchsorted(self._depths, v, side=side)
+
+    def rows_at(self, depths):
+        """Fractional row positions of `depths`, linearly interpolated between rows.
+
+        Uses a binary search of `depths` (computed directly for analytic depths, so each
+        lookup is O(1) for a uniform column). Depths outside of the column give NaN.
+
+        Parameters
+        ----------
+        depths : float or array
+            Depth value(s) to locate.
+
+        Returns
+        -------
+        rows : float or array
+            Fractional row index of each depth, same shape as input.
+        """
+        v = np.asarray(depths, dtype=float)
+
+        idx = np.clip(self._searchsorted(v, side="right") - 1, 0, max(self.height - 2, 0))
+        d0, d1 = self._depths_at_index(idx), self._depths_at_index(idx + 1)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            frac = np.where(d1 > d0, (v - d0) / (d1 - d0), 0.0)
+
+        first_depth, last_depth = self._edge_depths()
+        rows = np.where((v < first_depth) | (v > last_depth), np.nan, idx + frac)
+
+        return rows if rows.ndim else float(rows)
+
+    def depths_at(self, rows):
+        """Depths at fractional `rows`, linearly interpolated between rows.
+
+        Rows outside of ``[0, height-1]`` give NaN.
+
+        Parameters
+        ----------
+        rows : float or array
+            (Fractional) row index(es) to get depths of.
+
+        Returns
+        -------
+        depths : float or array
+            Interpolated depth of each row, same shape as input.
+        """
+        r = np.asarray(rows, dtype=float)
+
+        idx = np.clip(np.floor(np.nan_to_num(r)).astype(int), 0, max(self.height - 2, 0))
+        d0, d1 = self._depths_at_index(idx), self._depths_at_index(idx + 1)
+
+        depths = np.where((r < 0) | (r > self.height - 1), np.nan, d0 + (r - idx) * (d1 - d0))
+
+        return depths if depths.ndim else float(depths)
+
+    def _depths_at_index(self, idxs):
+        """Depths at integer row `idxs` (clipped to the last row), without materializing."""
+        idxs = np.minimum(idxs, self.height - 1)
+        if self._depth_axis is not None and self._depths is None:
+            return self._depth_axis.value_at(idxs)
+        return self.depths[idxs]
+
+    def _depths_between(self, start, stop):
+        """Array of `depths[start:stop]`, without materializing the rest of an analytic axis."""
+        if self._depth_axis is not None and self._depths is None:
+            return self._depth_axis.value_at(np.arange(start, min(stop, self.height)))
+        return self.depths[start:stop]
+
 
+    def resample(
+        self,
+        dd=None,
+        depths=None,
+        method="linear",
+        block_rows=resampling.DEFAULT_BLOCK_ROWS,
+        n_jobs=None,
+    ):
+        """Get a new CoreColumn resampled to a uniform `dd`, or to an explicit `depths` grid.
+
+        Rows are computed in blocks of `block_rows` on a thread pool, and each block only
+        reads the source rows it needs (see ``corebreakout.resampling.resample_into``).
+
+        Parameters
+        ----------
+        dd : float, optional
+            Depth spacing of a uniform grid starting at the first row of `depths`.
+        depths : array or DepthAxis, optional
+            Explicit (monotonic) depths to resample to. Exactly one of `dd` or `depths` is required.
+        method : one of {'linear', 'area'}, optional
+            Row interpolation or area-averaging, default='linear'.
+        block_rows : int, optional
+            Number of output rows per block, default=`resampling.DEFAULT_BLOCK_ROWS`.
+        n_jobs : int, optional
+            Number of worker threads, default=None uses `os.cpu_count()`.
+        """
+        assert (dd is None) != (depths is None), "Must specify exactly one of `dd` or `depths`"
+
+        if dd is not None:
+            grid = resampling.uniform_grid(*self._edge_depths(), dd)
+        else:
+            grid = depths if isinstance(depths, DepthAxis) else np.asarray(depths, dtype=float)
+
+        out = np.empty((len(grid), self.width, self.channels), dtype=self.img.dtype)
+        resampling.resample_into(
+            self, grid, out, method=method, block_rows=block_rows, n_jobs=n_jobs
+        )
+
+        first_depth, last_depth = grid[0], grid[-1]
+
+        column = CoreColumn(
+            out,
+            depths=grid,
+            top=min(self.top, first_depth),
+            base=max(self.base, last_depth),
+            add_tol=self.add_tol,
+            add_mode=self.add_mode,
+        )
+        # interpolation commutes with the affine dequantization, so codes can be resampled
+        column._quant = self._quant
+        column._labels = dict(self._labels)
+        return column
+
+    def quantize(
+        self,
+        dtype="uint8",
+        scale=None,
+        offset=None,
+        block_rows=quantization.DEFAULT_BLOCK_ROWS,
+        out=None,
+    ):
+        """Get a new column with `img` stored as compact `dtype` codes, converted in row blocks.
+
+        Parameters
+        ----------
+        dtype : one of {'uint8', 'uint16', 'float16'}, optional
+            Dtype of the stored codes, default='uint8'.
+        scale, offset : float, optional
+            Code to value mapping (values = codes * scale + offset). Default=None chooses them
+            from the image's value range (found in an extra blockwise pass): integer codes span
+            `(min, max)`, and float16 codes are only scaled if values would overflow.
+        block_rows : int, optional
+            Number of rows converted at a time, default=`quantization.DEFAULT_BLOCK_ROWS`.
+        out : array, optional
+            Array to write codes into (e.g., from ``np.lib.format.open_memmap``), with the shape
+            of `img` and `dtype`. Default=None allocates one in memory.
+        """
+        assert dtype in quantization.DTYPES, f"{dtype} not in {quantization.DTYPES}"
+
+        if scale is None or offset is None:
+            default_scale, default_offset = quantization.quant_params(
+                quantization.value_range(self.values, block_rows), dtype
+            )
+            scale = default_scale if scale is None else scale
+            offset = default_offset if offset is None else offset
+        assert scale > 0, "`scale` must be positive"
+
+        if out is None:
+            out = np.empty(self.img.shape, dtype=dtype)
+        assert out.shape == self.img.shape and out.dtype == np.dtype(dtype), "Invalid `out` array"
+
+        quantization.quantize_into(self.values, out, scale, offset, block_rows)
+
+        column = self._with_img(out)
+        column._quant = (float(scale), float(offset))
+        return column
+
+    def dequantize(
+        self, dtype=quantization.VALUES_DTYPE, block_rows=quantization.DEFAULT_BLOCK_ROWS
+    ):
+        """Get a new column with `img` values as `dtype` (a copy, if not quantized)."""
+        img = np.empty(self.img.shape, dtype=dtype)
+        values = self.values
+        for i in range(0, self.height, block_rows):
+            img[i:i+block_rows] = values[i:i+block_rows]
+
+        column = self._with_img(img)
+        column._quant = None
+        return column
+
+    def to_ragged(self, mask=None, block_rows=SAVE_BLOCK_ROWS):
+        """Get a new column with `img` packed as a ``RaggedImage``, reading `block_rows` at a time.
+
+        Each row keeps the extent of its nonzero pixels, or of the True pixels of a 2D `mask`
+        (e.g., the column mask from segmentation). Any `quant` is kept.
+        """
+        img = self.img if self.is_ragged else RaggedImage.from_dense(self.img, mask, block_rows)
+        return self._with_img(img)
+
+    def to_dense(self, block_rows=SAVE_BLOCK_ROWS):
+        """Get a new column with a dense `img` array (zeros outside of any ragged row extents,
+        and the zero value in any 'fill' gaps)."""
+        if not (self.is_ragged or self.is_gapped):
+            return self._with_img(self.img)
+
+        img = np.empty(self.img.shape, dtype=self.img.dtype)
+        for i in range(0, self.height, block_rows):
+            img[i:i+block_rows] = self.img[i:i+block_rows]
+        return self._with_img(img)
+
+    def row_features(
+        self,
+        names=features.DEFAULT_FEATURES,
+        bins=16,
+        value_range=None,
+        block_rows=features.DEFAULT_BLOCK_ROWS,
+        n_jobs=None,
+        fpath=None,
+    ):
+        """Compute per-row features (e.g., mean RGB) of non-zero pixels, streaming in row blocks.
+
+        See ``corebreakout.features.row_features`` for the available feature `names` and other
+        parameters. If `fpath` is given, the features are also saved to that '.npz' or '.parquet'
+        file (see ``features.save_features``).
+
+        Returns
+        -------
+        features : dict
+            Of feature arrays, plus the `'depth'` of each row.
+        """
+        result = features.row_features(
+            self, names, bins=bins, value_range=value_range, block_rows=block_rows, n_jobs=n_jobs
+        )
+        if fpath is not None:
+            features.save_features(result, fpath)
+        return result
+
+    def _with_img(self, img):
+        """New column with the same depths, settings, `quant` and `labels`, but a different `img`."""
+        depths = self._depth_axis if self._depth_axis is not None else self.depths
+        column = CoreColumn._trusted(img, depths, self.top, self.base, self.add_tol, self.add_mode)
+        column._quant = self._quant
+        column._labels = dict(self._labels)
+        return column
 
     def __repr__(self):
         return (
@@ -175,10 +608,50 @@ class CoreColumn:
         )
 
 
+    def fingerprint(self, chunk_rows=FINGERPRINT_CHUNK_ROWS, n_jobs=None, refresh=False):
+        """Get the (cached) ``ColumnFingerprint`` of `img` and `depths` in `chunk_rows` chunks.
+
+        Chunks are hashed on `n_jobs` threads, reading one chunk at a time. Computed on first use,
+        and recomputed if `chunk_rows` changes or `refresh=True`.
+        """
+        fp = self._fingerprint
+        if refresh or fp is None or fp.chunk_rows != chunk_rows:
+            self._fingerprint = ColumnFingerprint.compute(self, chunk_rows, n_jobs=n_jobs)
+        return self._fingerprint
+
+    def cache_key(self):
+        """Hex string identifying the column's content, depths, `top`/`base` and add options."""
+        params = (float(self.top), float(self.base), float(self.add_tol), self.add_mode, self._quant)
+        key = repr(params) + self.fingerprint().digest
+        return hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _changed_chunks(self, other):
+        """Row ranges of fingerprint chunks that may differ between same-height `self` and `other`.
+
+        Uses cached fingerprints if both have them (all rows are candidates otherwise).
+        """
+        fp, other_fp = self._fingerprint, getattr(other, "_fingerprint", None)
+
+        if fp is None or other_fp is None or not fp.is_comparable(other_fp):
+            chunk_rows = fp.chunk_rows if fp is not None else FINGERPRINT_CHUNK_ROWS
+            return [(i, min(i + chunk_rows, self.height)) for i in range(0, self.height, chunk_rows)]
+
+        changed = np.flatnonzero(fp.changed_chunks(other_fp))
+        return [fp.chunk_bounds(i) for i in changed]
+
+    def _rows_close(self, other, start, stop):
+        """Boolean array, True where rows `start:stop` of `self` and `other` are `np.isclose`."""
+        depths_close = np.isclose(
+            self._depths_between(start, stop), other._depths_between(start, stop)
+        )
+        img_close = np.isclose(self.img[start:stop], other.img[start:stop])
+        return depths_close & img_close.all(axis=(1, 2))
+
     def __eq__(self, other):
         """Equivalence testing. Includes add options.
 
-        Uses np.isclose/allclose because of floating point errors.
+        Uses np.isclose/allclose because of floating point errors. Values are only compared
+        chunk by chunk, and chunks with identical cached ``fingerprint`` hashes are skipped.
         """
         if self.add_mode != other.add_mode:
             return False
@@ -190,34 +663,195 @@ class CoreColumn:
         if not np.isclose(self.base, other.base):
             return False
 
-        if (self.height != other.height):
+        if (self.img.shape != other.img.shape):
             return False
 
-        if not np.allclose(self.depths, other.depths):
+        quant, other_quant = self._quant, getattr(other, "_quant", None)
+        if (quant is None) != (other_quant is None):
             return False
-        if not np.allclose(self.img, other.img):
+        if quant is not None and not np.allclose(quant, other_quant):
             return False
 
+        for start, stop in self._changed_chunks(other):
+            if not self._rows_close(other, start, stop).all():
+                return False
+
         return True
 
+    def diff(self, other, fingerprint=True):
+        """Find the depth intervals where the rows of `self` and `other` differ.
+
+        Rows differ if their image or depth values are not all `np.isclose`.
+
+        Parameters
+        ----------
+        other : CoreColumn
+            Column to compare to, e.g., a reprocessed version of `self`.
+        fingerprint : bool, optional
+            Whether to compute (and cache) both fingerprints first, so that only chunks
+            with different hashes are read and compared, default=True.
 
-    def iter_chunks(self, chunk_size, depths=True, step_size=None):
+        Returns
+        -------
+        intervals : list(tuple(float))
+            `(top, base)` depths (from `self`) of each run of differing rows. If the columns
+            do not have the same image shape, a single interval covering both columns.
+        """
+        if self.img.shape != other.img.shape:
+            return [(min(self.top, other.top), max(self.base, other.base))]
+
+        if fingerprint:
+            other.fingerprint(self.fingerprint().chunk_rows)
+
+        differs = np.zeros(self.height, dtype=bool)
+        for start, stop in self._changed_chunks(other):
+            differs[start:stop] = ~self._rows_close(other, start, stop)
+
+        # runs of differing rows
+        edges = np.diff(np.concatenate([[0], differs.view(np.int8), [0]]))
+        starts, stops = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+        return [
+            (float(self._depths_at_index(a)), float(self._depths_at_index(b - 1)))
+            for a, b in zip(starts, stops)
+        ]
+
+    def iter_chunks(self, chunk_size, depths=True, step_size=None, pad=False, skip_gaps=False):
         """Generate data in `chunk_size` pieces, starting `step_size` apart.
 
         If `depths`, yields `(img, depths)` of each chunk, else just `img`
 
-        TODO: make this able to fill partial last chunks.
+        If `pad`, partial chunks at the end are zero-padded to `chunk_size` rows, and
+        their depths are extrapolated by `dd`. Otherwise, they are yielded as is.
+        If `skip_gaps`, chunks entirely inside a 'fill' gap (see ``gaps``) are not yielded.
+        For batched (and shuffled, prefetched) chunks, see ``corebreakout.loader.ChunkLoader``.
         """
         step_size = step_size or chunk_size
 
         i = 0
         while i  < self.height:
+            if skip_gaps and self.is_gap(i, i+chunk_size):
+                i += step_size
+                continue
+
+            img = self.img[i:i+chunk_size]
+            chunk_depths = self._depths_between(i, i+chunk_size) if depths else None
+
+            if pad and img.shape[0] < chunk_size:
+                img, chunk_depths = self._pad_chunk(img, chunk_depths, chunk_size)
+
             if depths:
-                yield self.img[i:i+chunk_size], self.depths[i:i+chunk_size]
+                yield img, chunk_depths
             else:
-                yield self.img[i:i+chunk_size]
+                yield img
             i += step_size
 
+    def depth_windows(self, length, step=None):
+        """Compute the row bounds of depth windows `length` long, starting every `step`.
+
+        Windows are half-open depth intervals ``[top, top + length)``, starting from `self.top`,
+        and only windows that fit entirely above `self.base` are included. All bounds are found
+        in a single vectorized search, so they can be split deterministically between workers.
+
+        Returns
+        -------
+        tops, starts, stops : arrays
+            Top depth, first row, and stop row (exclusive) of each window.
+        """
+        step = step or length
+        assert length > 0 and step > 0, "`length` and `step` must be positive"
+
+        num = max(int(np.floor((self.base - self.top - length) / step + 1e-9)) + 1, 0)
+        tops = self.top + step * np.arange(num)
+
+        starts = np.asarray(self._searchsorted(tops, side="left"), dtype=int)
+        stops = np.asarray(self._searchsorted(tops + length, side="left"), dtype=int)
+
+        return tops, starts, stops
+
+    def iter_depth_windows(
+        self, length, step=None, depths=True, num_rows=None, method="linear", shard=None
+    ):
+        """Generate data in depth windows `length` long, starting `step` apart (depth units).
+
+        If `depths`, yields `(img, depths)` of each window, else just `img`.
+
+        Parameters
+        ----------
+        length, step : float
+            Window length and spacing, in depth units. See ``depth_windows``.
+        num_rows : int, optional
+            If given, resample each window to exactly `num_rows` rows, evenly spaced from
+            the window top (see ``resample``). Otherwise, yield views of `img` and `depths`.
+        method : one of {'linear', 'area'}, optional
+            Resampling method used if `num_rows` is given, default='linear'.
+        shard : tuple(int), optional
+            `(index, count)` to yield only every `count`-th window starting from `index`,
+            e.g., to split windows between `count` worker processes.
+        """
+        tops, starts, stops = self.depth_windows(length, step)
+
+        if shard is not None:
+            index, count = shard
+            assert 0 <= index < count, f"Invalid `shard` {shard}"
+            windows = range(index, tops.size, count)
+        else:
+            windows = range(tops.size)
+
+        for i in windows:
+            if num_rows:
+                grid = np.linspace(tops[i], tops[i] + length, num=num_rows, endpoint=False)
+                img = np.empty((num_rows, self.width, self.channels), dtype=self.img.dtype)
+                resampling.resample_into(self, grid, img, method=method, n_jobs=1)
+            else:
+                img = self.img[starts[i]:stops[i]]
+                grid = self._depths_between(starts[i], stops[i]) if depths else None
+
+            if depths:
+                yield img, grid
+            else:
+                yield img
+
+    def _pad_chunk(self, img, depths, chunk_size):
+        """Zero-pad a partial chunk to `chunk_size` rows, extrapolating any `depths` by `dd`."""
+        num_pad = chunk_size - img.shape[0]
+        img = np.concatenate([img, np.zeros((num_pad,) + img.shape[1:], dtype=img.dtype)])
+
+        if depths is not None:
+            extra = depths[-1] + self.dd * np.arange(1, num_pad + 1)
+            depths = np.concatenate([depths, extra])
+
+        return img, depths
+
+    ###++++++++++++++++###
+    ###  Label Tracks  ###
+    ###++++++++++++++++###
+
+    @property
+    def labels(self):
+        """Dict of named ``LabelTrack``s (e.g., 'lithology') attached to this column."""
+        return self._labels
+
+    def add_labels(self, name, labels):
+        """Attach `labels` as track `name`, replacing any existing track with that name.
+
+        Parameters
+        ----------
+        name : str
+            Name of the track.
+        labels : LabelTrack or array
+            A ``LabelTrack``, or one label per row (run-length encoded with ``LabelTrack.from_rows``).
+        """
+        if not isinstance(labels, LabelTrack):
+            assert len(labels) == self.height, "Must give a `LabelTrack` or one label per row"
+            labels = LabelTrack.from_rows(labels, self.depths)
+        self._labels[name] = labels
+
+    def row_labels(self, name, fill="", dtype=None):
+        """Dense array of track `name` labels at each row depth, with `fill` for unlabeled rows."""
+        return self._labels[name].labels_at(self.depths, fill=fill, dtype=dtype)
+
+
     ###++++++++++++++++++++###
     ### Column Combination ###
     ###++++++++++++++++++++###
@@ -229,54 +863,41 @@ class CoreColumn:
                 - If `add_mode` is 'fill', a zero image + interpolated depths are added b/t LHS & RHS.
             - `LHS.top`, `RHS.base` and `LHS.add_mode` are passed through to new instance
             - `add_tol` is propagated by `max(LHS.add_tol, RHS.add_tol)`.
+
+        Neither operand is modified. To combine more than two columns, use ``CoreColumn.concat``.
         """
-        depth_diff = other.top - self.base
-        print(self.depth_range, " + ", other.depth_range, " gap: ", depth_diff)
+        return CoreColumn.concat([self, other])
 
-        if depth_diff < 0:
-            raise UserWarning(f"Cant add shallower {other} below deeper {self}!")
+    @staticmethod
+    def concat(columns):
+        """Concatenate a depth-ordered sequence of `columns` into a single new CoreColumn.
 
-        elif depth_diff > self.add_tol:
-            raise UserWarning(
-                f"Gap of {depth_diff} greater than `LHS.add_tol`: {self.add_tol}!"
-            )
+        All gaps are validated up front, and every column is written into a single preallocated
+        image buffer. Fill rows are only recorded as ``gaps`` of a ``GappedImage`` (unless the
+        columns are all ragged).
 
-        # If 'fill' mode, extend `self.img` and `self.depths` to fill any gap
-        if self.add_mode is "fill":
-            fill_dd = (self.dd + other.dd) / 2
-            # Note: have to call int() for cases of 0.0
-            fill_rows = int(depth_diff // fill_dd)
+        NOTE: the fill resolution for each gap is the mean `dd` of the two columns adjacent to it.
+        For two columns this matches ``LHS + RHS``. Chained ``reduce(add, columns)`` instead uses
+        the `dd` of everything accumulated so far on the left. So with three or more columns of
+        different `dd`, the fill row counts and depths can differ from ``reduce(add, columns)``.
+        """
+        return CoreColumnBuilder(columns).build()
 
-            if fill_rows > 0:
-                fill_depths = np.linspace(
-                    self.depths[-1] + fill_dd, other.depths[0] - fill_dd, num=fill_rows
-                )
-                fill_img = np.zeros(
-                    (fill_rows, self.width, self.channels), dtype=self.img.dtype
-                )
-
-                # NOTE: could use temp var here to avoid modifying `self`
-                # Doesn't seem too important + obvious ways of doing that
-                # result in writing these funcs multiple (3?) times
-                self.img = utils.vstack_images(self.img, fill_img)
-                self.depths = np.concatenate([self.depths, fill_depths])
-
-        return CoreColumn(
-            utils.vstack_images(self.img, other.img),
-            depths=np.concatenate([self.depths, other.depths]),
-            top=self.top,
-            base=other.base,
-            add_tol=max(self.add_tol, other.add_tol),
-            add_mode=self.add_mode,
-        )
 
     ###+++++++++++++++###
     ### Save and Load ###
     ###+++++++++++++++###
 
-    def save(self, path, name=None, pickle=True, image=False, depths=False):
+    def save(
+        self, path, name=None, pickle=True, image=False, depths=False, hdf5=False, container=False,
+        tiles=False
+    ):
         """Save the CoreColumn (or parts of it) to directory `path`.
 
+        Arrays saved as '.npy' files are always written C-contiguous, in blocks of
+        `SAVE_BLOCK_ROWS` rows, so that they can be memory-mapped by `load` and
+        a memory-mapped column can be re-saved without reading it all into RAM.
+
         Parameters
         ----------
         path : str or Path
@@ -287,10 +908,26 @@ class CoreColumn:
             Whether to pickle the entire object with `dill`, default=True.
         image : bool, optional
             Whether to save the image as '.npy' file, default=False.
+            If an image pyramid has been built (see `pyramid`), it is saved as '<name>_pyramid.npz'
+            (otherwise, any existing '<name>_pyramid.npz' is removed).
+            The `quant` of a quantized image is saved as '<name>_quant.json',
+            and any `labels` tracks as '<name>_labels.json'.
+            A ``RaggedImage`` is saved in packed form as '<name>_ragged.npz' instead.
+            A ``GappedImage`` is written densely (block by block), with its gap rows synthesized.
         depths : bool, optional
-            Whether to save the depths as a '.npy' file, default=False
+            Whether to save the depths as a '.npy' file, default=False. The `top`, `base`,
+            `add_tol` and `add_mode` are saved with them as '<name>_header.json'.
+        hdf5 : bool, optional
+            Whether to save a chunked, compressed, depth-indexed '.h5' file, default=False.
+            See `corebreakout.storage.hdf5` for the layout and lazy `HDF5Column` reader.
+        container : bool, optional
+            Whether to save a block-compressed '.cbc' container file, plus its '.cbc.json'
+            header sidecar, default=False. See `corebreakout.storage.container`.
+        tiles : bool, optional
+            Whether to save a lossy, JPEG-tiled '.cbt' file (uint8 images only), plus its
+            '.cbt.json' header sidecar, default=False. See `corebreakout.storage.tiles`.
         """
-        assert pickle or image or depths, "Must save something."
+        assert pickle or image or depths or hdf5 or container or tiles, "Must save something."
 
         path = Path(path)
         assert path.exists() and path.is_dir(), f"Save location {path} doesnt exist."
@@ -303,52 +940,271 @@ class CoreColumn:
         if pickle:
             with open(path / (name + ".pkl"), "wb") as pfile:
                 dill.dump(self, pfile)
+        if image and self.is_ragged:
+            self.img.save(path / (name + "_ragged.npz"))
+        elif image:
+            save_npy(path / (name + "_image.npy"), self.img)
         if image:
-            np.save((path / (name + "_image.npy")), self.img)
+            pyramid_path = path / (name + "_pyramid.npz")
+            if self._pyramid is not None:
+                self._pyramid.save(pyramid_path)
+            elif pyramid_path.is_file():
+                # a pyramid left by an earlier save would not match this image
+                pyramid_path.unlink()
+            if self._quant is not None:
+                with open(path / (name + "_quant.json"), "w") as f:
+                    json.dump({"scale": self._quant[0], "offset": self._quant[1]}, f)
+            if self._labels:
+                with open(path / (name + "_labels.json"), "w") as f:
+                    json.dump({k: track.to_dict() for k, track in self._labels.items()}, f)
         if depths:
-            np.save((path / (name + "_depths.npy")), self.depths)
+            save_npy(path / (name + "_depths.npy"), self.depths)
+            with open(path / (name + "_header.json"), "w") as f:
+                json.dump({
+                    "top": float(self.top), "base": float(self.base),
+                    "add_tol": float(self.add_tol), "add_mode": self.add_mode,
+                }, f)
+        if hdf5:
+            from corebreakout.storage import hdf5 as h5store
+            h5store.save_hdf5(self, path / (name + ".h5"))
+        if container:
+            from corebreakout.storage import container as cbc
+            cbc.save_container(self, path / (name + ".cbc"))
+        if tiles:
+            from corebreakout.storage import tiles as cbt
+            cbt.save_tiles(self, path / (name + ".cbt"))
 
 
     @classmethod
-    def load(cls, path, name, **kwargs):
+    def load(cls, path, name, mmap_mode=None, header_only=False, **kwargs):
         """Load a CoreColumn instance from directory `path`.
 
-        If '<name>.pkl' exists, will just load from that file.
+        If '<name>.pkl' exists (and `mmap_mode` is None), will just load from that file.
+        Next, if '<name>.cbc' or '<name>.h5' exists (and `mmap_mode` is None), will read the
+        whole column from that file. Use `corebreakout.storage.HDF5Column` for lazy,
+        depth-indexed reads of '.h5' files, or `storage.load_container(top=, base=)` for '.cbc'.
 
-        Otherwise, at least '<name>_image.npy' must exist. If '<name>_depths.npy'
-        also exists, those will be read as `depths`. If not, the user must pass
-        either `depths` or `top` & `base` as **kwargs.
+        If only a lossy '<name>.cbt' tiles file exists, the column is returned with a lazy
+        `storage.TiledImage` (see `storage.load_tiles` for cache and read-ahead options).
+
+        Otherwise, at least '<name>_image.npy' (or '<name>_ragged.npz') must exist.
+        If '<name>_depths.npy' also exists, those will be read as `depths`, along with the `top`,
+        `base`, `add_tol` and `add_mode` of a saved '<name>_header.json' (unless given as
+        **kwargs). If not, the user must pass either `depths` or `top` & `base` as **kwargs.
+        A saved '<name>_pyramid.npz' is attached to the loaded column (if its shape and depths
+        match the loaded image and depths), so that `plot` doesn't need to rebuild it,
+        a saved '<name>_quant.json' marks the loaded image as quantized, and label tracks are
+        read from a saved '<name>_labels.json'.
+
+        Parameters
+        ----------
+        mmap_mode : one of {None, 'r', 'r+', 'c'}, optional
+            If given, memory-map the '.npy' files instead of reading them (see `np.load`).
+            `img` and `depths` are then backed by the files on disk, and only the rows
+            touched by e.g. `slice_depth`, `iter_chunks` or `plot` are paged in.
+            Requires '<name>_image.npy', since a pickle cannot be memory-mapped.
+        header_only : bool, optional
+            If True, return only the header dict of '<name>.cbc' (read from its sidecar if
+            present), without reading any image data. Default=False.
         """
         path = Path(path)
         assert path.exists() and path.is_dir(), f"Load location {path} doesnt exist."
+        assert mmap_mode in (None, "r", "r+", "c"), f"{mmap_mode} not a valid `mmap_mode`"
 
         pickle_path = path / (name + ".pkl")
         image_path = path / (name + "_image.npy")
         depths_path = path / (name + "_depths.npy")
+        hdf5_path = path / (name + ".h5")
+        container_path = path / (name + ".cbc")
+
+        if header_only:
+            from corebreakout.storage import container as cbc
+            return cbc.read_header(container_path)
 
-        if pickle_path.is_file():
+        if pickle_path.is_file() and mmap_mode is None:
             with open(pickle_path, 'rb') as pickle_file:
                 return dill.load(pickle_file)
 
-        assert image_path.is_file(), "_image.npy file must exist if pickle doesnt."
-        img = np.load(image_path)
+        if container_path.is_file() and mmap_mode is None:
+            from corebreakout.storage import container as cbc
+            return cbc.load_container(container_path)
+
+        if hdf5_path.is_file() and mmap_mode is None:
+            from corebreakout.storage import HDF5Column
+            with HDF5Column(hdf5_path) as stored:
+                return stored.load()
+
+        ragged_path = path / (name + "_ragged.npz")
+        tiles_path = path / (name + ".cbt")
+        if tiles_path.is_file() and not (image_path.is_file() or ragged_path.is_file()):
+            from corebreakout.storage import tiles as cbt
+            return cbt.load_tiles(tiles_path)
+
+        if ragged_path.is_file() and not image_path.is_file():
+            img = RaggedImage.load(ragged_path)
+        else:
+            assert image_path.is_file(), "_image.npy file must exist if pickle doesnt."
+            img = np.load(image_path, mmap_mode=mmap_mode)
 
         if depths_path.is_file():
-            kwargs["depths"] = np.load(depths_path)
+            kwargs["depths"] = np.load(depths_path, mmap_mode=mmap_mode)
+            header_path = path / (name + "_header.json")
+            if header_path.is_file():
+                with open(header_path, "r") as f:
+                    for key, value in json.load(f).items():
+                        kwargs.setdefault(key, value)
         else:
             assert (
                 "top" in kwargs.keys() and "base" in kwargs.keys()
             ), "Depth info needed."
 
-        return cls(img, **kwargs)
+        column = cls(img, **kwargs)
+
+        quant_path = path / (name + "_quant.json")
+        if quant_path.is_file():
+            with open(quant_path, "r") as f:
+                quant = json.load(f)
+            column._quant = (quant["scale"], quant["offset"])
+
+        pyramid_path = path / (name + "_pyramid.npz")
+        if pyramid_path.is_file():
+            pyramid = ImagePyramid.load(pyramid_path)
+            if column._pyramid_matches(pyramid):
+                column._pyramid = pyramid
+
+        labels_path = path / (name + "_labels.json")
+        if labels_path.is_file():
+            with open(labels_path, "r") as f:
+                tracks = json.load(f)
+            column._labels = {k: LabelTrack.from_dict(track) for k, track in tracks.items()}
+
+        return column
+
+    def export_strips(
+        self, path, max_rows=STRIP_MAX_ROWS, fmt="jpeg", quality=100, depths=False, n_jobs=None
+    ):
+        """Export the image as consecutive strips of at most `max_rows` rows (e.g., for labeling).
+
+        Strips are named '<top>_<base>.<fmt>' after their first and last row depths (to 0.1),
+        and are read and encoded on a thread pool, so only `n_jobs` strips are held in memory
+        at a time and a memory-mapped `img` is never read in full. A 'manifest.json' file
+        records the row and depth range of every strip.
+
+        Parameters
+        ----------
+        path : str or Path
+            Directory to write to (created if it doesn't exist).
+        max_rows : int, optional
+            Max number of rows in each strip, default=`STRIP_MAX_ROWS`.
+        fmt : one of {'jpeg', 'png', 'tiff'}, optional
+            Image format of the strips, default='jpeg'.
+        quality : int, optional
+            JPEG quality (1-100), default=100. Ignored for other formats.
+        depths : bool, optional
+            Whether to also save each strip's depths as '<top>_<base>_depth.npy', default=False.
+        n_jobs : int, optional
+            Number of worker threads, default=None uses `os.cpu_count()`.
+
+        Returns
+        -------
+        manifest : dict
+            Contents of the 'manifest.json' file.
+        """
+        assert fmt in STRIP_FORMATS, f"{fmt} not a valid `fmt`, must be in {list(STRIP_FORMATS)}"
+        assert max_rows > 0, "`max_rows` must be positive"
+        if fmt == "jpeg":
+            assert max_rows < 2**16 and self.width < 2**16, "JPEG dimensions must be < 2^16"
+
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+
+        def export(start):
+            stop = min(start + max_rows, self.height)
+            strip_depths = self._depths_between(start, stop)
+            stem = "{:.1f}_{:.1f}".format(strip_depths[0], strip_depths[-1])
+
+            _save_strip(path / (stem + STRIP_FORMATS[fmt]), self.img[start:stop], fmt, quality)
+            if depths:
+                np.save(path / (stem + "_depth.npy"), strip_depths)
+
+            return {
+                "file": stem + STRIP_FORMATS[fmt],
+                "start_row": start,
+                "stop_row": stop,
+                "top_depth": float(strip_depths[0]),
+                "base_depth": float(strip_depths[-1]),
+            }
+
+        with ThreadPoolExecutor(max_workers=n_jobs or os.cpu_count()) as pool:
+            strips = list(pool.map(export, range(0, self.height, max_rows)))
+
+        manifest = {
+            "top": float(self.top),
+            "base": float(self.base),
+            "shape": list(self.img.shape),
+            "format": fmt,
+            "max_rows": max_rows,
+            "strips": strips,
+        }
+        with open(path / "manifest.json", "w") as f:
+            json.dump(manifest, f, indent=4)
+
+        return manifest
 
     ###+++++++++++++++++++###
     ###  Column Plotting  ###
     ###+++++++++++++++++++###
 
-    def plot(self, figsize=(15, 50), tick_kwargs={}, major_kwargs={}, minor_kwargs={}):
+    def pyramid(self, **kwargs):
+        """Get the column's ``ImagePyramid``, building it (in row blocks) on first use.
+
+        The pyramid is discarded whenever `img` is reassigned. A quantized column's pyramid is
+        built from its (dequantized) `values`. **kwargs are passed to ``ImagePyramid.build``
+        and only take effect when the pyramid is (re)built.
+        """
+        if self._pyramid is None or kwargs:
+            self._pyramid = ImagePyramid.build(self.values, self.depths, **kwargs)
+        return self._pyramid
+
+    def _pyramid_matches(self, pyramid):
+        """Whether the first level of `pyramid` matches this column's shape, dtype and depths."""
+        if len(pyramid) == 0:
+            return True
+
+        factor = pyramid.factors[0]
+        num_rows = -(-self.height // factor)
+        if pyramid.imgs[0].shape[:2] != (num_rows, -(-self.width // factor)):
+            return False
+        # e.g., a pyramid of the codes (rather than values) of a quantized image
+        if pyramid.imgs[0].dtype != self.values.dtype:
+            return False
+
+        # level depths are means of `factor` rows, with the last row repeated to fill the last one
+        first = self._depths_between(0, factor)
+        last = self._depths_between((num_rows - 1) * factor, self.height)
+        last_mean = (last.sum() + (num_rows * factor - self.height) * last[-1]) / factor
+        return bool(np.allclose(
+            [pyramid.depths[0][0], pyramid.depths[0][-1]], [first.mean(), last_mean]
+        ))
+
+    def plot(
+        self,
+        figsize=(15, 50),
+        tick_kwargs={},
+        major_kwargs={},
+        minor_kwargs={},
+        top=None,
+        base=None,
+        dpi=None,
+        pyramid=True,
+    ):
         """Make an image figure with major and minor depth ticks.
 
+        Only the rows between `top` and `base` are read. If there are many more of them than
+        the figure has vertical pixels, the image is drawn from the coarsest ``ImagePyramid``
+        level that still has at least one row per pixel, instead of at full resolution.
+        A quantized column is plotted from its (dequantized) `values`.
+
         Parameters
         ----------
         figsize : tuple(int)
@@ -359,6 +1215,13 @@ class CoreColumn:
             `*_precision` and `*_format_str`. See `viz.make_depth_ticks()`.
         major/minor_kwargs:
             Parameters for tick size and appearance. Passed to `ax.tick_params`.
+        top, base : float, optional
+            Depth interval to plot, default=None plots the whole column.
+        dpi : int, optional
+            Figure DPI, default=None uses `matplotlib.rcParams['figure.dpi']`.
+        pyramid : bool, optional
+            Whether to plot long intervals from a (cached) downsampled pyramid level,
+            default=True. If False, always plots at full resolution.
 
         Returns
         -------
@@ -370,10 +1233,28 @@ class CoreColumn:
         major_kwargs = utils.strict_update(defaults.MAJOR_TICK_PARAMS, major_kwargs)
         minor_kwargs = utils.strict_update(defaults.MINOR_TICK_PARAMS, minor_kwargs)
 
-        fig, ax = plt.subplots(figsize=figsize)
+        start, stop = 0, self.height
+        if top is not None or base is not None:
+            top = self.top if top is None else top
+            base = self.base if base is None else base
+            assert base > top, "Plot boundaries must maintain depth order."
+            start, stop = self.rows_between(top, base)
+            assert stop > start, f"No rows between {top} and {base}"
+
+        # vertical pixels available, with some slack before downsampling kicks in
+        max_rows = figsize[1] * (dpi or plt.rcParams["figure.dpi"])
+
+        factor = 1
+        if pyramid and (stop - start) > 2 * max_rows:
+            factor, img, depths = self.pyramid().select(start, stop, max_rows)
+
+        if factor == 1:
+            img, depths = self.values[start:stop], self._depths_between(start, stop)
+
+        fig, ax = plt.subplots(figsize=figsize, dpi=dpi)
 
         major_ticks, major_locs, minor_ticks, minor_locs = make_depth_ticks(
-            self.depths, **tick_kwargs
+            depths, **tick_kwargs
         )
 
         ax.yaxis.set_major_formatter(ticker.FixedFormatter((major_ticks)))
@@ -388,6 +1269,244 @@ class CoreColumn:
         ax.set_xticks([], [])
         ax.grid(False)
 
-        ax.imshow(self.img)
+        ax.imshow(img)
 
         return fig, ax
+
+
+class CoreColumnBuilder:
+    """Growable, depth-ordered sequence of ``CoreColumn``s to be concatenated.
+
+    Each appended column is checked against the previous one with the same rules as
+    ``CoreColumn.__add__`` (using `add_mode` of the first column, and the running maximum
+    of `add_tol`), and the size of any 'fill' gap is recorded. Nothing is copied until
+    ``build()``, which allocates the output arrays once and writes each piece into them.
+
+    If every column's `img` is a ``RaggedImage``, so is the built column's (with empty fill rows).
+    Otherwise, only the columns' rows are copied, and any fill rows (or gaps of gapped columns)
+    are recorded as the ``gaps`` of a ``GappedImage`` instead of being allocated.
+    If any column is ``quantize``d, the built column is too: with the same `quant` if all columns
+    share it, or else with a `quant` spanning all of their values (re-quantizing in row blocks).
+
+    Parameters
+    ----------
+    columns : iterable of CoreColumn, optional
+        Initial columns to append, in depth order.
+    """
+
+    def __init__(self, columns=()):
+        self.columns = []
+        self.fills = []  # (fill_rows, fill_dd) preceding each column
+        self.add_tol, self.add_mode = None, None
+
+        self.extend(columns)
+
+    def __len__(self):
+        return len(self.columns)
+
+    @property
+    def height(self):
+        """Total number of rows in the built column, including fill rows."""
+        return sum(c.height for c in self.columns) + sum(f[0] for f in self.fills)
+
+    @property
+    def width(self):
+        """Width of the built column (narrower columns are RHS zero-padded)."""
+        return max(c.width for c in self.columns)
+
+    def append(self, column):
+        """Append `column` below the current base. Returns `self`."""
+        if not self.columns:
+            self.add_tol, self.add_mode = column.add_tol, column.add_mode
+            self.columns.append(column)
+            self.fills.append((0, 0.0))
+            return self
+
+        prev = self.columns[-1]
+        assert column.channels == prev.channels, "Cannot add columns with different `channels`"
+
+        depth_diff = column.top - prev.base
+
+        if depth_diff < 0:
+            raise UserWarning(f"Cant add shallower {column} below deeper {prev}!")
+
+        elif depth_diff > self.add_tol:
+            raise UserWarning(
+                f"Gap of {depth_diff} greater than `LHS.add_tol`: {self.add_tol}!"
+            )
+
+        fill_rows, fill_dd = 0, 0.0
+        if self.add_mode == "fill":
+            fill_dd = (prev.dd + column.dd) / 2
+            # Note: have to call int() for cases of 0.0
+            fill_rows = int(depth_diff // fill_dd)
+
+        self.columns.append(column)
+        self.fills.append((fill_rows, fill_dd))
+        self.add_tol = max(self.add_tol, column.add_tol)
+
+        return self
+
+    def extend(self, columns):
+        """Append each of `columns` in order. Returns `self`."""
+        for column in columns:
+            self.append(column)
+        return self
+
+    def build(self):
+        """Allocate and fill the concatenated `img` and `depths`, return new CoreColumn."""
+        assert len(self.columns) > 0, "Must append at least one column to build."
+
+        cols = self.columns
+        img, quant = self._build_img()
+
+        column = CoreColumn(
+            img,
+            depths=self._build_depths(),
+            top=cols[0].top,
+            base=cols[-1].base,
+            add_tol=self.add_tol,
+            add_mode=self.add_mode,
+        )
+        column._quant = quant
+
+        # depth-registered label tracks only need their intervals combined
+        for name in sorted(set(name for c in cols for name in c.labels)):
+            column._labels[name] = LabelTrack.concatenate(
+                [c.labels[name] for c in cols if name in c.labels]
+            )
+        return column
+
+    def _build_img(self):
+        """Get the concatenated image and its `quant`."""
+        cols = self.columns
+        dtype, quant, requantize = self._output_quant()
+        if dtype is None:
+            dtype = np.result_type(*[c.img.dtype for c in cols])
+
+        # ragged images stay packed (if they all are, and share a dtype)
+        if not requantize and all(
+            isinstance(c.img, RaggedImage) and c.img.dtype == dtype for c in cols
+        ):
+            pieces = []
+            for col, (fill_rows, _) in zip(cols, self.fills):
+                pieces.extend([fill_rows, col.img])
+            return RaggedImage.concatenate(pieces, width=self.width), quant
+
+        # fill rows, and the gaps of gapped columns, are kept as row intervals only
+        gaps, row = [], 0
+        for col, (fill_rows, _) in zip(cols, self.fills):
+            gaps.append([row, row + fill_rows])
+            row += fill_rows
+            gaps.extend(col.gaps + row)
+            row += col.height
+
+        packed = [c.img.values if c.is_gapped else c.img for c in cols]
+        num_rows = sum(p.shape[0] for p in packed)
+
+        # `np.zeros` gives zero width-padding without writing it
+        img = np.zeros((num_rows, self.width, cols[0].channels), dtype=dtype)
+
+        # ... unless zero values have a nonzero code
+        fill_value = 0
+        if quant is not None:
+            fill_value = quantization.to_codes(0.0, *quant, dtype)
+            if fill_value != 0:
+                img[:] = fill_value
+
+        row = 0
+        for col, src in zip(cols, packed):
+            if requantize:
+                values = src if col.quant is None else quantization.DequantizedRows(src, *col.quant)
+                quantization.quantize_into(values, img[row:row+src.shape[0]], *quant)
+            else:
+                img[row:row+src.shape[0], :col.width] = src
+            row += src.shape[0]
+
+        if num_rows < self.height:
+            img = GappedImage(img, gaps, fill_value)
+        return img, quant
+
+    def _build_depths(self):
+        """Get the concatenated depths, with interpolated depths in any fill rows."""
+        cols = self.columns
+
+        # keep depths analytic if every column's depths are
+        if all(c.depth_axis is not None for c in cols):
+            axes = []
+            for i, (col, (fill_rows, fill_dd)) in enumerate(zip(cols, self.fills)):
+                if fill_rows > 0:
+                    fill_top = cols[i-1]._edge_depths()[1] + fill_dd
+                    fill_base = col._edge_depths()[0] - fill_dd
+                    # a single fill row sits at `fill_top`, as with `np.linspace(num=1)`
+                    if fill_rows == 1:
+                        fill_base = fill_top
+                    axes.append(DepthAxis.uniform(fill_top, fill_base, fill_rows))
+                axes.append(col.depth_axis)
+            return DepthAxis.concatenate(axes)
+
+        depths = np.empty(self.height, dtype=np.result_type(*[c.depths.dtype for c in cols]))
+
+        row = 0
+        for i, (col, (fill_rows, fill_dd)) in enumerate(zip(cols, self.fills)):
+            if fill_rows > 0:
+                fill_top = cols[i-1]._edge_depths()[1] + fill_dd
+                fill_base = col._edge_depths()[0] - fill_dd
+                depths[row:row+fill_rows] = np.linspace(fill_top, fill_base, num=fill_rows)
+                row += fill_rows
+
+            depths[row:row+col.height] = col.depths
+            row += col.height
+
+        return depths
+
+    def _output_quant(self):
+        """Get the `(dtype, quant, requantize)` of the built image.
+
+        `dtype` and `quant` are None if no column is quantized. `requantize` is True if the
+        columns don't all share the same `quant`, so their values must be converted.
+        """
+        quants = [getattr(c, "quant", None) for c in self.columns]
+        quantized = [c for c, q in zip(self.columns, quants) if q is not None]
+        if not quantized:
+            return None, None, False
+
+        dtype = quantized[0].img.dtype
+        if len(quantized) == len(self.columns) and all(
+            q == quants[0] and c.img.dtype == dtype for c, q in zip(self.columns, quants)
+        ):
+            return dtype, quants[0], False
+
+        # span the values of every column (and zero, if there is any fill or padding)
+        ranges = [
+            quantization.code_range(*c.quant, c.img.dtype) if c.quant is not None
+            else quantization.value_range(c.img)
+            for c in self.columns
+        ]
+        if any(f[0] > 0 for f in self.fills) or len(set(c.width for c in self.columns)) > 1:
+            ranges.append((0.0, 0.0))
+
+        lo, hi = min(r[0] for r in ranges), max(r[1] for r in ranges)
+        return dtype, quantization.quant_params((lo, hi), dtype), True
+
+
+def save_npy(fpath, arr, block_rows=SAVE_BLOCK_ROWS):
+    """Save `arr` to '.npy' file `fpath` as a C-contiguous array, copying `block_rows` at a time.
+
+    Unlike `np.save`, this never makes a full contiguous copy of `arr` in memory,
+    so it is safe to use with memory-mapped or sliced (non-contiguous) arrays.
+    """
+    out = np.lib.format.open_memmap(str(fpath), mode="w+", dtype=arr.dtype, shape=arr.shape)
+
+    for i in range(0, arr.shape[0], block_rows):
+        out[i:i+block_rows] = arr[i:i+block_rows]
+
+    out.flush()
+    del out
+
+
+def _save_strip(fpath, arr, fmt, quality=100):
+    """Encode image `arr` to `fpath` with PIL (which releases the GIL while encoding)."""
+    arr = np.ascontiguousarray(arr[:, :, 0] if arr.shape[2] == 1 else arr)
+    kwargs = {"quality": quality} if fmt == "jpeg" else {}
+    Image.fromarray(arr).save(str(fpath), format=fmt.upper(), **kwargs)
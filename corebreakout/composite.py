@@ -0,0 +1,333 @@
+"""
+Lazy, depth-ordered concatenation of many ``CoreColumn`` segments.
+
+A ``CompositeCoreColumn`` behaves like ``CoreColumn.concat(segments)``, but never
+materializes the stacked image. It keeps an index of each segment's depth range and
+row offsets, and only reads (or loads) the segments that a request actually touches.
+Any 'fill' gaps between segments are synthesized when they are requested.
+Segments must share one `quant` (or none), which is kept along with their label tracks.
+"""
+from pathlib import Path
+
+import numpy as np
+
+from corebreakout import quantization
+from corebreakout.column import CoreColumn, CoreColumnBuilder
+from corebreakout.labels import LabelTrack
+
+
+class ColumnSegment:
+    """A single segment of a ``CompositeCoreColumn``.
+
+    Parameters
+    ----------
+    source : CoreColumn, or str or Path
+        An in-memory column, or the directory of a column saved with ``CoreColumn.save``.
+    name : str, optional
+        Stem of the saved column files. Required if `source` is a directory.
+    **load_kwargs :
+        Passed to ``CoreColumn.load`` (e.g., `top` and `base` for an image-only save).
+
+    Saved columns with an '_image.npy' file are memory-mapped. Pickle-only columns are
+    loaded once to record their metadata, and then re-loaded each time they are needed.
+    """
+
+    def __init__(self, source, name=None, **load_kwargs):
+        self.path, self.name, self.load_kwargs = None, name, load_kwargs
+
+        if isinstance(source, CoreColumn):
+            self._column = source
+        else:
+            assert name is not None, "Must give a `name` for a saved column segment."
+            self.path = Path(source)
+
+            if (self.path / (name + "_image.npy")).is_file():
+                self._column = CoreColumn.load(self.path, name, mmap_mode="r", **load_kwargs)
+            else:
+                self._column = None
+
+        column = self.column()
+
+        self.top, self.base = column.top, column.base
+        self.height, self.width, self.channels = column.img.shape
+        self.dtype = column.img.dtype
+        self.quant, self.labels = column.quant, dict(column.labels)
+        self.dd = column.dd
+        self.add_tol, self.add_mode = column.add_tol, column.add_mode
+        self.first_depth, self.last_depth = column._edge_depths()
+
+    @property
+    def is_loaded(self):
+        """Whether the segment's column is held in memory (or memory-mapped)."""
+        return self._column is not None
+
+    def column(self):
+        """Get the segment's ``CoreColumn``, loading it from disk if necessary."""
+        if self._column is not None:
+            return self._column
+        return CoreColumn.load(self.path, self.name, **self.load_kwargs)
+
+    def __repr__(self):
+        source = "memory" if self.path is None else str(self.path / self.name)
+        return f"ColumnSegment({source}, (top, base)=({self.top:.3f}, {self.base:.3f}))"
+
+
+class CompositeCoreColumn:
+    """Depth-ordered concatenation of ``ColumnSegment``s that is gathered on demand.
+
+    Gaps are validated and 'fill' rows are counted exactly as in ``CoreColumn.concat``,
+    so ``composite.to_column() == CoreColumn.concat(columns)``. Gathered columns keep the
+    segments' `quant` and (combined) `labels` tracks.
+
+    Parameters
+    ----------
+    segments : iterable
+        Of ``ColumnSegment``, ``CoreColumn``, or `(path, name)` tuples, in depth order.
+        Quantized segments must share the same `quant` and dtype (``CoreColumn.concat``
+        re-quantizes mixed segments instead).
+    """
+
+    def __init__(self, segments):
+        self.segments = [self._as_segment(s) for s in segments]
+
+        builder = CoreColumnBuilder(self.segments)
+        self.add_tol, self.add_mode = builder.add_tol, builder.add_mode
+
+        self.top, self.base = self.segments[0].top, self.segments[-1].base
+        self.height, self.width = builder.height, builder.width
+        self.channels = self.segments[0].channels
+        self.dtype = np.result_type(*[s.dtype for s in self.segments])
+
+        self.quant = self.segments[0].quant
+        assert all(s.quant == self.quant for s in self.segments), \
+            "Segments must share one `quant` (or none), use `CoreColumn.concat` to re-quantize"
+        # fill and padding pixels take the code of zero
+        self.fill_value = 0
+        if self.quant is not None:
+            assert all(s.dtype == self.dtype for s in self.segments), \
+                "Quantized segments must have the same dtype"
+            self.fill_value = quantization.to_codes(0.0, *self.quant, self.dtype)
+
+        # depth-registered label tracks only need their intervals combined
+        self.labels = {}
+        for name in sorted(set(name for s in self.segments for name in s.labels)):
+            self.labels[name] = LabelTrack.concatenate(
+                [s.labels[name] for s in self.segments if name in s.labels]
+            )
+
+        # Each piece `i` is `fill_rows[i]` of fill, followed by segment `i`
+        self.fill_rows = np.array([f[0] for f in builder.fills], dtype=int)
+        self.fill_dds = np.array([f[1] for f in builder.fills])
+
+        heights = np.array([s.height for s in self.segments], dtype=int)
+        self.seg_stops = np.cumsum(self.fill_rows + heights)
+        self.seg_starts = self.seg_stops - heights
+        self.piece_starts = self.seg_starts - self.fill_rows
+
+        self.seg_first = np.array([s.first_depth for s in self.segments])
+        self.seg_last = np.array([s.last_depth for s in self.segments])
+
+        # Single-entry cache for segments that have to be loaded from pickles
+        self._cached = (None, None)
+
+    @staticmethod
+    def _as_segment(source):
+        if isinstance(source, ColumnSegment):
+            return source
+        elif isinstance(source, CoreColumn):
+            return ColumnSegment(source)
+        else:
+            path, name = source
+            return ColumnSegment(path, name)
+
+    @property
+    def depth_range(self):
+        """``(self.top, self.base)``"""
+        return (self.top, self.base)
+
+    @property
+    def img(self):
+        """Lazy image array: supports ``shape`` and row indexing, e.g., ``img[a:b]``."""
+        return _CompositeRows(self, "img")
+
+    @property
+    def depths(self):
+        """Lazy depths array: supports ``shape`` and row indexing, e.g., ``depths[a:b]``."""
+        return _CompositeRows(self, "depths")
+
+    def _segment_column(self, i):
+        """Get the column of segment `i`, caching the most recent loaded pickle."""
+        segment = self.segments[i]
+        if segment.is_loaded:
+            return segment.column()
+
+        cached_idx, cached_column = self._cached
+        if cached_idx != i:
+            cached_column = segment.column()
+            self._cached = (i, cached_column)
+
+        return cached_column
+
+    def _fill_depths(self, i):
+        """Synthesize the fill depths preceding segment `i`."""
+        return np.linspace(
+            self.seg_last[i-1] + self.fill_dds[i],
+            self.seg_first[i] - self.fill_dds[i],
+            num=self.fill_rows[i],
+        )
+
+    def gather(self, start, stop, img=True, depths=True):
+        """Read rows `start:stop`, touching only the segments that overlap them.
+
+        Returns
+        -------
+        img, depths
+            Either may be None if not requested.
+        """
+        start, stop = max(0, start), min(self.height, stop)
+        num_rows = max(0, stop - start)
+
+        shape = (num_rows, self.width, self.channels)
+        out_img = np.full(shape, self.fill_value, dtype=self.dtype) if img else None
+        out_depths = np.empty(num_rows) if depths else None
+
+        first = np.searchsorted(self.seg_stops, start, side="right")
+        last = np.searchsorted(self.piece_starts, stop, side="left")
+
+        for i in range(first, last):
+            # fill rows preceding segment `i`
+            lo, hi = max(start, self.piece_starts[i]), min(stop, self.seg_starts[i])
+            if hi > lo and depths:
+                k = lo - self.piece_starts[i]
+                out_depths[lo-start:hi-start] = self._fill_depths(i)[k:k+hi-lo]
+
+            # segment `i` itself
+            lo, hi = max(start, self.seg_starts[i]), min(stop, self.seg_stops[i])
+            if hi > lo:
+                column = self._segment_column(i)
+                r0, r1 = lo - self.seg_starts[i], hi - self.seg_starts[i]
+                if img:
+                    out_img[lo-start:hi-start, :column.width] = column.img[r0:r1]
+                if depths:
+                    out_depths[lo-start:hi-start] = column._depths_between(r0, r1)
+
+        return out_img, out_depths
+
+    def row_of_depth(self, depth, side="left"):
+        """Like ``np.searchsorted(self.depths, depth, side)``, reading at most one segment."""
+        if side == "left":
+            i = np.searchsorted(self.seg_last, depth, side="left")
+        else:
+            i = np.searchsorted(self.seg_last, depth, side="right")
+
+        if i == len(self.segments):
+            return self.height
+
+        in_fill = depth <= self.seg_first[i] if side == "left" else depth < self.seg_first[i]
+        if in_fill:
+            return self.piece_starts[i] + np.searchsorted(self._fill_depths(i), depth, side=side)
+        else:
+            return self.seg_starts[i] + self._segment_column(i)._searchsorted(depth, side=side)
+
+    def rows_between(self, top, base):
+        """Get the `(start, stop)` row range with `top <= depths <= base`."""
+        start = self.row_of_depth(top, side="left")
+        stop = self.row_of_depth(base, side="right")
+        return start, max(start, stop)
+
+    def slice_depth(self, top=None, base=None):
+        """Gather a ``CoreColumn`` between `top` and `base` from the overlapping segments."""
+        top = top or self.top
+        base = base or self.base
+        assert base > top, "Slice boundaries must maintain depth order."
+
+        assert top < self.base, f"Cannot slice to top {top} with base {self.base}"
+        assert base > self.top, f"Cannot slice to base {base} with top {self.top}"
+
+        start, stop = self.rows_between(top, base)
+        if stop <= start:
+            raise ValueError(f"No row depths between {top} and {base}, cannot slice.")
+
+        img, depths = self.gather(start, stop)
+
+        column = CoreColumn._trusted(img, depths, top, base, self.add_tol, self.add_mode)
+        column._quant = self.quant
+        column._labels = {name: track.slice(top, base) for name, track in self.labels.items()}
+        return column
+
+    def iter_chunks(self, chunk_size, depths=True, step_size=None):
+        """Same as ``CoreColumn.iter_chunks``, gathering each chunk as needed."""
+        step_size = step_size or chunk_size
+
+        for i in range(0, self.height, step_size):
+            img, chunk_depths = self.gather(i, i + chunk_size, depths=depths)
+            if depths:
+                yield img, chunk_depths
+            else:
+                yield img
+
+    def plot(self, top=None, base=None, **kwargs):
+        """Plot the interval between `top` and `base`. See ``CoreColumn.plot`` for **kwargs."""
+        return self.slice_depth(top, base).plot(**kwargs)
+
+    def to_column(self):
+        """Materialize the entire composite as a single ``CoreColumn``."""
+        img, depths = self.gather(0, self.height)
+
+        column = CoreColumn._trusted(img, depths, self.top, self.base, self.add_tol, self.add_mode)
+        column._quant = self.quant
+        column._labels = dict(self.labels)
+        return column
+
+    def __repr__(self):
+        return (
+            f"CompositeCoreColumn instance with:\n"
+            f"\t segments: {len(self.segments)}\n"
+            f"\t img.shape: {(self.height, self.width, self.channels)}\n"
+            f"\t (top, base): ({self.top:.3f}, {self.base:.3f})\n"
+            f"\t add_tol & add_mode: {self.add_tol:.4f} , {self.add_mode}\n"
+        )
+
+
+class _CompositeRows:
+    """Array-like accessor for the `img` or `depths` rows of a ``CompositeCoreColumn``."""
+
+    def __init__(self, composite, which):
+        self.composite, self.which = composite, which
+
+        c = composite
+        if which == "img":
+            self.shape, self.dtype = (c.height, c.width, c.channels), c.dtype
+        else:
+            self.shape, self.dtype = (c.height,), np.dtype(float)
+
+        self.ndim = len(self.shape)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, key):
+        rows, rest = (key[0], key[1:]) if isinstance(key, tuple) else (key, ())
+
+        if isinstance(rows, slice):
+            start, stop, step = rows.indices(self.shape[0])
+            if step < 0:
+                start, stop = stop + 1, start + 1
+            arr = self._gather(start, stop)[::step] if stop > start else self._gather(0, 0)
+        else:
+            row = int(rows) + self.shape[0] if rows < 0 else int(rows)
+            if not 0 <= row < self.shape[0]:
+                raise IndexError(f"row {rows} out of range for height {self.shape[0]}")
+            arr = self._gather(row, row + 1)[0]
+
+        return arr[rest] if rest else arr
+
+    def _gather(self, start, stop):
+        if self.which == "img":
+            return self.composite.gather(start, stop, depths=False)[0]
+        else:
+            return self.composite.gather(start, stop, img=False)[1]
+
+    def __array__(self, dtype=None):
+        arr = self._gather(0, self.shape[0])
+        return arr if dtype is None else arr.astype(dtype)
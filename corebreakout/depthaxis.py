@@ -0,0 +1,187 @@
+"""
+Compact, analytic representation of a ``CoreColumn`` depth axis.
+"""
+import numpy as np
+
+
+class DepthAxis:
+    """Monotonic depth axis stored as uniform runs, materialized lazily.
+
+    Each run is equivalent to ``np.linspace(start, stop, num=count)``, i.e. `count` depths
+    starting at `start` with a constant `step`. A column built from `top` and `base` has a
+    single run, and concatenating columns (plus any 'fill' gaps) just appends runs.
+
+    Parameters
+    ----------
+    starts, stops, counts : array-like
+        First depth, last depth, and number of depths of each run.
+    """
+
+    def __init__(self, starts, stops, counts):
+        self.starts = np.atleast_1d(np.asarray(starts, dtype=float))
+        self.stops = np.atleast_1d(np.asarray(stops, dtype=float))
+        self.counts = np.atleast_1d(np.asarray(counts, dtype=int))
+
+        assert self.starts.size == self.stops.size == self.counts.size, "Runs must be aligned"
+        assert np.all(self.counts > 0), "Every run must contain at least one depth"
+        assert np.all(self.stops >= self.starts), "Runs must be depth ordered"
+        assert np.all(self.starts[1:] >= self.stops[:-1]), "Runs must be depth ordered"
+
+        self.offsets = np.concatenate([[0], np.cumsum(self.counts)])
+        self.size = int(self.offsets[-1])
+        self._values = None
+
+    @classmethod
+    def uniform(cls, top, base, num):
+        """Single run of `num` depths, equivalent to ``np.linspace(top, base, num=num)``."""
+        return cls([top], [base], [num])
+
+    @classmethod
+    def concatenate(cls, axes):
+        """Join the runs of a depth-ordered sequence of `axes`."""
+        return cls(
+            np.concatenate([a.starts for a in axes]),
+            np.concatenate([a.stops for a in axes]),
+            np.concatenate([a.counts for a in axes]),
+        )
+
+    @property
+    def steps(self):
+        """Depth step of each run (zero for single-depth runs)."""
+        return (self.stops - self.starts) / np.maximum(self.counts - 1, 1)
+
+    @property
+    def is_uniform(self):
+        """Whether all depths are evenly spaced (one run, or runs with matching steps)."""
+        if self.starts.size == 1:
+            return True
+        steps = self.steps[self.counts > 1]
+        joins = self.starts[1:] - self.stops[:-1]
+        return bool(np.allclose(np.concatenate([steps, joins]), steps[0] if steps.size else 0.0))
+
+    def median_step(self):
+        """Median gap between adjacent depths, i.e. ``np.median(np.diff(self.values))``."""
+        if self.size < 2:
+            return np.nan
+
+        gaps = np.concatenate([self.steps, self.starts[1:] - self.stops[:-1]])
+        weights = np.concatenate([self.counts - 1, np.ones(self.starts.size - 1, dtype=int)])
+
+        order = np.argsort(gaps, kind="stable")
+        gaps, cum_weights = gaps[order], np.cumsum(weights[order])
+
+        n = self.size - 1
+        lo = gaps[np.searchsorted(cum_weights, (n - 1) // 2, side="right")]
+        hi = gaps[np.searchsorted(cum_weights, n // 2, side="right")]
+        return (lo + hi) / 2
+
+    @property
+    def values(self):
+        """Materialized 1D depths array (computed once, then cached)."""
+        if self._values is None:
+            values = np.empty(self.size)
+            for start, stop, count, offset in zip(self.starts, self.stops, self.counts, self.offsets):
+                values[offset:offset+count] = np.linspace(start, stop, num=count)
+            self._values = values
+        return self._values
+
+    def __len__(self):
+        return self.size
+
+    def __array__(self, dtype=None):
+        return self.values if dtype is None else self.values.astype(dtype)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_values"] = None
+        return state
+
+    def _run_values(self, run, k):
+        """Depths at (integer array) positions `k` within `run`, as ``np.linspace`` computes them."""
+        start, stop, count = self.starts[run], self.stops[run], self.counts[run]
+        step = (stop - start) / max(count - 1, 1)
+        return np.where(k >= count - 1, stop, start + k * step)
+
+    def value_at(self, idxs):
+        """Depths at integer row `idxs` (array or scalar), without materializing."""
+        idxs = np.asarray(idxs)
+        runs = np.searchsorted(self.offsets, idxs, side="right") - 1
+        k = idxs - self.offsets[runs]
+        step = (self.stops[runs] - self.starts[runs]) / np.maximum(self.counts[runs] - 1, 1)
+        return np.where(k >= self.counts[runs] - 1, self.stops[runs], self.starts[runs] + k * step)
+
+    def __getitem__(self, key):
+        """Contiguous slices return a new ``DepthAxis``, anything else indexes ``values``."""
+        if isinstance(key, slice) and key.step in (None, 1):
+            start, stop, _ = key.indices(self.size)
+            stop = max(start, stop)
+            if stop == start:
+                return self.values[0:0]
+
+            first = np.searchsorted(self.offsets, start, side="right") - 1
+            last = np.searchsorted(self.offsets, stop - 1, side="right") - 1
+
+            starts = self.starts[first:last+1].copy()
+            stops = self.stops[first:last+1].copy()
+            counts = self.counts[first:last+1].copy()
+
+            starts[0] = self.value_at(start)
+            stops[-1] = self.value_at(stop - 1)
+            counts[0] -= start - self.offsets[first]
+            counts[-1] -= self.offsets[last+1] - stop
+
+            return DepthAxis(starts, stops, counts)
+
+        elif np.isscalar(key) and self._values is None:
+            key = key + self.size if key < 0 else key
+            if not 0 <= key < self.size:
+                raise IndexError(f"index {key} out of range for size {self.size}")
+            return float(self.value_at(key))
+
+        return self.values[key]
+
+    def searchsorted(self, v, side="left"):
+        """Same as ``np.searchsorted(self.values, v, side)``, in O(1) per value per run."""
+        v = np.asarray(v, dtype=float)
+
+        runs = np.searchsorted(self.stops, v, side=side)
+        result = np.full(v.shape, self.size, dtype=int)
+
+        for run in np.unique(runs[runs < self.starts.size]):
+            sel = runs == run
+            result[sel] = self.offsets[run] + self._search_run(run, v[sel], side)
+
+        return result if result.ndim else int(result)
+
+    def _search_run(self, run, v, side):
+        """Binary-search equivalent positions of `v` within a single `run`, computed directly."""
+        start, stop, count = self.starts[run], self.stops[run], self.counts[run]
+        if stop == start:
+            return np.where(v <= start if side == "left" else v < start, 0, count)
+
+        step = (stop - start) / (count - 1)
+        k = np.clip(np.ceil((v - start) / step), 0, count).astype(int)
+
+        # correct for floating point error in the estimate (at most a step or two)
+        if side == "left":
+            too_high = lambda k: (k > 0) & (self._run_values(run, k - 1) >= v)
+            too_low = lambda k: (k < count) & (self._run_values(run, np.minimum(k, count - 1)) < v)
+        else:
+            too_high = lambda k: (k > 0) & (self._run_values(run, k - 1) > v)
+            too_low = lambda k: (k < count) & (self._run_values(run, np.minimum(k, count - 1)) <= v)
+
+        high = too_high(k)
+        while np.any(high):
+            k, high = k - high, too_high(k - high)
+
+        low = too_low(k)
+        while np.any(low):
+            k, low = k + low, too_low(k + low)
+
+        return k
+
+    def __repr__(self):
+        return (
+            f"DepthAxis(size={self.size}, runs={self.starts.size}, "
+            f"range=({self.starts[0]:.3f}, {self.stops[-1]:.3f}))"
+        )
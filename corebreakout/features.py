@@ -0,0 +1,176 @@
+"""
+Streaming per-row image features ("pseudo-logs") of ``CoreColumn``s.
+
+Features are computed in row blocks on a thread pool, so only `n_jobs` blocks of a
+(possibly memory-mapped, ragged or quantized) column are held in memory at a time.
+Zero pixels (background, padding and 'fill' rows) are ignored by every feature.
+"""
+import os
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from corebreakout import quantization
+
+
+# Names of all available features
+FEATURES = ["mean", "median", "var", "valid_fraction", "histogram"]
+
+# Features computed by default
+DEFAULT_FEATURES = ["mean", "var", "valid_fraction"]
+
+# Number of rows per block (per worker thread)
+DEFAULT_BLOCK_ROWS = 1024
+
+
+def row_features(
+    column,
+    features=DEFAULT_FEATURES,
+    bins=16,
+    value_range=None,
+    block_rows=DEFAULT_BLOCK_ROWS,
+    n_jobs=None,
+):
+    """Compute per-row `features` of `column` image values, ignoring zero pixels.
+
+    Blocks entirely inside 'fill' gaps (see ``CoreColumn.gaps``) are not read.
+
+    Parameters
+    ----------
+    column : CoreColumn
+        The column to compute features of. Quantized columns use dequantized values.
+    features : list(str), optional
+        Any of `FEATURES`, default=`DEFAULT_FEATURES`:
+            - 'mean', 'median', 'var' : per-channel statistics of valid pixels, shape (H, C)
+            - 'valid_fraction' : fraction of the row's pixels that are valid, shape (H,)
+            - 'histogram' : per-channel counts of valid pixels in `bins` bins, shape (H, C, bins)
+        Statistics of rows without any valid pixels are NaN.
+    bins : int, optional
+        Number of histogram bins, default=16.
+    value_range : tuple(float), optional
+        `(min, max)` range of histogram bins. Default=None uses the full range of integer
+        dtypes, or the range of the column values (found in an extra pass) otherwise.
+    block_rows : int, optional
+        Number of rows per block, default=`DEFAULT_BLOCK_ROWS`.
+    n_jobs : int, optional
+        Number of worker threads, default=None uses `os.cpu_count()`.
+
+    Returns
+    -------
+    features : dict
+        Of feature arrays, plus the `'depth'` of each row.
+    """
+    invalid = set(features) - set(FEATURES)
+    assert not invalid, f"Invalid `features`: {invalid}, must be in {FEATURES}"
+
+    height, width, channels = column.img.shape
+    values = column.values
+
+    if "histogram" in features and value_range is None:
+        if np.issubdtype(values.dtype, np.integer):
+            info = np.iinfo(values.dtype)
+            value_range = (float(info.min), float(info.max) + 1)
+        else:
+            value_range = quantization.value_range(values, block_rows)
+
+    out = {"depth": np.asarray(column.depths, dtype=np.float64)}
+    for name in features:
+        if name == "valid_fraction":
+            out[name] = np.empty(height)
+        elif name == "histogram":
+            out[name] = np.empty((height, channels, bins), dtype=np.int64)
+        else:
+            out[name] = np.empty((height, channels))
+
+    def compute(start):
+        stop = min(start + block_rows, height)
+        if column.is_gap(start, stop):
+            # 'fill' gap rows have no valid pixels, so a 1 pixel wide block gives their features
+            block = np.zeros((stop - start, 1, channels))
+        else:
+            block = np.asarray(values[start:stop], dtype=np.float64)
+        _block_features(block, features, out, start, bins, value_range)
+
+    with ThreadPoolExecutor(max_workers=n_jobs or os.cpu_count()) as pool:
+        # consume the iterator so that any exception is raised here
+        list(pool.map(compute, range(0, height, block_rows)))
+
+    return out
+
+
+def _block_features(block, features, out, start, bins, value_range):
+    """Write the features of rows `block` (starting at row `start`) into `out`."""
+    n, width, channels = block.shape
+    stop = start + n
+
+    valid = block.any(axis=2)
+    num_valid = valid.sum(axis=1)
+
+    if "valid_fraction" in features:
+        out["valid_fraction"][start:stop] = num_valid / width
+
+    # NaN-out invalid pixels, so that nan-aware reductions skip them
+    masked = np.where(valid[:, :, np.newaxis], block, np.nan)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        if "mean" in features:
+            out["mean"][start:stop] = np.nanmean(masked, axis=1)
+        if "median" in features:
+            out["median"][start:stop] = np.nanmedian(masked, axis=1)
+        if "var" in features:
+            out["var"][start:stop] = np.nanvar(masked, axis=1)
+
+    if "histogram" in features:
+        lo, hi = value_range
+        idxs = np.floor((block - lo) / (hi - lo) * bins).astype(np.int64)
+        idxs = np.clip(idxs, 0, bins - 1)
+
+        # flat (row, channel, bin) index of every valid pixel value
+        rows, _ = np.nonzero(valid)
+        flat = (rows[:, np.newaxis] * channels + np.arange(channels)) * bins + idxs[valid]
+        counts = np.bincount(flat.ravel(), minlength=n * channels * bins)
+        out["histogram"][start:stop] = counts.reshape(n, channels, bins)
+
+
+def to_dataframe(features):
+    """Flatten a `row_features` dict into a ``pandas.DataFrame`` indexed by depth.
+
+    Multi-channel features become columns named '<feature>_<channel>' (and
+    'histogram_<channel>_<bin>').
+    """
+    import pandas as pd
+
+    data = {}
+    for name, arr in features.items():
+        if name == "depth":
+            continue
+        if arr.ndim == 1:
+            data[name] = arr
+        elif arr.ndim == 2:
+            data.update({f"{name}_{c}": arr[:, c] for c in range(arr.shape[1])})
+        else:
+            for c in range(arr.shape[1]):
+                data.update({f"{name}_{c}_{b}": arr[:, c, b] for b in range(arr.shape[2])})
+
+    return pd.DataFrame(data, index=pd.Index(features["depth"], name="depth"))
+
+
+def save_features(features, fpath):
+    """Save a `row_features` dict to '.npz' (compressed) or '.parquet' file `fpath`.
+
+    Writing Parquet requires ``pandas`` with a Parquet engine (``pyarrow`` or ``fastparquet``).
+    """
+    fpath = str(fpath)
+    if fpath.endswith(".parquet"):
+        to_dataframe(features).to_parquet(fpath)
+    elif fpath.endswith(".npz"):
+        np.savez_compressed(fpath, **features)
+    else:
+        raise ValueError(f"Unsupported features file type: {fpath}, must be '.npz' or '.parquet'")
+
+
+def load_features(fpath):
+    """Load a features dict saved to '.npz' by ``save_features``."""
+    with np.load(str(fpath)) as arrays:
+        return {name: arrays[name] for name in arrays.files}
@@ -0,0 +1,115 @@
+"""
+Chunked content fingerprints of ``CoreColumn`` images and depths.
+
+Rows are hashed in fixed-size chunks, so two columns can be compared chunk by chunk
+(only reading rows that actually differ), and a single digest can be used as a cache key.
+Chunks are hashed on a thread pool (``hashlib`` releases the GIL for large buffers),
+reading one chunk at a time, so memory-mapped images are never loaded in full.
+"""
+import os
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+# Number of rows per hashed chunk
+DEFAULT_CHUNK_ROWS = 1024
+
+# Bytes per chunk hash
+DIGEST_SIZE = 16
+
+
+def _hash(arr):
+    return hashlib.blake2b(np.ascontiguousarray(arr), digest_size=DIGEST_SIZE).digest()
+
+
+class ColumnFingerprint:
+    """Per-chunk hashes of a column's image rows and depths.
+
+    Parameters
+    ----------
+    shape : tuple(int)
+        Shape of the column image.
+    dtype : str or np.dtype
+        Dtype of the column image.
+    chunk_rows : int
+        Number of rows per chunk (the last chunk may be shorter).
+    img_hashes, depth_hashes : list(bytes)
+        Hash of each chunk of image rows and depths.
+    """
+
+    def __init__(self, shape, dtype, chunk_rows, img_hashes, depth_hashes):
+        assert len(img_hashes) == len(depth_hashes), "Must have image and depth hash per chunk"
+        self.shape, self.dtype = tuple(shape), np.dtype(dtype)
+        self.chunk_rows = chunk_rows
+        self.img_hashes, self.depth_hashes = list(img_hashes), list(depth_hashes)
+
+    @classmethod
+    def compute(cls, column, chunk_rows=DEFAULT_CHUNK_ROWS, n_jobs=None):
+        """Hash `column` in chunks of `chunk_rows` rows, using `n_jobs` threads."""
+        assert chunk_rows > 0, "`chunk_rows` must be positive"
+
+        def hash_chunk(start):
+            stop = start + chunk_rows
+            depths = np.asarray(column._depths_between(start, stop), dtype=np.float64)
+            return _hash(column.img[start:stop]), _hash(depths)
+
+        with ThreadPoolExecutor(max_workers=n_jobs or os.cpu_count()) as pool:
+            hashes = list(pool.map(hash_chunk, range(0, column.height, chunk_rows)))
+
+        return cls(
+            column.img.shape,
+            column.img.dtype,
+            chunk_rows,
+            [h[0] for h in hashes],
+            [h[1] for h in hashes],
+        )
+
+    def __len__(self):
+        return len(self.img_hashes)
+
+    def chunk_bounds(self, i):
+        """Row range `(start, stop)` of chunk `i`."""
+        start = i * self.chunk_rows
+        return start, min(start + self.chunk_rows, self.shape[0])
+
+    @property
+    def digest(self):
+        """Hex digest of the whole fingerprint (image shape, dtype and all chunk hashes)."""
+        h = hashlib.blake2b(digest_size=DIGEST_SIZE)
+        h.update(repr((self.shape, self.dtype.str, self.chunk_rows)).encode("utf-8"))
+        for img_hash, depth_hash in zip(self.img_hashes, self.depth_hashes):
+            h.update(img_hash)
+            h.update(depth_hash)
+        return h.hexdigest()
+
+    def is_comparable(self, other):
+        """Whether chunks of `self` and `other` cover the same rows."""
+        return self.shape[0] == other.shape[0] and self.chunk_rows == other.chunk_rows
+
+    def changed_chunks(self, other):
+        """Boolean array, True for each chunk whose image or depth hashes differ from `other`.
+
+        Equal hashes mean identical bytes. Different hashes may still be `np.isclose` values.
+        """
+        assert self.is_comparable(other), "Fingerprints must have the same rows and `chunk_rows`"
+        same_dtype = self.dtype == other.dtype
+
+        return np.array([
+            not same_dtype or a_img != b_img or a_depth != b_depth
+            for a_img, b_img, a_depth, b_depth in zip(
+                self.img_hashes, other.img_hashes, self.depth_hashes, other.depth_hashes
+            )
+        ], dtype=bool)
+
+    def __eq__(self, other):
+        if not isinstance(other, ColumnFingerprint):
+            return NotImplemented
+        return self.shape == other.shape and self.digest == other.digest
+
+    def __repr__(self):
+        return (
+            f"ColumnFingerprint(shape={self.shape}, dtype={self.dtype}, "
+            f"chunk_rows={self.chunk_rows}, digest={self.digest})"
+        )
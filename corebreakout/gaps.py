@@ -0,0 +1,197 @@
+"""
+Sparse representation of the 'fill' gaps between concatenated column images.
+
+In 'fill' mode, ``CoreColumnBuilder`` (and so ``CoreColumn.__add__`` and ``concat``) inserts
+blank rows for the depth gaps between columns. A ``GappedImage`` stores only the packed core
+rows, plus the `[start, stop)` row intervals of the gaps, and synthesizes the blank rows when
+they are indexed. Rows fully inside gaps can be skipped without reading any image data.
+
+A ``GappedImage`` is not an ``np.ndarray``: use ``np.asarray(img)`` (or ``CoreColumn.to_dense``)
+for a dense array. Arithmetic, comparisons, ufuncs and common reductions work on the dense image.
+"""
+import numpy as np
+from numpy.lib.mixins import NDArrayOperatorsMixin
+
+from corebreakout.ragged import row_indices
+
+
+class GappedImage(NDArrayOperatorsMixin):
+    """Image of `shape` (height, width, channels) whose gap rows are stored as intervals only.
+
+    Supports ``shape``, ``dtype``, ``ndim``, ``len``, row indexing with ints, slices or arrays
+    (optionally followed by width/channel indices), and ``np.asarray(img)``, all of which return
+    dense arrays with `fill_value` in gap rows. Contiguous row slices read contiguous `values`.
+
+    Operators and ufuncs (e.g., ``img * 2``, ``img == 0``, ``np.sqrt(img)``) and the reductions
+    ``mean``, ``sum``, ``min``, ``max``, ``std``, ``var``, ``any`` and ``all`` are computed on the
+    dense image and return arrays. ``copy`` and ``astype`` return new ``GappedImage``s.
+
+    Parameters
+    ----------
+    values : array or RaggedImage
+        The packed `(height - num_gap_rows, width, channels)` non-gap rows (may be memory-mapped).
+    gaps : array(int)
+        `(num_gaps, 2)` row intervals `[start, stop)` of the gaps in the full image.
+        Intervals are sorted, and touching or empty ones are merged or dropped.
+    fill_value : scalar, optional
+        Value of gap pixels (e.g., the code of zero for a quantized image), default=0.
+    """
+
+    def __init__(self, values, gaps, fill_value=0):
+        gaps = np.asarray(gaps, dtype=np.int64).reshape(-1, 2)
+        gaps = gaps[np.argsort(gaps[:, 0], kind="stable")]
+        gaps = gaps[gaps[:, 1] > gaps[:, 0]]
+        assert np.all(gaps[1:, 0] >= gaps[:-1, 1]), "Gaps must not overlap"
+
+        # merge touching gaps
+        if gaps.shape[0] > 1:
+            new = np.concatenate([[True], gaps[1:, 0] > gaps[:-1, 1]])
+            starts, group = gaps[new, 0], np.cumsum(new) - 1
+            stops = np.zeros(starts.size, dtype=np.int64)
+            np.maximum.at(stops, group, gaps[:, 1])
+            gaps = np.stack([starts, stops], axis=1)
+
+        self.values, self.gaps, self.fill_value = values, gaps, fill_value
+
+        # number of gap rows above each gap, and in total
+        lengths = gaps[:, 1] - gaps[:, 0]
+        self._before = np.concatenate([[0], np.cumsum(lengths)])
+        assert gaps.size == 0 or gaps[-1, 1] <= values.shape[0] + self._before[-1], "Invalid gaps"
+
+        self.shape = (values.shape[0] + int(self._before[-1]),) + tuple(values.shape[1:])
+        self.dtype, self.ndim = values.dtype, 3
+
+    def __len__(self):
+        return self.shape[0]
+
+    @property
+    def num_gap_rows(self):
+        return int(self._before[-1])
+
+    def _locate(self, rows):
+        """Boolean gap mask, and packed `values` row (where not a gap) of each of `rows`."""
+        if self.gaps.shape[0] == 0:
+            return np.zeros(rows.shape, dtype=bool), rows
+
+        g = np.searchsorted(self.gaps[:, 0], rows, side="right") - 1
+        in_gap = (g >= 0) & (rows < self.gaps[np.maximum(g, 0), 1])
+        # every gap starting at or above a non-gap row lies entirely above it
+        packed = rows - self._before[g + 1]
+        return in_gap, packed
+
+    def is_gap(self, start, stop):
+        """Whether every one of rows `start:stop` is in a single gap (found without any reads)."""
+        g = np.searchsorted(self.gaps[:, 0], start, side="right") - 1
+        return bool(g >= 0 and self.gaps[g, 1] >= min(stop, self.shape[0]))
+
+    def gap_mask(self, start=0, stop=None):
+        """Boolean array, True for each of rows `start:stop` that is in a gap."""
+        start, stop, _ = slice(start, stop).indices(self.shape[0])
+        return self._locate(np.arange(start, max(start, stop)))[0]
+
+    def slice_rows(self, start, stop):
+        """``GappedImage`` of rows `start:stop`, sharing (a slice of) this image's `values`."""
+        start, stop, _ = slice(start, stop).indices(self.shape[0])
+        stop = max(start, stop)
+
+        p0, p1 = self._packed_range(start, stop)
+        if hasattr(self.values, "slice_rows"):
+            values = self.values.slice_rows(p0, p1)
+        else:
+            values = self.values[p0:p1]
+
+        gaps = np.clip(self.gaps, start, stop) - start
+        return GappedImage(values, gaps, self.fill_value)
+
+    def _packed_range(self, start, stop):
+        """Range of packed `values` rows of the non-gap rows in `start:stop`."""
+        lo = np.searchsorted(self.gaps[:, 1], start, side="right")
+        hi = np.searchsorted(self.gaps[:, 0], stop, side="left")
+        # gap rows in `start:stop` (partial overlap with the first and last gaps)
+        covered = self._before[hi] - self._before[lo]
+        if hi > lo:
+            covered -= max(0, start - self.gaps[lo, 0]) + max(0, self.gaps[hi-1, 1] - stop)
+
+        p0 = start - self._before[lo] - (max(0, start - self.gaps[lo, 0]) if hi > lo else 0)
+        return int(p0), int(p0 + (stop - start) - covered)
+
+    def __getitem__(self, key):
+        rows, rest = (key[0], key[1:]) if isinstance(key, tuple) else (key, ())
+
+        if isinstance(rows, slice) and rows.step in (None, 1):
+            start, stop, _ = rows.indices(self.shape[0])
+            arr = self._dense(np.arange(start, max(start, stop)), contiguous=True)
+        elif not isinstance(rows, slice) and np.ndim(rows) == 0:
+            return self._dense(row_indices(rows, self.shape[0]))[0][rest]
+        else:
+            arr = self._dense(row_indices(rows, self.shape[0]))
+
+        # the rows have already been selected
+        return arr[(slice(None),) + rest]
+
+    def _dense(self, idxs, contiguous=False):
+        """Dense `(len(idxs), width, channels)` array of rows `idxs`."""
+        out = np.full((idxs.size,) + self.shape[1:], self.fill_value, dtype=self.dtype)
+        if idxs.size == 0:
+            return out
+
+        in_gap, packed = self._locate(idxs)
+        if in_gap.all():
+            return out
+
+        if contiguous:
+            # non-gap rows of a contiguous range are contiguous in `values`
+            p0 = packed[~in_gap][0]
+            out[~in_gap] = self.values[p0:p0 + int((~in_gap).sum())]
+        else:
+            out[~in_gap] = self.values[packed[~in_gap]]
+        return out
+
+    def __array__(self, dtype=None):
+        arr = self._dense(np.arange(self.shape[0]), contiguous=True)
+        return arr if dtype is None else arr.astype(dtype)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        if any(isinstance(x, GappedImage) for x in kwargs.get("out", ())):
+            return NotImplemented
+        inputs = [np.asarray(x) if isinstance(x, GappedImage) else x for x in inputs]
+        return getattr(ufunc, method)(*inputs, **kwargs)
+
+    def copy(self):
+        """``GappedImage`` with a copy of `values` (gaps stay unallocated)."""
+        return GappedImage(np.array(self.values), self.gaps.copy(), self.fill_value)
+
+    def astype(self, dtype):
+        """``GappedImage`` with `values` and `fill_value` cast to `dtype`."""
+        fill_value = np.asarray(self.fill_value).astype(dtype)[()]
+        return GappedImage(np.asarray(self.values).astype(dtype), self.gaps.copy(), fill_value)
+
+    def mean(self, *args, **kwargs):
+        return np.asarray(self).mean(*args, **kwargs)
+
+    def sum(self, *args, **kwargs):
+        return np.asarray(self).sum(*args, **kwargs)
+
+    def min(self, *args, **kwargs):
+        return np.asarray(self).min(*args, **kwargs)
+
+    def max(self, *args, **kwargs):
+        return np.asarray(self).max(*args, **kwargs)
+
+    def std(self, *args, **kwargs):
+        return np.asarray(self).std(*args, **kwargs)
+
+    def var(self, *args, **kwargs):
+        return np.asarray(self).var(*args, **kwargs)
+
+    def any(self, *args, **kwargs):
+        return np.asarray(self).any(*args, **kwargs)
+
+    def all(self, *args, **kwargs):
+        return np.asarray(self).all(*args, **kwargs)
+
+    def __repr__(self):
+        return (
+            f"GappedImage(shape={self.shape}, dtype={self.dtype}, "
+            f"{len(self.gaps)} gaps of {self.num_gap_rows} rows)"
+        )
@@ -0,0 +1,150 @@
+"""
+Depth-registered categorical label tracks for ``CoreColumn``s.
+
+A ``LabelTrack`` stores labels as depth intervals (runs), rather than one label per row,
+so it stays valid when a column is sliced, concatenated or resampled. Row labels are
+computed with a single vectorized ``searchsorted`` only when they are requested.
+"""
+from xml.etree import ElementTree
+
+import numpy as np
+
+
+class LabelTrack:
+    """Categorical labels of closed depth intervals `[tops[i], bases[i]]`.
+
+    Intervals are sorted by top depth. If adjacent intervals share a boundary depth,
+    the deeper interval's label is used there.
+
+    Parameters
+    ----------
+    tops, bases : array
+        Depth range of each interval.
+    labels : array or list
+        Label of each interval (e.g., str facies or lithology names).
+    """
+
+    def __init__(self, tops, bases, labels):
+        tops, bases = np.asarray(tops, dtype=float), np.asarray(bases, dtype=float)
+        labels = np.asarray(labels)
+        assert tops.shape == bases.shape == labels.shape, "Must have a top, base and label each"
+        assert np.all(bases >= tops), "Interval bases must not be above their tops"
+
+        order = np.argsort(tops, kind="stable")
+        self.tops, self.bases = tops[order], bases[order]
+
+        # store labels as integer codes into sorted unique `categories`
+        self.categories, self.codes = np.unique(labels[order], return_inverse=True)
+
+    @classmethod
+    def from_picks(cls, picks, top_col="top", base_col="base", label_col="label"):
+        """Make a track from a picks table (``pandas.DataFrame`` or dict of arrays)."""
+        return cls(picks[top_col], picks[base_col], picks[label_col])
+
+    @classmethod
+    def from_rows(cls, row_labels, depths):
+        """Run-length encode per-row `row_labels` at `depths` into a track.
+
+        Interval boundaries are placed halfway between the last row of one run and the first
+        row of the next, so that depths between the rows (e.g., after resampling) are labeled.
+        """
+        row_labels, depths = np.asarray(row_labels), np.asarray(depths, dtype=float)
+        assert row_labels.size == depths.size, "Must have one label per depth"
+        if depths.size == 0:
+            return cls([], [], np.array([], dtype=row_labels.dtype))
+
+        starts = np.concatenate([[0], np.flatnonzero(row_labels[1:] != row_labels[:-1]) + 1])
+        midpoints = (depths[starts[1:] - 1] + depths[starts[1:]]) / 2
+        tops = np.concatenate([[depths[0]], midpoints])
+        bases = np.concatenate([midpoints, [depths[-1]]])
+
+        return cls(tops, bases, row_labels[starts])
+
+    @classmethod
+    def from_xml(cls, xml_path, depths):
+        """Make a track from a Pascal-VOC XML file of labeled boxes on an image of `depths` rows.
+
+        As in ``join_xml_labels.py``, each box is snapped to extend from its `ymin` down to the
+        `ymin` of the next box (the first box starts at row 0, and the last ends at the last row).
+        """
+        depths = np.asarray(depths, dtype=float)
+        objects = ElementTree.parse(str(xml_path)).findall("object")
+
+        ymins = np.array([int(float(o.find("bndbox").find("ymin").text)) for o in objects])
+        labels = np.array([o.find("name").text for o in objects])
+
+        order = np.argsort(ymins, kind="stable")
+        ymins, labels = ymins[order], labels[order]
+        if ymins.size:
+            ymins[0] = 0
+
+        row_labels = np.repeat(labels, np.diff(np.append(ymins, depths.size)))
+        return cls.from_rows(row_labels, depths)
+
+    @classmethod
+    def concatenate(cls, tracks):
+        """Combine the intervals of several tracks (e.g., of depth-ordered columns)."""
+        tracks = list(tracks)
+        return cls(
+            np.concatenate([t.tops for t in tracks]),
+            np.concatenate([t.bases for t in tracks]),
+            np.concatenate([t.labels for t in tracks]),
+        )
+
+    def __len__(self):
+        return self.tops.size
+
+    @property
+    def labels(self):
+        """Label of each interval."""
+        return self.categories[self.codes]
+
+    def interval_index(self, depths):
+        """Index of the interval containing each of `depths`, or -1 if none does."""
+        depths = np.asarray(depths, dtype=float)
+        idxs = np.searchsorted(self.tops, depths, side="right") - 1
+
+        inside = idxs >= 0
+        inside[inside] = depths[inside] <= self.bases[idxs[inside]]
+        return np.where(inside, idxs, -1)
+
+    def labels_at(self, depths, fill="", dtype=None):
+        """Labels at `depths` (e.g., dense per-row labels), with `fill` outside of all intervals."""
+        idxs = self.interval_index(depths)
+        dtype = dtype or np.result_type(self.categories.dtype, np.asarray(fill).dtype)
+
+        out = np.full(idxs.shape, fill, dtype=dtype)
+        out[idxs >= 0] = self.labels[idxs[idxs >= 0]]
+        return out
+
+    def slice(self, top, base):
+        """Get the track clipped to `[top, base]`."""
+        keep = (self.bases >= top) & (self.tops <= base)
+        return LabelTrack(
+            np.maximum(self.tops[keep], top), np.minimum(self.bases[keep], base), self.labels[keep]
+        )
+
+    def to_dict(self):
+        """JSON-serializable dict of intervals (labels are saved as str)."""
+        return {
+            "tops": self.tops.tolist(),
+            "bases": self.bases.tolist(),
+            "labels": [str(l) for l in self.labels.tolist()],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["tops"], data["bases"], data["labels"])
+
+    def __eq__(self, other):
+        if not isinstance(other, LabelTrack):
+            return NotImplemented
+        return (
+            len(self) == len(other)
+            and np.allclose(self.tops, other.tops)
+            and np.allclose(self.bases, other.bases)
+            and np.array_equal(self.labels, other.labels)
+        )
+
+    def __repr__(self):
+        return f"LabelTrack({len(self)} intervals, categories={self.categories.tolist()})"
@@ -0,0 +1,157 @@
+"""
+Batched, shuffled and prefetched fixed-size chunks from one or more ``CoreColumn``s.
+"""
+import queue
+import threading
+
+import numpy as np
+
+
+class ChunkLoader:
+    """Iterable of fixed-shape `(batch, chunk_size, width, channels)` arrays of column chunks.
+
+    Chunks start every `step_size` rows of each column (as in ``CoreColumn.iter_chunks``),
+    and partial chunks are zero-padded to `chunk_size` rows. Narrower columns are zero-padded
+    to the widest `width`. A background thread assembles the next `prefetch` batches while
+    the current one is in use.
+
+    NOTE: batches are written into a small ring of reusable buffers. A yielded array is only
+    valid until `prefetch + 1` further batches have been requested; copy it to keep it longer.
+
+    Parameters
+    ----------
+    columns : CoreColumn-like or list of them
+        Columns with row-sliceable `img` and `depths` (e.g., ``CoreColumn``,
+        memory-mapped ``CoreColumn``, or ``CompositeCoreColumn``).
+    chunk_size : int
+        Number of rows in each chunk.
+    batch_size : int
+        Number of chunks in each batch.
+    step_size : int, optional
+        Rows between the starts of consecutive chunks, default=None uses `chunk_size`.
+    shuffle : bool, optional
+        Whether to shuffle chunks (across all columns) each epoch, default=False.
+    depths : bool, optional
+        If True, yield `(imgs, depths)`, with NaN depths in padded rows. Default=False.
+    drop_last : bool, optional
+        Whether to drop a final, smaller batch, default=False.
+    prefetch : int, optional
+        Number of batches to assemble ahead of time, default=2.
+    seed : int, optional
+        Random seed for shuffling.
+    """
+
+    def __init__(
+        self,
+        columns,
+        chunk_size,
+        batch_size,
+        step_size=None,
+        shuffle=False,
+        depths=False,
+        drop_last=False,
+        prefetch=2,
+        seed=None,
+    ):
+        self.columns = columns if isinstance(columns, (list, tuple)) else [columns]
+        assert len(self.columns) > 0, "Must provide at least one column."
+        assert chunk_size > 0 and batch_size > 0, "`chunk_size` and `batch_size` must be positive"
+        assert prefetch > 0, "`prefetch` must be positive"
+
+        channels = set(c.channels for c in self.columns)
+        assert len(channels) == 1, "All `columns` must have the same number of channels"
+
+        self.chunk_size, self.batch_size = chunk_size, batch_size
+        self.step_size = step_size or chunk_size
+        self.shuffle, self.depths, self.drop_last = shuffle, depths, drop_last
+        self.prefetch = prefetch
+        self.random = np.random.RandomState(seed)
+
+        self.width = max(c.width for c in self.columns)
+        self.channels = channels.pop()
+        self.dtype = np.result_type(*[c.img.dtype for c in self.columns])
+
+        # (column index, start row) of every chunk
+        self.index = np.concatenate([
+            np.stack([np.full(n, i), np.arange(n) * self.step_size], axis=1)
+            for i, n in enumerate(self._num_chunks(c) for c in self.columns)
+        ])
+
+    def _num_chunks(self, column):
+        return int(np.ceil(column.height / self.step_size))
+
+    @property
+    def batch_shape(self):
+        """Shape of each (full) batch of images."""
+        return (self.batch_size, self.chunk_size, self.width, self.channels)
+
+    def __len__(self):
+        """Number of batches per epoch."""
+        n = len(self.index)
+        return n // self.batch_size if self.drop_last else int(np.ceil(n / self.batch_size))
+
+    def __iter__(self):
+        num_chunks = len(self.index)
+        order = self.random.permutation(num_chunks) if self.shuffle else np.arange(num_chunks)
+        batches = [order[i:i+self.batch_size] for i in range(0, len(order), self.batch_size)]
+        if self.drop_last and batches and len(batches[-1]) < self.batch_size:
+            batches = batches[:-1]
+
+        # While the caller holds a batch and `prefetch` later ones (the documented window), up to
+        # `prefetch` more can be queued and one more filled, so the ring needs `2 * prefetch + 2`
+        num_buffers = 2 * self.prefetch + 2
+        img_buffers = [np.empty(self.batch_shape, dtype=self.dtype) for _ in range(num_buffers)]
+        depth_buffers = [np.empty(self.batch_shape[:2]) for _ in range(num_buffers)]
+
+        ready = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    ready.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        def worker():
+            try:
+                for b, batch in enumerate(batches):
+                    if stop.is_set():
+                        return
+                    imgs, depths = img_buffers[b % num_buffers], depth_buffers[b % num_buffers]
+                    self._fill_batch(batch, imgs, depths)
+                    put((imgs[:len(batch)], depths[:len(batch)]))
+                put(None)
+            except Exception as e:
+                put(e)
+
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+
+        try:
+            while True:
+                item = ready.get()
+                if item is None:
+                    break
+                elif isinstance(item, Exception):
+                    raise item
+                yield item if self.depths else item[0]
+        finally:
+            stop.set()
+            thread.join()
+
+    def _fill_batch(self, batch, imgs, depths):
+        """Write the chunks with `index[batch]` into `imgs` and `depths` buffers."""
+        for b, (col_idx, start) in enumerate(self.index[batch]):
+            column = self.columns[col_idx]
+            stop = min(start + self.chunk_size, column.height)
+            n, w = stop - start, column.width
+
+            imgs[b, :n, :w] = column.img[start:stop]
+            imgs[b, :n, w:] = 0
+            imgs[b, n:] = 0
+
+            if self.depths:
+                depths[b, :n] = column.depths[start:stop]
+                depths[b, n:] = np.nan
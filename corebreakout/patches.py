@@ -0,0 +1,245 @@
+"""
+Sharded export of fixed-size training patches from ``CoreColumn``s.
+
+Each well's column is cut into depth windows `length` long, starting every `step` (as in
+``CoreColumn.depth_windows``), and each window is resampled to a fixed `(num_rows, width)` patch.
+Patches (and the codes of any label tracks at each patch row) are written to fixed-size record
+shards, which are plain '.npy' files that can be memory-mapped and read contiguously:
+
+    - '<well>_<shard>_patches.npy' : (count, num_rows, width, channels) image records
+    - '<well>_<shard>_labels.npy' : (count, num_tracks, num_rows) int16 label codes (-1 = none)
+    - '<well>_<shard>_depths.npy' : (count, 2) float64 top and base depth of each record
+    - 'index.json' and 'index.npz' : export settings, shard list, and per-record well/shard/depths
+
+Shards are written on a thread pool (across and within wells), and each one is only renamed to
+its final name once it is complete, so an interrupted export can be resumed with the same call.
+"""
+import os
+import json
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from corebreakout import resampling
+
+
+# Default number of records per shard
+DEFAULT_SHARD_SIZE = 1024
+
+# Label code of rows outside of every labeled interval
+NO_LABEL = -1
+
+
+def _shard_name(well, shard):
+    return f"{well}_{shard:05d}"
+
+
+def export_patches(
+    columns,
+    path,
+    length,
+    num_rows,
+    step=None,
+    width=None,
+    labels=(),
+    shard_size=DEFAULT_SHARD_SIZE,
+    method="linear",
+    n_jobs=None,
+):
+    """Export patches of `columns` to sharded record files in directory `path`.
+
+    Parameters
+    ----------
+    columns : dict
+        Of `{well: CoreColumn}`. Well names are used in file names.
+    path : str or Path
+        Existing directory to write shards and index to.
+    length : float
+        Depth length of each patch.
+    num_rows : int
+        Number of rows each patch is resampled to.
+    step : float, optional
+        Depth stride between the tops of consecutive patches, default=None uses `length`.
+    width : int, optional
+        Patch width, default=None uses the widest column. Narrower columns are zero-padded.
+    labels : list(str), optional
+        Names of ``CoreColumn.labels`` tracks to export as per-row label codes. The categories
+        of each track (the union over all wells) are saved in 'index.json'.
+    shard_size : int, optional
+        Max number of records per shard, default=`DEFAULT_SHARD_SIZE`.
+    method : one of {'linear', 'area'}, optional
+        Resampling method, default='linear'.
+    n_jobs : int, optional
+        Number of shards written at a time, default=None uses `os.cpu_count()`.
+
+    Returns
+    -------
+    index : dict
+        The saved 'index.json' contents.
+    """
+    path = Path(path)
+    assert path.exists() and path.is_dir(), f"Export location {path} doesnt exist."
+    assert length > 0 and num_rows > 0 and shard_size > 0, "Invalid patch or shard size"
+    step = step or length
+
+    cols = list(columns.values())
+    assert len(set(c.channels for c in cols)) == 1, "Columns must have the same `channels`"
+    assert len(set(c.quant for c in cols)) == 1, "Columns must share one `quant` (or none)"
+    for name in labels:
+        assert all(name in c.labels for c in cols), f"Every column must have a '{name}' track"
+
+    width = width or max(c.width for c in cols)
+    assert all(c.width <= width for c in cols), "`width` must fit the widest column"
+    dtype = np.result_type(*[c.img.dtype for c in cols])
+    channels = cols[0].channels
+
+    categories = {
+        name: sorted(set(str(l) for c in cols for l in c.labels[name].categories.tolist()))
+        for name in labels
+    }
+
+    # split each well's windows into shards, deterministically (so exports can resume)
+    tasks = []
+    for well, column in columns.items():
+        tops, _, _ = column.depth_windows(length, step)
+        for shard, i in enumerate(range(0, tops.size, shard_size)):
+            tasks.append((well, shard, tops[i:i+shard_size]))
+
+    def write_shard(task):
+        well, shard, tops = task
+        stem = path / _shard_name(well, shard)
+        final = stem.with_name(stem.name + "_patches.npy")
+        if final.is_file():
+            return
+
+        column = columns[well]
+        tracks = [column.labels[name] for name in labels]
+        # code of each labeled interval of each track
+        interval_codes = [
+            np.searchsorted(categories[name], track.labels.astype(str)).astype(np.int16)
+            for name, track in zip(labels, tracks)
+        ]
+
+        partial = stem.with_name(stem.name + "_patches.partial.npy")
+        patches = np.lib.format.open_memmap(
+            str(partial), mode="w+", dtype=dtype, shape=(tops.size, num_rows, width, channels)
+        )
+        codes = np.full((tops.size, len(labels), num_rows), NO_LABEL, dtype=np.int16)
+
+        for k, top in enumerate(tops):
+            grid = np.linspace(top, top + length, num=num_rows, endpoint=False)
+            resampling.resample_into(column, grid, patches[k], method=method, n_jobs=1)
+
+            for j, track in enumerate(tracks):
+                idxs = track.interval_index(grid)
+                codes[k, j, idxs >= 0] = interval_codes[j][idxs[idxs >= 0]]
+
+        np.save(stem.with_name(stem.name + "_labels.npy"), codes)
+        np.save(stem.with_name(stem.name + "_depths.npy"), np.stack([tops, tops + length], axis=1))
+        patches.flush()
+        del patches
+        os.replace(partial, final)
+
+    with ThreadPoolExecutor(max_workers=n_jobs or os.cpu_count()) as pool:
+        # consume the iterator so that any exception is raised here
+        list(pool.map(write_shard, tasks))
+
+    index = {
+        "length": length,
+        "step": step,
+        "num_rows": num_rows,
+        "width": width,
+        "channels": channels,
+        "dtype": np.dtype(dtype).str,
+        "method": method,
+        "quant": cols[0].quant,
+        "labels": list(labels),
+        "categories": categories,
+        "wells": list(columns.keys()),
+        "shards": [
+            {"well": well, "name": _shard_name(well, shard), "count": int(tops.size)}
+            for well, shard, tops in tasks
+        ],
+    }
+    _save_index(path, index)
+    return index
+
+
+def _save_index(path, index):
+    """Write 'index.json', and the per-record 'index.npz' built from the shard depth files."""
+    wells = index["wells"]
+    shard_ids, well_ids, depths = [], [], []
+    for s, shard in enumerate(index["shards"]):
+        shard_depths = np.load(path / (shard["name"] + "_depths.npy"))
+        shard_ids.append(np.full(shard["count"], s, dtype=np.int32))
+        well_ids.append(np.full(shard["count"], wells.index(shard["well"]), dtype=np.int32))
+        depths.append(shard_depths.reshape(-1, 2))
+
+    empty = lambda: np.zeros(0, dtype=np.int32)
+    np.savez(
+        path / "index.npz",
+        shard=np.concatenate(shard_ids) if shard_ids else empty(),
+        well=np.concatenate(well_ids) if well_ids else empty(),
+        depths=np.concatenate(depths) if depths else np.zeros((0, 2)),
+    )
+    with open(path / "index.json", "w") as f:
+        json.dump(index, f)
+
+
+class PatchDataset:
+    """Memory-mapped reader of patches exported with ``export_patches``.
+
+    Attributes
+    ----------
+    index : dict
+        Export settings and shard list (the contents of 'index.json').
+    shard, well : array(int)
+        Shard and well (index into `index['wells']`) of each record.
+    depths : array
+        `(num_records, 2)` top and base depth of each record.
+    """
+
+    def __init__(self, path, mmap_mode="r"):
+        self.path, self.mmap_mode = Path(path), mmap_mode
+
+        with open(self.path / "index.json", "r") as f:
+            self.index = json.load(f)
+        with np.load(str(self.path / "index.npz")) as arrays:
+            self.shard, self.well, self.depths = arrays["shard"], arrays["well"], arrays["depths"]
+
+        counts = [s["count"] for s in self.index["shards"]]
+        self.offsets = np.concatenate([[0], np.cumsum(counts)]).astype(int)
+        self._shards = {}
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    @property
+    def num_shards(self):
+        return len(self.index["shards"])
+
+    def load_shard(self, s):
+        """`(patches, labels)` arrays of shard `s` (memory-mapped, and cached once opened)."""
+        if s not in self._shards:
+            name = self.index["shards"][s]["name"]
+            self._shards[s] = (
+                np.load(self.path / (name + "_patches.npy"), mmap_mode=self.mmap_mode),
+                np.load(self.path / (name + "_labels.npy"), mmap_mode=self.mmap_mode),
+            )
+        return self._shards[s]
+
+    def iter_shards(self):
+        """Generate `(patches, labels)` of each shard in order (for sequential reads)."""
+        for s in range(self.num_shards):
+            yield self.load_shard(s)
+
+    def __getitem__(self, i):
+        """`(patch, labels)` of record `i`."""
+        s = self.shard[i]
+        patches, labels = self.load_shard(s)
+        k = i - self.offsets[s]
+        return patches[k], labels[k]
+
+    def __repr__(self):
+        return f"PatchDataset of {len(self)} patches in {self.num_shards} shards from {self.path}"
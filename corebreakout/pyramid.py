@@ -0,0 +1,137 @@
+"""
+Multi-resolution image pyramids for plotting long ``CoreColumn``s.
+"""
+import numpy as np
+
+
+# Downsampling factor of the first (finest) pyramid level
+DEFAULT_MIN_FACTOR = 4
+
+# Stop adding levels once a level would have fewer rows than this
+DEFAULT_MIN_ROWS = 512
+
+# Number of source rows read per block while building a level
+DEFAULT_BLOCK_ROWS = 4096
+
+
+class ImagePyramid:
+    """Depth-aligned, downsampled copies of a column image.
+
+    Level `k` is downsampled by ``factors[k]`` (a power of 2) along both rows and width,
+    so each of its rows is the mean of a `factor x factor` block of full resolution pixels,
+    and its depths are the mean depths of the corresponding rows.
+
+    Parameters
+    ----------
+    factors : list(int)
+        Downsampling factor of each level, in increasing order.
+    imgs, depths : list(array)
+        Image and depths arrays of each level.
+    """
+
+    def __init__(self, factors, imgs, depths):
+        assert len(factors) == len(imgs) == len(depths), "Levels must be aligned"
+        self.factors, self.imgs, self.depths = list(factors), list(imgs), list(depths)
+
+    @classmethod
+    def build(
+        cls,
+        img,
+        depths,
+        min_factor=DEFAULT_MIN_FACTOR,
+        min_rows=DEFAULT_MIN_ROWS,
+        block_rows=DEFAULT_BLOCK_ROWS,
+    ):
+        """Build a pyramid from full resolution `img` and `depths`, streaming in row blocks.
+
+        Only `block_rows` rows of `img` (which may be memory-mapped) are read at a time.
+        """
+        assert min_factor >= 2 and (min_factor & (min_factor - 1)) == 0, "`min_factor` must be 2^k"
+
+        factors, imgs, level_depths = [], [], []
+        src_img, src_depths = img, np.asarray(depths)
+        factor, step = min_factor, min_factor
+
+        # first level comes straight from `img`, each later level halves the previous one
+        while src_img.shape[0] // step >= min_rows:
+            src_img, src_depths = _downsample(src_img, src_depths, step, block_rows)
+
+            factors.append(factor)
+            imgs.append(src_img)
+            level_depths.append(src_depths)
+
+            factor, step = factor * 2, 2
+
+        return cls(factors, imgs, level_depths)
+
+    def __len__(self):
+        return len(self.factors)
+
+    def select(self, start, stop, max_rows):
+        """Choose the coarsest level that still has at least `max_rows` rows in `start:stop`.
+
+        Parameters
+        ----------
+        start, stop : int
+            Window of full resolution rows.
+        max_rows : int
+            Number of rows available to display the window (e.g., figure height in pixels).
+
+        Returns
+        -------
+        factor, img, depths
+            The level's factor (1 if no level is coarse enough), and windowed arrays of that level.
+            Returns `None` for `img` and `depths` if `factor == 1`.
+        """
+        for factor, img, depths in reversed(list(zip(self.factors, self.imgs, self.depths))):
+            if (stop - start) / factor >= max_rows:
+                lo, hi = start // factor, -(-stop // factor)
+                return factor, img[lo:hi], depths[lo:hi]
+
+        return 1, None, None
+
+    def save(self, fpath):
+        """Save all levels to a single '.npz' file."""
+        arrays = {"factors": np.array(self.factors)}
+        for factor, img, depths in zip(self.factors, self.imgs, self.depths):
+            arrays[f"img_{factor}"], arrays[f"depths_{factor}"] = img, depths
+        np.savez(str(fpath), **arrays)
+
+    @classmethod
+    def load(cls, fpath):
+        """Load a pyramid saved with ``save``."""
+        with np.load(str(fpath)) as arrays:
+            factors = arrays["factors"].tolist()
+            imgs = [arrays[f"img_{f}"] for f in factors]
+            depths = [arrays[f"depths_{f}"] for f in factors]
+        return cls(factors, imgs, depths)
+
+    def __repr__(self):
+        shapes = ", ".join(f"{f}: {img.shape}" for f, img in zip(self.factors, self.imgs))
+        return f"ImagePyramid({shapes})"
+
+
+def _downsample(img, depths, factor, block_rows):
+    """Downsample `img` by `factor` along rows and width (mean of blocks), and `depths` to match."""
+    height, width, channels = img.shape
+    block_rows = max(block_rows - block_rows % factor, factor)
+
+    out = np.empty((-(-height // factor), -(-width // factor), channels), dtype=img.dtype)
+
+    for i in range(0, height, block_rows):
+        block = np.asarray(img[i:i+block_rows], dtype=np.float32)
+
+        # replicate the last row/column of blocks that don't divide evenly
+        pads = ((0, -block.shape[0] % factor), (0, -width % factor), (0, 0))
+        if pads[0][1] or pads[1][1]:
+            block = np.pad(block, pads, mode="edge")
+
+        r, w = block.shape[0] // factor, block.shape[1] // factor
+        means = block.reshape(r, factor, w, factor, channels).mean(axis=(1, 3))
+
+        if np.issubdtype(img.dtype, np.integer):
+            means = np.rint(means)
+        out[i//factor:i//factor+r] = means.astype(img.dtype)
+
+    padded = np.pad(depths, (0, -depths.size % factor), mode="edge")
+    return out, padded.reshape(-1, factor).mean(axis=1)
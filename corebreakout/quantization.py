@@ -0,0 +1,103 @@
+"""
+Compact (quantized) storage of ``CoreColumn`` images.
+
+A quantized image stores integer or half-precision `codes`, with ``values = codes * scale + offset``.
+Conversions run in row blocks, so that float images (e.g., from ``rgb2gray`` or resampling)
+can be quantized (and dequantized) without any full-size float temporaries.
+"""
+import numpy as np
+
+
+# Dtypes that images can be quantized to
+DTYPES = ["uint8", "uint16", "float16"]
+
+# Number of rows converted per block
+DEFAULT_BLOCK_ROWS = 4096
+
+# Default dtype of dequantized values
+VALUES_DTYPE = np.float32
+
+
+def value_range(img, block_rows=DEFAULT_BLOCK_ROWS):
+    """Get the `(min, max)` of `img`, reading `block_rows` rows at a time."""
+    lo, hi = np.inf, -np.inf
+    for i in range(0, img.shape[0], block_rows):
+        block = img[i:i+block_rows]
+        lo, hi = min(lo, float(block.min())), max(hi, float(block.max()))
+    return lo, hi
+
+
+def quant_params(value_range, dtype):
+    """Get the `(scale, offset)` that map `value_range` onto the codes of `dtype`."""
+    dtype = np.dtype(dtype)
+    lo, hi = value_range
+
+    if np.issubdtype(dtype, np.integer):
+        levels = np.iinfo(dtype).max
+        scale = (hi - lo) / levels if hi > lo else 1.0
+        return float(scale), float(lo)
+
+    # floats are only scaled (about zero) if they would overflow
+    max_abs = max(abs(lo), abs(hi))
+    limit = float(np.finfo(dtype).max)
+    return (max_abs / limit if max_abs > limit else 1.0), 0.0
+
+
+def to_codes(values, scale, offset, dtype):
+    """Codes of float `values` as `dtype` (rounded and clipped for integer types)."""
+    dtype = np.dtype(dtype)
+    codes = (np.asarray(values, dtype=np.float64) - offset) / scale
+    if np.issubdtype(dtype, np.integer):
+        info = np.iinfo(dtype)
+        codes = np.clip(np.rint(codes), info.min, info.max)
+    return codes.astype(dtype)
+
+
+def code_range(scale, offset, dtype):
+    """The `(min, max)` values that codes of `dtype` can represent."""
+    dtype = np.dtype(dtype)
+    info = np.iinfo(dtype) if np.issubdtype(dtype, np.integer) else np.finfo(dtype)
+    return float(info.min) * scale + offset, float(info.max) * scale + offset
+
+
+def quantize_into(img, out, scale, offset, block_rows=DEFAULT_BLOCK_ROWS):
+    """Write the codes of `img` values into `out` (e.g., a memory-mapped array), in row blocks.
+
+    `out` may be wider than `img`, in which case only its first `img.shape[1]` columns are written.
+    """
+    assert out.shape[0] == img.shape[0], "`out` must have the same number of rows as `img`"
+
+    for i in range(0, img.shape[0], block_rows):
+        codes = to_codes(img[i:i+block_rows], scale, offset, out.dtype)
+        out[i:i+codes.shape[0], :img.shape[1]] = codes
+
+    return out
+
+
+def dequantize(codes, scale, offset, dtype=VALUES_DTYPE):
+    """Values of `codes` (any array or slice of codes) as `dtype`."""
+    values = np.asarray(codes, dtype=dtype) * dtype(scale)
+    values += dtype(offset)
+    return values
+
+
+class DequantizedRows:
+    """Array-like view of the values of a quantized image, dequantized on indexing.
+
+    Supports ``shape``, ``dtype``, ``len`` and ``[]`` indexing (e.g., ``values[a:b]``), and
+    ``np.asarray(values)`` to dequantize the whole image.
+    """
+
+    def __init__(self, codes, scale, offset, dtype=VALUES_DTYPE):
+        self.codes, self.scale, self.offset = codes, scale, offset
+        self.dtype = np.dtype(dtype)
+        self.shape, self.ndim = codes.shape, codes.ndim
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, key):
+        return dequantize(self.codes[key], self.scale, self.offset, self.dtype.type)
+
+    def __array__(self, dtype=None):
+        return dequantize(self.codes, self.scale, self.offset, np.dtype(dtype or self.dtype).type)
@@ -0,0 +1,223 @@
+"""
+Ragged, mask-aware storage of column images.
+
+Segmented column images are mostly zero background: ``utils.crop_region`` masks each crop,
+and ``utils.vstack_images`` zero-pads narrower crops. A ``RaggedImage`` records the valid pixel
+extent ``[starts[i], stops[i])`` of each row, and packs only the pixels inside those extents.
+Indexing it like an array (``img[a:b]``) materializes just the requested rows as a dense array.
+"""
+import operator
+
+import numpy as np
+
+
+# Number of rows packed per block in ``RaggedImage.from_dense``
+DEFAULT_BLOCK_ROWS = 4096
+
+
+def row_extents(valid):
+    """Get `(starts, stops)` of the first and last+1 True column of each row of 2D `valid`.
+
+    Rows with no True values get `starts == stops == 0`.
+    """
+    width = valid.shape[1]
+    any_valid = valid.any(axis=1)
+
+    starts = np.where(any_valid, np.argmax(valid, axis=1), 0)
+    stops = np.where(any_valid, width - np.argmax(valid[:, ::-1], axis=1), 0)
+
+    return starts.astype(np.int64), stops.astype(np.int64)
+
+
+def row_indices(rows, height):
+    """Normalize row index `rows` (int, slice, or int/bool array) of an image `height` rows tall.
+
+    Returns an int64 array of the selected rows, with negative indices wrapped, without building
+    a full-height `np.arange(height)`. Raises `IndexError` for rows out of range.
+    """
+    if isinstance(rows, slice):
+        return np.arange(*rows.indices(height), dtype=np.int64)
+
+    if np.ndim(rows) == 0:
+        idxs = np.array([operator.index(rows)], dtype=np.int64)
+    else:
+        idxs = np.asarray(rows).reshape(-1)
+        if idxs.dtype == bool:
+            if idxs.size != height:
+                raise IndexError(f"boolean index of size {idxs.size} for height {height}")
+            return np.flatnonzero(idxs)
+        if idxs.size > 0 and not np.issubdtype(idxs.dtype, np.integer):
+            raise IndexError(f"row indices must be integers or booleans, not {idxs.dtype}")
+        idxs = idxs.astype(np.int64)
+
+    idxs = np.where(idxs < 0, idxs + height, idxs)
+    if idxs.size > 0 and (idxs.min() < 0 or idxs.max() >= height):
+        raise IndexError(f"row index {rows} out of range for height {height}")
+    return idxs
+
+
+class RaggedImage:
+    """Image of `shape` (height, width, channels) that stores only each row's valid extent.
+
+    Supports ``shape``, ``dtype``, ``ndim``, ``len``, row indexing with ints, slices or arrays
+    (optionally followed by width/channel indices), and ``np.asarray(img)``, all of which return
+    dense arrays with zeros outside of the valid extents.
+
+    Parameters
+    ----------
+    values : array
+        Packed `(num_valid, channels)` pixels of all rows, in row-major order.
+    starts, stops : array(int)
+        Valid column range `[starts[i], stops[i])` of each row.
+    width : int
+        Width of the dense image.
+    """
+
+    def __init__(self, values, starts, stops, width):
+        self.values = values
+        self.starts = np.asarray(starts, dtype=np.int64)
+        self.stops = np.asarray(stops, dtype=np.int64)
+        assert self.starts.shape == self.stops.shape, "Must have a stop for each start"
+        assert np.all(self.stops >= self.starts) and np.all(self.stops <= width), "Invalid extents"
+
+        self.offsets = np.concatenate([[0], np.cumsum(self.stops - self.starts)])
+        assert self.offsets[-1] == values.shape[0], "`values` must hold every valid pixel"
+
+        self.shape = (self.starts.size, width, values.shape[1])
+        self.dtype, self.ndim = values.dtype, 3
+
+    @classmethod
+    def from_dense(cls, img, mask=None, block_rows=DEFAULT_BLOCK_ROWS):
+        """Pack a dense (H, W, C) `img` (e.g., memory-mapped), reading `block_rows` at a time.
+
+        Row extents span the nonzero pixels of each row, or the True pixels of 2D `mask`.
+        Any zero pixels inside of an extent are kept.
+        """
+        if img.ndim == 2:
+            img = img[:, :, np.newaxis]
+        height, width, channels = img.shape
+        assert mask is None or mask.shape == (height, width), "`mask` must be (height, width)"
+
+        starts, stops, values = [], [], []
+        for i in range(0, height, block_rows):
+            block = np.asarray(img[i:i+block_rows])
+            valid = block.any(axis=2) if mask is None else np.asarray(mask[i:i+block_rows])
+
+            block_starts, block_stops = row_extents(valid)
+            starts.append(block_starts)
+            stops.append(block_stops)
+            values.append(block[_extent_mask(block_starts, block_stops, width)])
+
+        values = np.concatenate(values) if values else np.empty((0, channels), dtype=img.dtype)
+        return cls(values, np.concatenate(starts), np.concatenate(stops), width)
+
+    @classmethod
+    def concatenate(cls, images, width=None):
+        """Stack ``RaggedImage``s (or integer numbers of empty rows) vertically."""
+        ragged = [img for img in images if isinstance(img, RaggedImage)]
+        assert ragged, "Must give at least one `RaggedImage`"
+        width = width or max(img.shape[1] for img in ragged)
+
+        empty = lambda n: np.zeros(n, dtype=np.int64)
+        starts = [img.starts if isinstance(img, RaggedImage) else empty(img) for img in images]
+        stops = [img.stops if isinstance(img, RaggedImage) else empty(img) for img in images]
+        values = np.concatenate([img.values for img in ragged])
+
+        return cls(values, np.concatenate(starts), np.concatenate(stops), width)
+
+    def __len__(self):
+        return self.shape[0]
+
+    @property
+    def nbytes(self):
+        """Bytes used by packed values and row extents."""
+        return self.values.nbytes + self.starts.nbytes + self.stops.nbytes + self.offsets.nbytes
+
+    @property
+    def density(self):
+        """Fraction of dense image pixels that are stored."""
+        return self.values.shape[0] / max(self.shape[0] * self.shape[1], 1)
+
+    @property
+    def lengths(self):
+        """Number of valid pixels in each row."""
+        return self.stops - self.starts
+
+    def row(self, i):
+        """The valid `(length, channels)` pixels of row `i` (a view of `values`)."""
+        return self.values[self.offsets[i]:self.offsets[i+1]]
+
+    def slice_rows(self, start, stop):
+        """``RaggedImage`` of rows `start:stop`, sharing this image's `values`."""
+        start, stop, _ = slice(start, stop).indices(self.shape[0])
+        stop = max(start, stop)
+        values = self.values[self.offsets[start]:self.offsets[stop]]
+        return RaggedImage(values, self.starts[start:stop], self.stops[start:stop], self.shape[1])
+
+    def row_sums(self):
+        """Sum of the valid pixels of each row, shape `(height, channels)`, as float64."""
+        sums = np.zeros((self.shape[0], self.shape[2]))
+        nonempty = self.lengths > 0
+        if nonempty.any():
+            reduced = np.add.reduceat(self.values.astype(np.float64), self.offsets[:-1][nonempty])
+            sums[nonempty] = reduced
+        return sums
+
+    def row_means(self):
+        """Mean of the valid pixels of each row (NaN for empty rows), ignoring background."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.row_sums() / self.lengths[:, np.newaxis]
+
+    def __getitem__(self, key):
+        rows, rest = (key[0], key[1:]) if isinstance(key, tuple) else (key, ())
+
+        if isinstance(rows, slice) and rows.step in (None, 1):
+            start, stop, _ = rows.indices(self.shape[0])
+            arr = self._dense(np.arange(start, max(start, stop)), contiguous=True)
+        elif not isinstance(rows, slice) and np.ndim(rows) == 0:
+            return self._dense(row_indices(rows, self.shape[0]))[0][rest]
+        else:
+            arr = self._dense(row_indices(rows, self.shape[0]))
+
+        # the rows have already been selected
+        return arr[(slice(None),) + rest]
+
+    def _dense(self, idxs, contiguous=False):
+        """Dense `(len(idxs), width, channels)` array of rows `idxs`."""
+        out = np.zeros((idxs.size,) + self.shape[1:], dtype=self.dtype)
+        if idxs.size == 0:
+            return out
+
+        starts, stops = self.starts[idxs], self.stops[idxs]
+        if contiguous:
+            values = self.values[self.offsets[idxs[0]]:self.offsets[idxs[-1] + 1]]
+        else:
+            values = np.concatenate([self.row(i) for i in idxs])
+
+        # boolean assignment fills row-major, the same order that `values` are packed in
+        out[_extent_mask(starts, stops, self.shape[1])] = values
+        return out
+
+    def __array__(self, dtype=None):
+        arr = self._dense(np.arange(self.shape[0]), contiguous=True)
+        return arr if dtype is None else arr.astype(dtype)
+
+    def save(self, fpath):
+        """Save packed values and row extents to an '.npz' file."""
+        np.savez(str(fpath), values=self.values, starts=self.starts, stops=self.stops,
+                 width=self.shape[1])
+
+    @classmethod
+    def load(cls, fpath):
+        """Load a ``RaggedImage`` saved with ``save``."""
+        with np.load(str(fpath)) as arrays:
+            return cls(arrays["values"], arrays["starts"], arrays["stops"], int(arrays["width"]))
+
+    def __repr__(self):
+        return f"RaggedImage(shape={self.shape}, dtype={self.dtype}, density={self.density:.3f})"
+
+
+def _extent_mask(starts, stops, width):
+    """Boolean `(len(starts), width)` mask of the pixels inside each row's extent."""
+    cols = np.arange(width)
+    return (cols >= starts[:, np.newaxis]) & (cols < stops[:, np.newaxis])
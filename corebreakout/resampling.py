@@ -0,0 +1,140 @@
+"""
+Block-wise, multi-threaded depth resampling of ``CoreColumn`` images.
+
+Output rows are processed in blocks of ``block_rows``, and each block only reads the
+source rows that it spans, so columns can be resampled from (and into) memory-mapped arrays.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from corebreakout.depthaxis import DepthAxis
+
+
+# Number of output rows computed per block (per worker thread)
+DEFAULT_BLOCK_ROWS = 512
+
+METHODS = ["linear", "area"]
+
+
+def uniform_grid(first, last, dd):
+    """``DepthAxis`` with spacing `dd`, starting at `first` and not extending past `last`."""
+    assert dd > 0.0, "`dd` must be positive"
+    num = int(np.floor((last - first) / dd + 1e-9)) + 1
+    return DepthAxis.uniform(first, first + (num - 1) * dd, num)
+
+
+def resample_into(column, grid, out, method="linear", block_rows=DEFAULT_BLOCK_ROWS, n_jobs=None):
+    """Resample `column.img` to depths `grid`, writing the result rows into `out`.
+
+    Parameters
+    ----------
+    column : CoreColumn
+        The column to resample. `img` may be memory-mapped.
+    grid : array or DepthAxis
+        Monotonic depths to resample to. Depths outside of the column take the edge rows.
+    out : array
+        Output array (may be memory-mapped) with shape `(len(grid), >=width, channels)`.
+        Any extra width is left as is (e.g., zeros for a wider multi-well array).
+    method : one of {'linear', 'area'}, optional
+        'linear' interpolates between the two nearest rows. 'area' averages all source rows
+        overlapping each output row's depth interval (better for downsampling). Default='linear'.
+    block_rows : int, optional
+        Number of output rows per block, default=`DEFAULT_BLOCK_ROWS`.
+    n_jobs : int, optional
+        Number of worker threads, default=None uses `os.cpu_count()`.
+
+    Returns
+    -------
+    out
+    """
+    assert method in METHODS, f"{method} not a valid resampling `method`, must be in {METHODS}"
+    num = len(grid)
+    assert out.shape[0] == num, "`out` must have one row per `grid` depth"
+    assert out.shape[1] >= column.width, "`out` must be at least as wide as `column`"
+    assert out.shape[2] == column.channels, "`out` must have the same channels as `column`"
+
+    block_fn = _linear_block if method == "linear" else _area_block
+    write_block = lambda j0: block_fn(column, grid, out, j0, min(j0 + block_rows, num))
+
+    with ThreadPoolExecutor(max_workers=n_jobs or os.cpu_count()) as pool:
+        # consume the iterator so that any exception is raised here
+        list(pool.map(write_block, range(0, num, block_rows)))
+
+    return out
+
+
+def _grid_values(grid, idxs):
+    """Values of `grid` at integer `idxs`, linearly extrapolated beyond either end."""
+    num = len(grid)
+    at = lambda i: grid.value_at(i) if isinstance(grid, DepthAxis) else np.asarray(grid)[i]
+
+    values = at(np.clip(idxs, 0, num - 1)).astype(float)
+    if num > 1:
+        lo_step = at(1) - at(0)
+        hi_step = at(num - 1) - at(num - 2)
+        values = np.where(idxs < 0, at(0) + idxs * lo_step, values)
+        values = np.where(idxs > num - 1, at(num - 1) + (idxs - num + 1) * hi_step, values)
+
+    return values
+
+
+def _source_rows(column, depths):
+    """Fractional source rows of `depths`, clamped to the first and last rows."""
+    first_depth, last_depth = column._edge_depths()
+    return column.rows_at(np.clip(depths, first_depth, last_depth))
+
+
+def _cast(values, dtype):
+    """Cast float `values` to `dtype`, rounding and clipping for integer types."""
+    if np.issubdtype(dtype, np.integer):
+        info = np.iinfo(dtype)
+        return np.clip(np.rint(values), info.min, info.max).astype(dtype)
+    return values.astype(dtype)
+
+
+def _linear_block(column, grid, out, j0, j1):
+    """Write output rows `j0:j1` by linear interpolation of the two nearest source rows."""
+    rows = _source_rows(column, _grid_values(grid, np.arange(j0, j1)))
+
+    i0 = np.floor(rows).astype(int)
+    i1 = np.minimum(i0 + 1, column.height - 1)
+    frac = (rows - i0)[:, np.newaxis, np.newaxis]
+
+    # float32 is enough for integer images, but float64 images keep their precision
+    dtype = np.result_type(column.img.dtype, np.float32)
+    upper = column.img[i0].astype(dtype)
+    lower = column.img[i1].astype(dtype)
+
+    out[j0:j1, :column.width] = _cast(upper + frac * (lower - upper), out.dtype)
+
+
+def _area_block(column, grid, out, j0, j1):
+    """Write output rows `j0:j1` as overlap-weighted means of the source rows they cover."""
+    first_depth, last_depth = column._edge_depths()
+
+    # depth edges of each output row are midpoints between adjacent grid depths
+    centers = _grid_values(grid, np.arange(j0 - 1, j1 + 1))
+    edges = (centers[:-1] + centers[1:]) / 2
+
+    # source row `i` covers `[i, i+1)` in these coordinates
+    u = _source_rows(column, edges) + 0.5
+    u = np.where(edges <= first_depth, 0.0, np.where(edges >= last_depth, column.height, u))
+
+    k0 = int(np.floor(u.min()))
+    k1 = min(int(np.ceil(u.max())) + 1, column.height)
+
+    src = column.img[k0:k1].astype(np.float64)
+    cumsum = np.concatenate([np.zeros((1,) + src.shape[1:]), np.cumsum(src, axis=0)])
+
+    # integral of rows up to each edge, with partial coverage of the row it falls in
+    fl = np.clip(np.floor(u).astype(int), k0, k1 - 1)
+    frac = (u - fl)[:, np.newaxis, np.newaxis]
+    integral = cumsum[fl - k0] + frac * src[fl - k0]
+
+    widths = np.diff(u)[:, np.newaxis, np.newaxis]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = np.where(widths > 0, np.diff(integral, axis=0) / widths, src[fl[:-1] - k0])
+
+    out[j0:j1, :column.width] = _cast(means, out.dtype)
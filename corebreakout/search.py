@@ -0,0 +1,261 @@
+"""
+Similarity search over fixed-size windows of ``CoreColumn`` images.
+
+Each window (a chunk of rows, as in ``CoreColumn.iter_chunks``) is embedded into a compact
+descriptor vector, e.g., colour and texture histograms of its non-zero pixels, or any function
+of the window image. ``WindowIndex`` stores the descriptors of windows from many wells in an
+inverted file (IVF) index: descriptors are grouped by their nearest k-means centroid, and a
+query only scans the lists of its `n_probe` nearest centroids.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+# Number of rows compared to centroids at a time
+ASSIGN_BLOCK_ROWS = 65536
+
+
+def _value_max(img):
+    """Upper end of the value range of integer dtypes, or 1.0 for float images."""
+    return float(np.iinfo(img.dtype).max) if np.issubdtype(img.dtype, np.integer) else 1.0
+
+
+def _normalized_histogram(values, bins, value_range):
+    counts, _ = np.histogram(values, bins=bins, range=value_range)
+    return counts / max(counts.sum(), 1)
+
+
+def color_histogram(img, bins=8):
+    """Concatenated per-channel histograms of the non-zero pixels of `img`, each summing to 1."""
+    img = img[:, :, np.newaxis] if img.ndim == 2 else img
+    pixels = img[img.any(axis=2)]
+    value_range = (0.0, _value_max(img))
+
+    return np.concatenate([
+        _normalized_histogram(pixels[:, c], bins, value_range) for c in range(img.shape[2])
+    ])
+
+
+def texture_histogram(img, bins=8):
+    """Histogram of grayscale gradient magnitudes between adjacent non-zero pixels of `img`."""
+    img = img[:, :, np.newaxis] if img.ndim == 2 else img
+    gray = img.astype(np.float32).mean(axis=2) / _value_max(img)
+    valid = img.any(axis=2)
+
+    # forward differences, only where both pixels are valid
+    dy = np.abs(np.diff(gray, axis=0))[valid[1:] & valid[:-1]]
+    dx = np.abs(np.diff(gray, axis=1))[valid[:, 1:] & valid[:, :-1]]
+
+    return _normalized_histogram(np.concatenate([dy, dx]), bins, (0.0, 0.5))
+
+
+def color_texture(img, bins=8):
+    """``color_histogram`` followed by ``texture_histogram`` of `img`."""
+    return np.concatenate([color_histogram(img, bins), texture_histogram(img, bins)])
+
+
+# Built-in descriptor functions, by name
+DESCRIPTORS = {
+    "color": color_histogram,
+    "texture": texture_histogram,
+    "color_texture": color_texture,
+}
+
+
+def _sq_distances(x, centers):
+    """Squared euclidean distances between rows of `x` and `centers`."""
+    d = (x * x).sum(axis=1)[:, np.newaxis] - 2 * x @ centers.T + (centers * centers).sum(axis=1)
+    return np.maximum(d, 0.0)
+
+
+def _nearest(x, centers):
+    """Index of the nearest of `centers` to each row of `x`, computed in blocks."""
+    return np.concatenate([
+        _sq_distances(x[i:i+ASSIGN_BLOCK_ROWS], centers).argmin(axis=1)
+        for i in range(0, x.shape[0], ASSIGN_BLOCK_ROWS)
+    ]) if x.shape[0] else np.zeros(0, dtype=int)
+
+
+def kmeans(x, k, n_iter=10, seed=0):
+    """Lloyd's k-means of rows of `x`, starting from `k` random rows. Returns `centers`."""
+    random = np.random.RandomState(seed)
+    centers = x[random.choice(x.shape[0], size=k, replace=False)].copy()
+
+    for _ in range(n_iter):
+        labels = _nearest(x, centers)
+        counts = np.bincount(labels, minlength=k)
+        sums = np.zeros_like(centers)
+        np.add.at(sums, labels, x)
+        # empty clusters keep their previous center
+        nonempty = counts > 0
+        centers[nonempty] = sums[nonempty] / counts[nonempty, np.newaxis]
+
+    return centers
+
+
+class WindowIndex:
+    """Index of window descriptors from many wells, for nearest neighbour queries.
+
+    Parameters
+    ----------
+    descriptor : str or callable, optional
+        One of `DESCRIPTORS`, or a function of a window image `(rows, width, channels)`
+        returning a 1D vector. Default='color_texture'.
+
+    Attributes
+    ----------
+    vectors : array
+        `(num_windows, dim)` float32 descriptors.
+    wells : array(str)
+        Well of each window.
+    tops, bases : array
+        Depth of the first and last row of each window.
+    """
+
+    def __init__(self, descriptor="color_texture"):
+        if isinstance(descriptor, str):
+            assert descriptor in DESCRIPTORS, f"{descriptor} not in {list(DESCRIPTORS)}"
+        self.descriptor = descriptor
+
+        self.vectors = np.zeros((0, 0), dtype=np.float32)
+        self.wells = np.array([], dtype=str)
+        self.tops, self.bases = np.zeros(0), np.zeros(0)
+
+        # IVF lists: window ids sorted by list, and offsets of each list
+        self.centroids, self.ids, self.offsets = None, None, None
+
+    def __len__(self):
+        return self.vectors.shape[0]
+
+    @property
+    def is_built(self):
+        """Whether the IVF lists are built and up to date (otherwise queries are exact)."""
+        return self.centroids is not None
+
+    def describe(self, img):
+        """Descriptor vector of window image `img`."""
+        fn = DESCRIPTORS[self.descriptor] if isinstance(self.descriptor, str) else self.descriptor
+        return np.asarray(fn(np.asarray(img)), dtype=np.float32).ravel()
+
+    def add(self, well, column, chunk_size, step_size=None, n_jobs=None):
+        """Describe windows of `column` (like ``iter_chunks(chunk_size, step_size)``) and add them.
+
+        Windows are read and described on `n_jobs` threads. Quantized columns are described by
+        their dequantized ``values``. Adding windows invalidates any built IVF lists.
+        """
+        step_size = step_size or chunk_size
+        values = column.values
+
+        def describe(start):
+            stop = min(start + chunk_size, column.height)
+            depths = column._depths_at_index(np.array([start, stop - 1]))
+            return self.describe(values[start:stop]), depths[0], depths[1]
+
+        with ThreadPoolExecutor(max_workers=n_jobs or os.cpu_count()) as pool:
+            results = list(pool.map(describe, range(0, column.height, step_size)))
+        if not results:
+            return self
+
+        vectors = np.stack([r[0] for r in results])
+        self.vectors = np.concatenate([self.vectors, vectors]) if len(self) else vectors
+        self.wells = np.concatenate([self.wells, [well] * len(results)])
+        self.tops = np.concatenate([self.tops, [r[1] for r in results]])
+        self.bases = np.concatenate([self.bases, [r[2] for r in results]])
+
+        self.centroids, self.ids, self.offsets = None, None, None
+        return self
+
+    def build(self, n_lists=None, n_iter=10, seed=0):
+        """Cluster descriptors into `n_lists` IVF lists, default=None uses `sqrt(len(self))`."""
+        assert len(self) > 0, "Must `add` windows before building"
+        n_lists = min(n_lists or max(int(np.sqrt(len(self))), 1), len(self))
+
+        self.centroids = kmeans(self.vectors, n_lists, n_iter=n_iter, seed=seed)
+        labels = _nearest(self.vectors, self.centroids)
+
+        self.ids = np.argsort(labels, kind="stable")
+        self.offsets = np.searchsorted(labels[self.ids], np.arange(n_lists + 1))
+        return self
+
+    def query(self, query, k=10, n_probe=8, exclude_well=None):
+        """Find the `k` windows nearest to `query`.
+
+        Parameters
+        ----------
+        query : array
+            A descriptor vector, or a window image (2D or 3D) to describe.
+        k : int, optional
+            Number of neighbours, default=10.
+        n_probe : int, optional
+            Number of nearest IVF lists to scan, if built (otherwise all windows are scanned).
+            More lists are more accurate and slower. Default=8.
+        exclude_well : str, optional
+            Skip windows from this well (e.g., the well the query came from).
+
+        Returns
+        -------
+        matches : list(tuple)
+            `(well, top, base, distance)` of each match, nearest first.
+        """
+        vector = self.describe(query) if np.ndim(query) > 1 else np.asarray(query, np.float32)
+        vector = vector[np.newaxis]
+
+        if self.is_built:
+            lists = np.argsort(_sq_distances(vector, self.centroids)[0])[:n_probe]
+            candidates = np.concatenate([
+                self.ids[self.offsets[l]:self.offsets[l+1]] for l in lists
+            ])
+        else:
+            candidates = np.arange(len(self))
+
+        if exclude_well is not None:
+            candidates = candidates[self.wells[candidates] != exclude_well]
+
+        distances = np.sqrt(_sq_distances(vector, self.vectors[candidates])[0])
+        nearest = np.argsort(distances, kind="stable")[:k]
+
+        return [
+            (self.wells[i], self.tops[i], self.bases[i], d)
+            for i, d in zip(candidates[nearest], distances[nearest])
+        ]
+
+    def query_interval(self, column, top, base, **kwargs):
+        """``query`` with the window of `column` between depths `top` and `base`."""
+        start, stop = column.rows_between(top, base)
+        assert stop > start, f"No rows between {top} and {base}"
+        return self.query(column.values[start:stop], **kwargs)
+
+    def save(self, fpath):
+        """Save descriptors, windows and any IVF lists to an '.npz' file.
+
+        A callable `descriptor` is not saved, so pass it again to ``load``.
+        """
+        arrays = dict(vectors=self.vectors, wells=self.wells, tops=self.tops, bases=self.bases)
+        if self.is_built:
+            arrays.update(centroids=self.centroids, ids=self.ids, offsets=self.offsets)
+        if isinstance(self.descriptor, str):
+            arrays["descriptor"] = self.descriptor
+        np.savez(str(fpath), **arrays)
+
+    @classmethod
+    def load(cls, fpath, descriptor=None):
+        """Load an index saved with ``save``. `descriptor` is required if it was a callable."""
+        with np.load(str(fpath)) as arrays:
+            if descriptor is None:
+                assert "descriptor" in arrays.files, "Must pass the custom `descriptor` function"
+                descriptor = str(arrays["descriptor"])
+
+            index = cls(descriptor)
+            index.vectors, index.wells = arrays["vectors"], arrays["wells"]
+            index.tops, index.bases = arrays["tops"], arrays["bases"]
+            if "centroids" in arrays.files:
+                index.centroids, index.ids = arrays["centroids"], arrays["ids"]
+                index.offsets = arrays["offsets"]
+
+        return index
+
+    def __repr__(self):
+        ivf = f"{self.centroids.shape[0]} lists" if self.is_built else "not built"
+        return f"WindowIndex({len(self)} windows from {np.unique(self.wells).size} wells, {ivf})"
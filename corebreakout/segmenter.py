@@ -5,8 +5,6 @@ Mask R-CNN implementation from ``mrcnn`` package @ matterport/Mask_RCNN
 A ``model_dir`` and ``weights_path`` are required to instantiate a ``CoreSegmenter``
 """
 from pathlib import Path
-from operator import add
-from functools import reduce
 from math import ceil
 
 import numpy as np
@@ -14,7 +12,7 @@ from skimage import io, measure
 
 import mrcnn.model as modellib
 
-from corebreakout import CoreColumn
+from corebreakout import CoreColumn, CoreColumnBuilder
 from corebreakout import defaults, utils, viz
 
 
@@ -232,7 +230,7 @@ class CoreSegmenter:
         cols[-1] = cols[-1].slice_depth(base=depth_range[1])
 
         # Return the concatenation of all column objects
-        return reduce(add, cols)
+        return CoreColumn.concat(cols)
 
 
     def segment_all(self, imgs, depth_ranges, **kwargs):
@@ -256,10 +254,11 @@ class CoreSegmenter:
             depth_ranges
         ), "Should pass equal number of images and ranges."
 
-        return reduce(
-            add,
-            [self.segment(img, dr, **kwargs) for img, dr in zip(imgs, depth_ranges)],
-        )
+        builder = CoreColumnBuilder()
+        for img, dr in zip(imgs, depth_ranges):
+            builder.append(self.segment(img, dr, **kwargs))
+
+        return builder.build()
 
 
     @staticmethod
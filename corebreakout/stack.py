@@ -0,0 +1,238 @@
+"""
+Multi-well stacks of ``CoreColumn``s resampled to a common depth grid and width.
+
+A ``WellStack`` holds a `(wells, rows, width, channels)` image array (usually memory-mapped),
+plus a `(wells, rows)` validity mask that is False at depths where a well has no core.
+``WellStack.build`` resamples each column in row blocks straight into the output array,
+processing wells in parallel, so the stack never has to fit in memory.
+"""
+import os
+import json
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from corebreakout import resampling
+from corebreakout.column import CoreColumn, SAVE_BLOCK_ROWS
+from corebreakout.depthaxis import DepthAxis
+
+
+def _searchsorted(grid, v, side="left"):
+    if isinstance(grid, DepthAxis):
+        return grid.searchsorted(v, side=side)
+    return int(np.searchsorted(grid, v, side=side))
+
+
+class WellStack:
+    """Images of several wells on a shared depth grid.
+
+    Parameters
+    ----------
+    wells : list(str)
+        Name of each well (first axis of `img` and `mask`).
+    depths : array or DepthAxis
+        The common depth of each row.
+    img : array
+        `(wells, rows, width, channels)` images, zero wherever `mask` is False.
+    mask : array(bool)
+        `(wells, rows)` True where a well has core at that depth.
+    quant : tuple(float), optional
+        Shared `(scale, offset)` if the stacked columns were quantized (see ``CoreColumn.quant``).
+    """
+
+    def __init__(self, wells, depths, img, mask, quant=None):
+        self.wells = list(wells)
+        self.depths, self.img, self.mask = depths, img, mask
+        self.quant = quant
+
+        assert img.ndim == 4, "`img` must be (wells, rows, width, channels)"
+        assert img.shape[:2] == (len(self.wells), len(depths)), "`img` must match wells and depths"
+        assert mask.shape == img.shape[:2], "`mask` must be (wells, rows)"
+
+    @classmethod
+    def build(
+        cls,
+        columns,
+        dd=None,
+        depths=None,
+        width=None,
+        dtype=None,
+        method="linear",
+        path=None,
+        name="WellStack",
+        block_rows=resampling.DEFAULT_BLOCK_ROWS,
+        n_jobs=None,
+    ):
+        """Resample `columns` of several wells into a new stack.
+
+        Parameters
+        ----------
+        columns : dict
+            Of `{well: CoreColumn}`, or `{well: [CoreColumn, ...]}` for wells made of several
+            depth-ordered columns (depths between them are masked, rather than filled).
+            Depths in the 'fill' gaps of a concatenated column (``CoreColumn.gaps``) are masked too.
+        dd : float, optional
+            Spacing of a uniform grid spanning all columns, default=None uses the smallest `dd`.
+        depths : array or DepthAxis, optional
+            Explicit (monotonic) common depth grid. Overrides `dd`.
+        width : int, optional
+            Common width, default=None uses the widest column. Narrower columns are zero-padded.
+        dtype : str or np.dtype, optional
+            Output dtype, default=None uses the result type of all column images.
+        method : one of {'linear', 'area'}, optional
+            Resampling method, default='linear'. See ``resampling.resample_into``.
+        path : str or Path, optional
+            Directory to write '<name>_image.npy' (memory-mapped while it is being filled),
+            '<name>_mask.npy', '<name>_depths.npy' and '<name>_wells.json' to.
+            Default=None builds the stack in memory.
+        block_rows : int, optional
+            Number of output rows resampled per block, default=`resampling.DEFAULT_BLOCK_ROWS`.
+        n_jobs : int, optional
+            Total number of worker threads, default=None uses `os.cpu_count()`.
+            Wells are resampled in parallel, and any remaining threads are used within wells.
+        """
+        wells = list(columns.keys())
+        as_list = lambda cols: list(cols) if isinstance(cols, (list, tuple)) else [cols]
+        segments = [(w, col) for w, well in enumerate(wells) for col in as_list(columns[well])]
+        assert segments, "Must give at least one column"
+        cols = [col for _, col in segments]
+
+        assert len(set(c.channels for c in cols)) == 1, "Columns must have the same `channels`"
+        assert len(set(c.quant for c in cols)) == 1, "Columns must share one `quant` (or none)"
+
+        if depths is None:
+            dd = dd or min(c.dd for c in cols)
+            first = min(c._edge_depths()[0] for c in cols)
+            last = max(c._edge_depths()[1] for c in cols)
+            depths = resampling.uniform_grid(first, last, dd)
+        elif not isinstance(depths, DepthAxis):
+            depths = np.asarray(depths, dtype=float)
+
+        width = width or max(c.width for c in cols)
+        assert all(c.width <= width for c in cols), "`width` must fit the widest column"
+        dtype = dtype or np.result_type(*[c.img.dtype for c in cols])
+        shape = (len(wells), len(depths), width, cols[0].channels)
+
+        if path is not None:
+            path = Path(path)
+            assert path.exists() and path.is_dir(), f"Save location {path} doesnt exist."
+            img = np.lib.format.open_memmap(
+                str(path / (name + "_image.npy")), mode="w+", dtype=dtype, shape=shape
+            )
+        else:
+            img = np.zeros(shape, dtype=dtype)
+        mask = np.zeros(shape[:2], dtype=bool)
+
+        n_jobs = n_jobs or os.cpu_count()
+        outer_jobs = min(n_jobs, len(segments))
+        inner_jobs = max(1, n_jobs // outer_jobs)
+
+        def mask_gaps(w, column, j0, j1):
+            # rows whose nearest source row is in an (unfilled) 'fill' gap have no core
+            for start, stop in column.gaps:
+                lo = column.depths_at(max(start - 0.5, 0))
+                hi = column.depths_at(min(stop - 0.5, column.height - 1))
+                k0 = _searchsorted(depths, lo, side="left")
+                k1 = _searchsorted(depths, hi, side="right" if stop >= column.height else "left")
+                mask[w, max(k0, j0):min(k1, j1)] = False
+
+        def fill(segment):
+            w, column = segment
+            first_depth, last_depth = column._edge_depths()
+            # tolerate float error in grid depths (edge rows are clamped when resampling)
+            eps = 1e-9 * max(1.0, abs(first_depth), abs(last_depth))
+            j0 = _searchsorted(depths, first_depth - eps, side="left")
+            j1 = _searchsorted(depths, last_depth + eps, side="right")
+            if j1 > j0:
+                resampling.resample_into(
+                    column, depths[j0:j1], img[w, j0:j1], method=method,
+                    block_rows=block_rows, n_jobs=inner_jobs,
+                )
+                mask[w, j0:j1] = True
+                mask_gaps(w, column, j0, j1)
+
+        with ThreadPoolExecutor(max_workers=outer_jobs) as pool:
+            # consume the iterator so that any exception is raised here
+            list(pool.map(fill, segments))
+
+        stack = cls(wells, depths, img, mask, quant=cols[0].quant)
+        if path is not None:
+            img.flush()
+            stack._save_metadata(path, name)
+        return stack
+
+    def _save_metadata(self, path, name):
+        np.save(path / (name + "_mask.npy"), self.mask)
+        np.save(path / (name + "_depths.npy"), np.asarray(self.depths, dtype=float))
+        with open(path / (name + "_wells.json"), "w") as f:
+            json.dump({"wells": self.wells, "quant": self.quant}, f)
+
+    def save(self, path, name="WellStack"):
+        """Save the stack to directory `path` as '.npy' files, plus '<name>_wells.json'.
+
+        The image is copied `SAVE_BLOCK_ROWS` rows (of one well) at a time, like ``save_npy``.
+        """
+        path = Path(path)
+        assert path.exists() and path.is_dir(), f"Save location {path} doesnt exist."
+
+        out = np.lib.format.open_memmap(
+            str(path / (name + "_image.npy")), mode="w+", dtype=self.img.dtype, shape=self.shape
+        )
+        for w in range(len(self)):
+            for i in range(0, self.shape[1], SAVE_BLOCK_ROWS):
+                out[w, i:i+SAVE_BLOCK_ROWS] = self.img[w, i:i+SAVE_BLOCK_ROWS]
+        out.flush()
+        del out
+
+        self._save_metadata(path, name)
+
+    @classmethod
+    def load(cls, path, name="WellStack", mmap_mode="r"):
+        """Load a stack saved by ``build`` or ``save``, memory-mapping its image by default."""
+        path = Path(path)
+        with open(path / (name + "_wells.json"), "r") as f:
+            meta = json.load(f)
+
+        quant = meta.get("quant")
+        return cls(
+            meta["wells"],
+            np.load(path / (name + "_depths.npy")),
+            np.load(path / (name + "_image.npy"), mmap_mode=mmap_mode),
+            np.load(path / (name + "_mask.npy")),
+            quant=None if quant is None else tuple(quant),
+        )
+
+    def __len__(self):
+        return len(self.wells)
+
+    @property
+    def shape(self):
+        """`(wells, rows, width, channels)`"""
+        return self.img.shape
+
+    def slice_depth(self, top, base):
+        """Get a ``WellStack`` of the rows between `top` and `base` (views of this stack's arrays)."""
+        assert base > top, "Slice boundaries must maintain depth order."
+        start = _searchsorted(self.depths, top, side="left")
+        stop = _searchsorted(self.depths, base, side="right")
+        assert stop > start, f"No rows between {top} and {base}"
+
+        return WellStack(
+            self.wells, self.depths[start:stop], self.img[:, start:stop],
+            self.mask[:, start:stop], quant=self.quant,
+        )
+
+    def column(self, well):
+        """The ``CoreColumn`` of `well`, trimmed to its first and last valid rows."""
+        w = self.wells.index(well)
+        valid = np.flatnonzero(self.mask[w])
+        assert valid.size > 1, f"Well {well} has less than two valid rows"
+        start, stop = valid[0], valid[-1] + 1
+
+        column = CoreColumn(self.img[w, start:stop], depths=self.depths[start:stop])
+        column._quant = self.quant
+        return column
+
+    def __repr__(self):
+        return f"WellStack of {len(self)} wells, shape={self.shape}"
@@ -0,0 +1,3 @@
+from .hdf5 import HDF5Column, save_hdf5
+from .container import save_container, load_container, read_header
+from .tiles import TiledImage, save_tiles, load_tiles
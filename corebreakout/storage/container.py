@@ -0,0 +1,258 @@
+"""
+Versioned, self-describing binary container for ``CoreColumn`` instances.
+
+Layout of a container file:
+    - prefix : ``MAGIC`` (8 bytes), format version (uint32), header offset and length (uint64)
+    - image blocks : `block_rows` rows each, ``zlib``-compressed independently
+    - depths section : ``zlib``-compressed float64 depths (omitted for analytic ``DepthAxis`` depths)
+    - header : UTF-8 JSON with shape, dtype, top, base, add_tol, add_mode, quant (optional),
+      label tracks (optional), block table and checksums
+
+The header is also written to a '<file>.json' sidecar, so a column's metadata can be read
+without opening the (possibly very large) container. Blocks are compressed and decompressed
+on a thread pool (``zlib`` releases the GIL), and reads touch only the blocks they need.
+"""
+import os
+import json
+import zlib
+import struct
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from corebreakout.column import CoreColumn
+from corebreakout.depthaxis import DepthAxis
+from corebreakout.labels import LabelTrack
+
+
+MAGIC = b"CBCOLUMN"
+FORMAT_VERSION = 1
+
+# magic, version, header offset, header length
+PREFIX = struct.Struct("<8sIQQ")
+
+# Rows per compressed block
+DEFAULT_BLOCK_ROWS = 1024
+
+# Max number of blocks held in memory per worker while writing
+_BLOCKS_PER_WORKER = 4
+
+
+def sidecar_path(fpath):
+    """Path of the JSON header sidecar for container `fpath`."""
+    fpath = Path(fpath)
+    return fpath.with_name(fpath.name + ".json")
+
+
+def save_container(
+    column, fpath, block_rows=DEFAULT_BLOCK_ROWS, level=6, n_jobs=None, sidecar=True
+):
+    """Save `column` to container file `fpath`, compressing image blocks on a thread pool.
+
+    Parameters
+    ----------
+    column : CoreColumn
+        The column to save. `img` may be memory-mapped.
+    fpath : str or Path
+        File to write to (will be overwritten).
+    block_rows : int, optional
+        Number of image rows per compressed block, default=`DEFAULT_BLOCK_ROWS`.
+    level : int, optional
+        ``zlib`` compression level (0-9), default=6.
+    n_jobs : int, optional
+        Number of worker threads, default=None uses `os.cpu_count()`.
+    sidecar : bool, optional
+        Whether to also write the header to '<fpath>.json', default=True.
+
+    Returns
+    -------
+    header : dict
+    """
+    fpath = Path(fpath)
+    n_jobs = n_jobs or os.cpu_count()
+
+    def compress(start):
+        block = np.ascontiguousarray(column.img[start:start+block_rows])
+        return zlib.compress(block, level), zlib.crc32(block)
+
+    blocks = []
+    with open(fpath, "wb") as f, ThreadPoolExecutor(max_workers=n_jobs) as pool:
+        f.write(PREFIX.pack(MAGIC, FORMAT_VERSION, 0, 0))
+
+        # compress a bounded number of blocks at a time, write them in order
+        starts = range(0, column.height, block_rows)
+        group = n_jobs * _BLOCKS_PER_WORKER
+        for i in range(0, len(starts), group):
+            for data, crc in pool.map(compress, starts[i:i+group]):
+                blocks.append([f.tell(), len(data), crc])
+                f.write(data)
+
+        depths = _write_depths(f, column, level)
+
+        header = {
+            "format_version": FORMAT_VERSION,
+            "shape": list(column.img.shape),
+            "dtype": column.img.dtype.str,
+            "top": float(column.top),
+            "base": float(column.base),
+            "add_tol": float(column.add_tol),
+            "add_mode": column.add_mode,
+            "quant": column.quant,
+            "labels": {name: track.to_dict() for name, track in column.labels.items()},
+            "codec": "zlib",
+            "block_rows": block_rows,
+            "blocks": blocks,
+            "depths": depths,
+        }
+
+        header_bytes = json.dumps(header).encode("utf-8")
+        header_offset = f.tell()
+        f.write(header_bytes)
+
+        f.seek(0)
+        f.write(PREFIX.pack(MAGIC, FORMAT_VERSION, header_offset, len(header_bytes)))
+
+    if sidecar:
+        with open(sidecar_path(fpath), "w") as f:
+            json.dump(header, f)
+
+    return header
+
+
+def _write_depths(f, column, level):
+    """Write the depths section of `column` to open file `f`, return its header entry."""
+    if column.depth_axis is not None:
+        axis = column.depth_axis
+        return {
+            "kind": "runs",
+            "starts": axis.starts.tolist(),
+            "stops": axis.stops.tolist(),
+            "counts": axis.counts.tolist(),
+        }
+
+    raw = np.ascontiguousarray(column.depths, dtype=np.float64)
+    data = zlib.compress(raw, level)
+    depths = {
+        "kind": "array",
+        "offset": f.tell(),
+        "nbytes": len(data),
+        "crc32": zlib.crc32(raw),
+    }
+    f.write(data)
+    return depths
+
+
+def read_header(fpath, use_sidecar=True):
+    """Read only the header of container `fpath` (from its sidecar, if present)."""
+    fpath = Path(fpath)
+
+    if use_sidecar and sidecar_path(fpath).is_file():
+        with open(sidecar_path(fpath), "r") as f:
+            return json.load(f)
+
+    with open(fpath, "rb") as f:
+        magic, version, offset, length = PREFIX.unpack(f.read(PREFIX.size))
+        if magic != MAGIC:
+            raise ValueError(f"{fpath} is not a CoreColumn container file")
+        if version > FORMAT_VERSION:
+            raise ValueError(
+                f"Container format version {version} is newer than supported {FORMAT_VERSION}"
+            )
+
+        f.seek(offset)
+        return json.loads(f.read(length).decode("utf-8"))
+
+
+def _read_depths(f, header, verify):
+    """Read the depths section of open container `f` as an array or ``DepthAxis``."""
+    depths = header["depths"]
+
+    if depths["kind"] == "runs":
+        return DepthAxis(depths["starts"], depths["stops"], depths["counts"])
+
+    f.seek(depths["offset"])
+    raw = zlib.decompress(f.read(depths["nbytes"]))
+    if verify and zlib.crc32(raw) != depths["crc32"]:
+        raise IOError("Checksum mismatch in container depths")
+
+    return np.frombuffer(raw, dtype=np.float64).copy()
+
+
+def _read_rows(fpath, header, start, stop, n_jobs, verify):
+    """Decompress image rows `start:stop` from container `fpath`, block-parallel."""
+    height, width, channels = header["shape"]
+    dtype, block_rows = np.dtype(header["dtype"]), header["block_rows"]
+
+    out = np.empty((stop - start, width, channels), dtype=dtype)
+    if stop <= start:
+        return out
+
+    def read_block(b):
+        offset, nbytes, crc = header["blocks"][b]
+        with open(fpath, "rb") as f:
+            f.seek(offset)
+            raw = zlib.decompress(f.read(nbytes))
+
+        if verify and zlib.crc32(raw) != crc:
+            raise IOError(f"Checksum mismatch in container block {b}")
+
+        b0 = b * block_rows
+        block = np.frombuffer(raw, dtype=dtype).reshape(-1, width, channels)
+        lo, hi = max(start, b0), min(stop, b0 + block.shape[0])
+        out[lo-start:hi-start] = block[lo-b0:hi-b0]
+
+    blocks = range(start // block_rows, (stop - 1) // block_rows + 1)
+    with ThreadPoolExecutor(max_workers=n_jobs or os.cpu_count()) as pool:
+        list(pool.map(read_block, blocks))
+
+    return out
+
+
+def load_container(fpath, top=None, base=None, n_jobs=None, verify=True):
+    """Load a ``CoreColumn`` from container `fpath`, decompressing blocks on a thread pool.
+
+    If `top` and/or `base` are given, only the blocks overlapping that depth range are read,
+    and the result is equivalent to ``column.slice_depth(top, base)``.
+
+    Parameters
+    ----------
+    verify : bool, optional
+        Whether to check the CRC32 checksum of each block read, default=True.
+    """
+    fpath = Path(fpath)
+    header = read_header(fpath, use_sidecar=False)
+
+    if header["codec"] != "zlib":
+        from corebreakout.storage.tiles import load_tiles
+        return load_tiles(fpath, top=top, base=base)
+
+    with open(fpath, "rb") as f:
+        depths = _read_depths(f, header, verify)
+
+    # Use a zero-width placeholder image to find rows with the usual slicing rules
+    height, _, channels = header["shape"]
+    placeholder = np.empty((height, 0, channels), dtype=np.dtype(header["dtype"]))
+    column = CoreColumn._trusted(
+        placeholder, depths, header["top"], header["base"], header["add_tol"], header["add_mode"]
+    )
+
+    start, stop = 0, height
+    if top is not None or base is not None:
+        sliced = column.slice_depth(top, base)
+        if sliced is not column:
+            start, stop = column.rows_between(sliced.top, sliced.base)
+        column = sliced
+
+    img = _read_rows(fpath, header, start, stop, n_jobs, verify)
+    depths = column.depth_axis if column.depth_axis is not None else column.depths
+
+    column = CoreColumn._trusted(
+        img, depths, column.top, column.base, column.add_tol, column.add_mode
+    )
+    # `quant` is an optional header field
+    quant = header.get("quant")
+    column._quant = None if quant is None else tuple(quant)
+    for name, track in header.get("labels", {}).items():
+        column._labels[name] = LabelTrack.from_dict(track).slice(column.top, column.base)
+    return column
@@ -0,0 +1,214 @@
+"""
+Chunked, compressed, depth-indexed HDF5 storage for ``CoreColumn`` instances.
+
+Layout of a saved file:
+    - ``img`` : (height, width, channels) dataset, chunked in blocks of ``chunk_rows`` rows
+    - ``depths`` : (height,) dataset, chunked in the same row blocks as ``img``
+    - ``chunk_index`` : (num_chunks, 2) array of (top, base) depths of each row block
+    - attributes : ``top``, ``base``, ``add_tol``, ``add_mode``, ``chunk_rows``, plus ``quant``
+      and JSON-encoded ``labels`` tracks if the column has them
+"""
+import json
+from pathlib import Path
+
+import h5py
+import numpy as np
+
+from corebreakout.column import CoreColumn
+from corebreakout.labels import LabelTrack
+
+
+# Rows per HDF5 chunk (~0.6 MB for a typical 800px wide RGB column)
+DEFAULT_CHUNK_ROWS = 256
+
+
+def save_hdf5(column, fpath, chunk_rows=DEFAULT_CHUNK_ROWS, compression="gzip", compression_opts=4):
+    """Save `column` to HDF5 file `fpath`, writing one row chunk at a time.
+
+    Parameters
+    ----------
+    column : CoreColumn
+        The column to save. `img` may be memory-mapped.
+    fpath : str or Path
+        File to write to (will be overwritten).
+    chunk_rows : int, optional
+        Number of image rows per stored chunk, default=`DEFAULT_CHUNK_ROWS`.
+    compression : str, optional
+        `h5py` compression filter for `img` (e.g., 'gzip' or 'lzf'), default='gzip'.
+    compression_opts : int, optional
+        Compression level for 'gzip', default=4. Ignored for other filters.
+    """
+    assert chunk_rows > 0, "`chunk_rows` must be positive"
+    chunk_rows = min(chunk_rows, column.height)
+
+    if compression != "gzip":
+        compression_opts = None
+
+    with h5py.File(str(fpath), "w") as f:
+        img_ds = f.create_dataset(
+            "img",
+            shape=column.img.shape,
+            dtype=column.img.dtype,
+            chunks=(chunk_rows, column.width, column.channels),
+            compression=compression,
+            compression_opts=compression_opts,
+        )
+        depths_ds = f.create_dataset(
+            "depths", shape=(column.height,), dtype=column.depths.dtype, chunks=(chunk_rows,)
+        )
+
+        for i in range(0, column.height, chunk_rows):
+            img_ds[i:i+chunk_rows] = column.img[i:i+chunk_rows]
+            depths_ds[i:i+chunk_rows] = column.depths[i:i+chunk_rows]
+
+        starts = np.arange(0, column.height, chunk_rows)
+        ends = np.minimum(starts + chunk_rows, column.height) - 1
+        f.create_dataset(
+            "chunk_index", data=np.stack([column.depths[starts], column.depths[ends]], axis=1)
+        )
+
+        f.attrs["top"] = column.top
+        f.attrs["base"] = column.base
+        f.attrs["add_tol"] = column.add_tol
+        f.attrs["add_mode"] = column.add_mode
+        f.attrs["chunk_rows"] = chunk_rows
+        if column.quant is not None:
+            f.attrs["quant"] = column.quant
+        if column.labels:
+            f.attrs["labels"] = json.dumps({k: t.to_dict() for k, t in column.labels.items()})
+
+
+class HDF5Column:
+    """Read-only handle to a ``CoreColumn`` saved with ``save_hdf5``.
+
+    Only the small per-chunk depth index is read on construction. ``slice_depth`` and
+    ``iter_chunks`` read just the row chunks that overlap the requested depths/rows.
+
+    Can be used as a context manager, otherwise ``close()`` should be called when done.
+    """
+
+    def __init__(self, fpath):
+        self.fpath = Path(fpath)
+        assert self.fpath.is_file(), f"HDF5 file {self.fpath} doesnt exist."
+
+        self._file = h5py.File(str(self.fpath), "r")
+        self._img = self._file["img"]
+        self._depths = self._file["depths"]
+
+        self.height, self.width, self.channels = self._img.shape
+        self.chunk_rows = int(self._file.attrs["chunk_rows"])
+        self.chunk_index = self._file["chunk_index"][()]
+
+        self.top = float(self._file.attrs["top"])
+        self.base = float(self._file.attrs["base"])
+        self.add_tol = float(self._file.attrs["add_tol"])
+        self.add_mode = str(self._file.attrs["add_mode"])
+
+        quant = self._file.attrs.get("quant")
+        self.quant = None if quant is None else tuple(float(q) for q in quant)
+
+        labels = json.loads(self._file.attrs.get("labels", "{}"))
+        self.labels = {name: LabelTrack.from_dict(track) for name, track in labels.items()}
+
+    @property
+    def depth_range(self):
+        """``(self.top, self.base)``"""
+        return (self.top, self.base)
+
+    @property
+    def img(self):
+        """The ``h5py`` image dataset. Row slices (e.g., ``img[a:b]``) read only overlapping chunks."""
+        return self._img
+
+    @property
+    def depths(self):
+        """Full ``depths`` array (read from file on each access)."""
+        return self._depths[()]
+
+    def rows_between(self, top, base):
+        """Get the `(start, stop)` row range with `top <= depths <= base`.
+
+        Only the depths of the (at most two) boundary chunks are read from file.
+        """
+        first = np.searchsorted(self.chunk_index[:, 1], top, side="left")
+        last = np.searchsorted(self.chunk_index[:, 0], base, side="right")
+
+        if first >= last:
+            return 0, 0
+
+        lo = first * self.chunk_rows
+        hi = min(last * self.chunk_rows, self.height)
+
+        head = self._depths[lo:min(lo+self.chunk_rows, hi)]
+        start = lo + np.searchsorted(head, top, side="left")
+
+        tail_lo = max(hi - self.chunk_rows, lo)
+        tail = self._depths[tail_lo:hi]
+        stop = tail_lo + np.searchsorted(tail, base, side="right")
+
+        return start, max(start, stop)
+
+    def slice_depth(self, top=None, base=None):
+        """Read a ``CoreColumn`` between `top` and `base`, touching only overlapping chunks."""
+        top = top or self.top
+        base = base or self.base
+        assert base > top, "Slice boundaries must maintain depth order."
+
+        assert top < self.base, f"Cannot slice to top {top} with base {self.base}"
+        assert base > self.top, f"Cannot slice to base {base} with top {self.top}"
+
+        start, stop = self.rows_between(top, base)
+        assert stop > start, f"No rows between {top} and {base}"
+
+        column = CoreColumn(
+            self._img[start:stop],
+            depths=self._depths[start:stop],
+            top=top,
+            base=base,
+            add_tol=self.add_tol,
+            add_mode=self.add_mode,
+        )
+        column._quant = self.quant
+        column._labels = {name: track.slice(top, base) for name, track in self.labels.items()}
+        return column
+
+    def iter_chunks(self, chunk_size, depths=True, step_size=None):
+        """Same as ``CoreColumn.iter_chunks``, reading each chunk from file as needed."""
+        step_size = step_size or chunk_size
+
+        for i in range(0, self.height, step_size):
+            if depths:
+                yield self._img[i:i+chunk_size], self._depths[i:i+chunk_size]
+            else:
+                yield self._img[i:i+chunk_size]
+
+    def load(self):
+        """Read the entire ``CoreColumn`` into memory."""
+        column = CoreColumn(
+            self._img[()],
+            depths=self.depths,
+            top=self.top,
+            base=self.base,
+            add_tol=self.add_tol,
+            add_mode=self.add_mode,
+        )
+        column._quant = self.quant
+        column._labels = dict(self.labels)
+        return column
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __repr__(self):
+        return (
+            f"HDF5Column instance with:\n"
+            f"\t file: {self.fpath}\n"
+            f"\t img.shape: {self._img.shape}\n"
+            f"\t (top, base): ({self.top:.3f}, {self.base:.3f})\n"
+        )
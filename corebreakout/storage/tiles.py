@@ -0,0 +1,403 @@
+"""
+Lossy, tiled storage of ``CoreColumn`` images, with a decoded-tile LRU cache.
+
+A tiles file uses the same framing and JSON header as a ``.cbc`` container (see
+``corebreakout.storage.container``), but the image is stored as JPEG or WebP tiles of
+`tile_shape` pixels, keyed by `(row block, column block)`. The valid pixel extent of each row
+is stored losslessly, so zero background stays exactly zero after decoding.
+
+``load_tiles`` returns a ``CoreColumn`` whose `img` is a lazy ``TiledImage``. Reading rows
+decodes only the tiles they touch, through a size-bounded LRU ``TileCache`` shared by all
+slices of the image. Sequential reads (e.g., ``iter_chunks`` or scrolling a viewer) trigger
+background read-ahead of the next row blocks.
+"""
+import io
+import os
+import json
+import zlib
+import weakref
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from corebreakout.column import CoreColumn
+from corebreakout.labels import LabelTrack
+from corebreakout.ragged import row_extents, row_indices, _extent_mask
+from corebreakout.storage.container import (
+    MAGIC, FORMAT_VERSION, PREFIX, sidecar_path, read_header, _read_depths, _write_depths
+)
+
+
+# Supported codecs, and their PIL format names
+CODECS = {"jpeg": "JPEG", "webp": "WEBP"}
+
+# Default (rows, cols) of each tile
+DEFAULT_TILE_SHAPE = (512, 512)
+
+# Default max bytes of decoded tiles held by a `TileCache`
+DEFAULT_CACHE_BYTES = 256 * 2**20
+
+# Default number of row blocks to read ahead of sequential reads
+DEFAULT_READ_AHEAD = 2
+
+
+def _encode(tile, codec, quality):
+    if tile.shape[2] == 1 and codec == "jpeg":
+        img = Image.fromarray(tile[:, :, 0], mode="L")
+    else:
+        # WebP has no grayscale mode, so single channels are encoded as RGB
+        img = Image.fromarray(np.repeat(tile, 3, axis=2) if tile.shape[2] == 1 else tile)
+
+    buffer = io.BytesIO()
+    img.save(buffer, format=CODECS[codec], quality=quality)
+    return buffer.getvalue()
+
+
+def save_tiles(
+    column, fpath, tile_shape=DEFAULT_TILE_SHAPE, codec="jpeg", quality=90, n_jobs=None,
+    sidecar=True
+):
+    """Save `column` to tiles file `fpath`, encoding tiles on a thread pool.
+
+    Parameters
+    ----------
+    column : CoreColumn
+        The column to save. `img` must be uint8 with 1 or 3 channels (e.g., RGB or ``quantize``d
+        codes), and may be memory-mapped or ragged.
+    fpath : str or Path
+        File to write to (will be overwritten), conventionally with a '.cbt' suffix.
+    tile_shape : tuple(int), optional
+        `(rows, cols)` of each tile, default=`DEFAULT_TILE_SHAPE`.
+    codec : one of {'jpeg', 'webp'}, optional
+        Tile image codec, default='jpeg'.
+    quality : int, optional
+        Encoder quality (1-100), default=90.
+    n_jobs : int, optional
+        Number of worker threads, default=None uses `os.cpu_count()`.
+    sidecar : bool, optional
+        Whether to also write the header to '<fpath>.json', default=True.
+
+    Returns
+    -------
+    header : dict
+    """
+    assert codec in CODECS, f"{codec} not a valid `codec`, must be in {list(CODECS)}"
+    assert column.img.dtype == np.uint8, "Lossy tiles require a uint8 `img`"
+    assert column.channels in (1, 3), "Lossy tiles require 1 or 3 channels"
+
+    fpath = Path(fpath)
+    tile_rows, tile_cols = tile_shape
+    col_starts = range(0, column.width, tile_cols)
+
+    def encode_block(start):
+        block = np.asarray(column.img[start:start+tile_rows])
+        starts, stops = row_extents(block.any(axis=2))
+        tiles = [_encode(block[:, c:c+tile_cols], codec, quality) for c in col_starts]
+        return tiles, np.stack([starts, stops], axis=1).astype(np.int32)
+
+    tiles, extents = [], []
+    n_jobs = n_jobs or os.cpu_count()
+    with open(fpath, "wb") as f, ThreadPoolExecutor(max_workers=n_jobs) as pool:
+        f.write(PREFIX.pack(MAGIC, FORMAT_VERSION, 0, 0))
+
+        # `pool.map` yields in order, so tiles are written row-major
+        starts = range(0, column.height, tile_rows)
+        for block_tiles, block_extents in pool.map(encode_block, starts):
+            for data in block_tiles:
+                tiles.append([f.tell(), len(data)])
+                f.write(data)
+            extents.append(block_extents)
+
+        raw = np.ascontiguousarray(np.concatenate(extents))
+        data = zlib.compress(raw)
+        extents = {"offset": f.tell(), "nbytes": len(data), "crc32": zlib.crc32(raw)}
+        f.write(data)
+
+        header = {
+            "format_version": FORMAT_VERSION,
+            "shape": list(column.img.shape),
+            "dtype": column.img.dtype.str,
+            "top": float(column.top),
+            "base": float(column.base),
+            "add_tol": float(column.add_tol),
+            "add_mode": column.add_mode,
+            "quant": column.quant,
+            "labels": {name: track.to_dict() for name, track in column.labels.items()},
+            "codec": codec,
+            "quality": quality,
+            "tile_shape": [tile_rows, tile_cols],
+            "tiles": tiles,
+            "extents": extents,
+            "depths": _write_depths(f, column, 6),
+        }
+
+        header_bytes = json.dumps(header).encode("utf-8")
+        header_offset = f.tell()
+        f.write(header_bytes)
+
+        f.seek(0)
+        f.write(PREFIX.pack(MAGIC, FORMAT_VERSION, header_offset, len(header_bytes)))
+
+    if sidecar:
+        with open(sidecar_path(fpath), "w") as f:
+            json.dump(header, f)
+
+    return header
+
+
+class TileCache:
+    """Thread-safe LRU cache of the decoded tiles of one tiles file.
+
+    Parameters
+    ----------
+    fpath : str or Path
+        The tiles file.
+    header : dict
+        Its header (see ``save_tiles``).
+    extents : array
+        `(height, 2)` valid column range of each row.
+    max_bytes : int, optional
+        Max total bytes of cached tiles, default=`DEFAULT_CACHE_BYTES`. The least recently used
+        tiles are evicted first (the most recent tile is always kept).
+    read_ahead : int, optional
+        Number of row blocks to decode in the background after a sequential read, default=2.
+    n_jobs : int, optional
+        Number of read-ahead threads, default=None uses `read_ahead`.
+
+    The read-ahead thread pool is only started by the first sequential read, and is shut down
+    by ``close`` or, at the latest, when the cache is garbage collected (e.g., with the column
+    returned by ``load_tiles``).
+    """
+
+    def __init__(
+        self, fpath, header, extents, max_bytes=DEFAULT_CACHE_BYTES,
+        read_ahead=DEFAULT_READ_AHEAD, n_jobs=None
+    ):
+        self.fpath, self.header, self.extents = Path(fpath), header, extents
+        self.max_bytes, self.read_ahead, self.n_jobs = max_bytes, read_ahead, n_jobs
+
+        self.shape, self.dtype = tuple(header["shape"]), np.dtype(header["dtype"])
+        self.tile_rows, self.tile_cols = header["tile_shape"]
+        self.num_row_blocks = -(-self.shape[0] // self.tile_rows)
+        self.num_col_blocks = -(-self.shape[1] // self.tile_cols)
+
+        self._init_state()
+
+    def _init_state(self):
+        self._tiles, self.nbytes = OrderedDict(), 0
+        self.hits, self.misses = 0, 0
+        self._lock = threading.Lock()
+        self._pending, self._pool, self._last_block = {}, None, None
+        self._finalizer = None
+
+    def __getstate__(self):
+        # locks, threads and decoded tiles are not pickled
+        state = self.__dict__.copy()
+        for key in ["_tiles", "_lock", "_pending", "_pool", "_finalizer"]:
+            state.pop(key)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_state()
+
+    def _decode(self, r, c):
+        """Read and decode tile `(r, c)`, zeroing pixels outside of each row's extent."""
+        offset, nbytes = self.header["tiles"][r * self.num_col_blocks + c]
+        with open(self.fpath, "rb") as f:
+            f.seek(offset)
+            data = f.read(nbytes)
+
+        tile = np.asarray(Image.open(io.BytesIO(data)))
+        tile = tile[:, :, np.newaxis] if tile.ndim == 2 else tile[:, :, :self.shape[2]]
+
+        r0, c0 = r * self.tile_rows, c * self.tile_cols
+        starts, stops = self.extents[r0:r0+tile.shape[0]].T
+        mask = _extent_mask(starts - c0, stops - c0, tile.shape[1])
+        return np.where(mask[:, :, np.newaxis], tile, 0).astype(self.dtype)
+
+    def get(self, r, c):
+        """Decoded tile `(r, c)`, from the cache if possible."""
+        key = (r, c)
+        with self._lock:
+            tile = self._tiles.get(key)
+            if tile is not None:
+                self._tiles.move_to_end(key)
+                self.hits += 1
+                return tile
+            pending = self._pending.get(r)
+
+        if pending is not None:
+            # wait for a read-ahead of this row block, instead of decoding it twice
+            pending.result()
+            with self._lock:
+                tile = self._tiles.get(key)
+            if tile is not None:
+                return tile
+
+        tile = self._decode(r, c)
+        with self._lock:
+            self.misses += 1
+            self._insert(key, tile)
+        return tile
+
+    def _insert(self, key, tile):
+        """Add `tile` and evict least recently used tiles (must hold the lock)."""
+        if key in self._tiles:
+            return
+        self._tiles[key] = tile
+        self.nbytes += tile.nbytes
+        while self.nbytes > self.max_bytes and len(self._tiles) > 1:
+            _, old = self._tiles.popitem(last=False)
+            self.nbytes -= old.nbytes
+
+    def block(self, r):
+        """Dense `(rows, width, channels)` array of row block `r`."""
+        return np.concatenate([self.get(r, c) for c in range(self.num_col_blocks)], axis=1)
+
+    def accessed(self, first, last):
+        """Record a read of row blocks `first..last`, reading ahead if it followed the last read."""
+        previous, self._last_block = self._last_block, last
+        sequential = previous is not None and first in (previous, previous + 1)
+        if not sequential or self.read_ahead < 1:
+            return
+
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.n_jobs or self.read_ahead)
+            # idle workers don't reference the cache, so this runs once it is unreachable
+            self._finalizer = weakref.finalize(self, self._pool.shutdown, wait=False)
+
+        for r in range(last + 1, min(last + 1 + self.read_ahead, self.num_row_blocks)):
+            with self._lock:
+                cached = all((r, c) in self._tiles for c in range(self.num_col_blocks))
+                if r not in self._pending and not cached:
+                    self._pending[r] = self._pool.submit(self._read_ahead, r)
+
+    def _read_ahead(self, r):
+        try:
+            for c in range(self.num_col_blocks):
+                with self._lock:
+                    cached = (r, c) in self._tiles
+                if not cached:
+                    tile = self._decode(r, c)
+                    with self._lock:
+                        self._insert((r, c), tile)
+        finally:
+            with self._lock:
+                self._pending.pop(r, None)
+
+    def close(self):
+        """Stop read-ahead threads and clear the cache."""
+        if self._pool is not None:
+            self._finalizer.detach()
+            self._pool.shutdown(wait=True)
+            self._pool, self._finalizer = None, None
+        with self._lock:
+            self._tiles.clear()
+            self.nbytes = 0
+
+
+class TiledImage:
+    """Lazy image of rows `start:stop` of a tiles file, read through a shared ``TileCache``.
+
+    Supports ``shape``, ``dtype``, ``ndim``, ``len``, row indexing with ints, slices or arrays
+    (optionally followed by width/channel indices), and ``np.asarray(img)``, all of which return
+    dense arrays. ``slice_rows`` returns another lazy ``TiledImage`` sharing the same cache.
+    """
+
+    def __init__(self, cache, start=0, stop=None):
+        self.cache = cache
+        self.start = start
+        self.stop = cache.shape[0] if stop is None else stop
+
+        self.shape = (self.stop - self.start,) + cache.shape[1:]
+        self.dtype, self.ndim = cache.dtype, 3
+
+    def __len__(self):
+        return self.shape[0]
+
+    def slice_rows(self, start, stop):
+        """``TiledImage`` of rows `start:stop` (relative to this image)."""
+        start, stop, _ = slice(start, stop).indices(self.shape[0])
+        return TiledImage(self.cache, self.start + start, self.start + max(start, stop))
+
+    def __getitem__(self, key):
+        rows, rest = (key[0], key[1:]) if isinstance(key, tuple) else (key, ())
+
+        if isinstance(rows, slice) and rows.step in (None, 1):
+            start, stop, _ = rows.indices(self.shape[0])
+            arr = self._dense(np.arange(start, max(start, stop)))
+        elif not isinstance(rows, slice) and np.ndim(rows) == 0:
+            return self._dense(row_indices(rows, self.shape[0]))[0][rest]
+        else:
+            arr = self._dense(row_indices(rows, self.shape[0]))
+
+        # the rows have already been selected
+        return arr[(slice(None),) + rest]
+
+    def _dense(self, idxs):
+        """Dense `(len(idxs), width, channels)` array of rows `idxs`."""
+        out = np.empty((idxs.size,) + self.shape[1:], dtype=self.dtype)
+        if idxs.size == 0:
+            return out
+
+        rows = idxs + self.start
+        blocks = rows // self.cache.tile_rows
+        for r in np.unique(blocks):
+            selected = blocks == r
+            out[selected] = self.cache.block(r)[rows[selected] - r * self.cache.tile_rows]
+
+        self.cache.accessed(int(blocks.min()), int(blocks.max()))
+        return out
+
+    def __array__(self, dtype=None):
+        arr = self._dense(np.arange(self.shape[0]))
+        return arr if dtype is None else arr.astype(dtype)
+
+    def __repr__(self):
+        return f"TiledImage(shape={self.shape}, dtype={self.dtype}, file={self.cache.fpath.name})"
+
+
+def load_tiles(
+    fpath, top=None, base=None, cache_bytes=DEFAULT_CACHE_BYTES, read_ahead=DEFAULT_READ_AHEAD,
+    n_jobs=None
+):
+    """Load a ``CoreColumn`` with a lazy ``TiledImage`` from tiles file `fpath`.
+
+    Only the header, depths and row extents are read here. If `top` and/or `base` are given,
+    the result is equivalent to ``column.slice_depth(top, base)``.
+    See ``TileCache`` for `cache_bytes`, `read_ahead` and `n_jobs`.
+    """
+    fpath = Path(fpath)
+    header = read_header(fpath, use_sidecar=False)
+    assert header.get("codec") in CODECS, f"{fpath} is not a tiles file"
+
+    with open(fpath, "rb") as f:
+        depths = _read_depths(f, header, verify=True)
+
+        section = header["extents"]
+        f.seek(section["offset"])
+        raw = zlib.decompress(f.read(section["nbytes"]))
+        if zlib.crc32(raw) != section["crc32"]:
+            raise IOError("Checksum mismatch in tiles row extents")
+        extents = np.frombuffer(raw, dtype=np.int32).reshape(-1, 2).astype(np.int64)
+
+    cache = TileCache(
+        fpath, header, extents, max_bytes=cache_bytes, read_ahead=read_ahead, n_jobs=n_jobs
+    )
+    column = CoreColumn._trusted(
+        TiledImage(cache), depths, header["top"], header["base"], header["add_tol"],
+        header["add_mode"]
+    )
+    quant = header.get("quant")
+    column._quant = None if quant is None else tuple(quant)
+    for name, track in header.get("labels", {}).items():
+        column._labels[name] = LabelTrack.from_dict(track)
+
+    if top is not None or base is not None:
+        column = column.slice_depth(top, base)
+    return column
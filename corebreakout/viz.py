@@ -88,23 +88,41 @@ def draw_box(img, box, color, lw):
 # Return True if arr[i] is a local minimum, else False.
 local_min = lambda arr, i : np.argmin(arr[i - 1 : i + 2]) == 1
 
+
+def local_minima(arr):
+    """Vectorized ``local_min(arr, i)`` for every interior `i` of `arr` (length `arr.size - 2`).
+
+    Matches ``np.argmin`` semantics exactly: ties go to the earlier element, and NaNs win.
+    """
+    a, b, c = arr[:-2], arr[1:-1], arr[2:]
+    with np.errstate(invalid="ignore"):
+        return ((b < a) & (b <= c)) | (np.isnan(b) & ~np.isnan(a))
+
+
 def make_depth_ticks(
     depths,
     major_precision=0.1,
     major_format_str="{:.1f}",
     minor_precision=0.01,
-    minor_format_str="{:.2f}"
+    minor_format_str="{:.2f}",
+    top=None,
+    base=None,
 ):
     """Generate major & minor (ticks, locs) for depth array axis.
 
+    A row gets a tick where the remainder of its depth w.r.t. `*_precision` is a local minimum.
+
     Parameters
     ----------
-    depths : array
+    depths : array or DepthAxis
         An array of (ordered) depth values from which to generate ticks/locs.
     *_precision : float, optional
         Major, minor tick spacing (in depth units), defaults=0.1, 0.01.
     *_format_str : str, optional
         Format strings to coerce depths -> tick strings, defaults='{:.1f}', '{:.2f}'.
+    top, base : float, optional
+        Only generate ticks for rows with `top <= depth <= base` (e.g., the visible window).
+        Locations are still relative to the whole `depths` array. Default=None for all rows.
 
     Returns
     -------
@@ -113,32 +131,44 @@ def make_depth_ticks(
     *_ticks : lists of tick label strings
     *_locs : lists of tick locations in array coordinates (fractional indices)
     """
-    # lambdas to convert values --> strs
-    major_fmt_fn = lambda x: major_format_str.format(x)
-    minor_fmt_fn = lambda x: minor_format_str.format(x)
+    if not hasattr(depths, "searchsorted"):
+        depths = np.asarray(depths)
+    num = len(depths)
+
+    start = 0 if top is None else int(depths.searchsorted(top, side="left"))
+    stop = num if base is None else int(depths.searchsorted(base, side="right"))
+    if stop <= start:
+        return [], [], [], []
+
+    # window rows plus one neighbor on each side, with `inf` beyond the ends of `depths`
+    lo, hi = max(start - 1, 0), min(stop + 1, num)
+    window = np.asarray(depths[lo:hi])
+    pad = (int(start == 0), int(stop == num))
 
-    major_ticks, major_locs = [], []
-    minor_ticks, minor_locs = [], []
+    def rmndr_minima(precision):
+        rmndr = np.pad(window % precision, pad, mode="constant", constant_values=np.inf)
+        return local_minima(rmndr)
 
-    # remainders of depth w.r.t. precision
-    # add `inf`s at start and end to get first/last ticks
-    major_rmndr = np.insert(depths % major_precision, (0, depths.size), np.inf)
-    minor_rmndr = np.insert(depths % minor_precision, (0, depths.size), np.inf)
+    is_major = rmndr_minima(major_precision)
+    is_minor = rmndr_minima(minor_precision) & ~is_major
 
-    for i in np.arange(1, major_rmndr.size):
+    # rows relative to `window`, offset by one for the leading neighbor
+    offset = pad[0] - 1
+    major_rows = np.flatnonzero(is_major) - offset
+    minor_rows = np.flatnonzero(is_minor) - offset
 
-        if local_min(major_rmndr, i):
-            major_ticks.append(major_fmt_fn(depths[i - 1]))
-            major_locs.append(i)
+    major_ticks = [major_format_str.format(d) for d in window[major_rows]]
+    minor_ticks = [minor_format_str.format(d) for d in window[minor_rows]]
 
-        elif local_min(minor_rmndr, i):
-            minor_ticks.append(minor_fmt_fn(depths[i - 1]))
-            minor_locs.append(i)
+    # locations are (row + 1), as in the original row-by-row implementation
+    major_locs = (major_rows + lo + 1).tolist()
+    minor_locs = (minor_rows + lo + 1).tolist()
 
     # add last tick if it's close to a whole number
-    last_depth = np.round(depths[-1], decimals=1)
-    if (last_depth % 1.0) == 0.0:
-        major_ticks.append(major_fmt_fn(last_depth))
-        major_locs.append(depths.size - 1)
+    if stop == num:
+        last_depth = np.round(window[-1], decimals=1)
+        if (last_depth % 1.0) == 0.0:
+            major_ticks.append(major_format_str.format(last_depth))
+            major_locs.append(num - 1)
 
     return major_ticks, major_locs, minor_ticks, minor_locs
@@ -0,0 +1,82 @@
+"""
+Benchmark `viz.make_depth_ticks` against the original row-by-row implementation.
+"""
+import time
+import argparse
+
+import numpy as np
+
+from corebreakout.viz import local_min, make_depth_ticks
+
+
+parser = argparse.ArgumentParser(description='Time depth tick generation for a long synthetic column.')
+parser.add_argument('--rows',
+    type=int,
+    default=1000000,
+    help="Number of rows (depths) in the synthetic column, default=1000000."
+)
+parser.add_argument('--top',
+    type=float,
+    default=1000.0,
+    help="Top depth of the synthetic column, default=1000.0."
+)
+parser.add_argument('--length',
+    type=float,
+    default=100.0,
+    help="Depth length of the synthetic column, default=100.0."
+)
+
+
+def loop_depth_ticks(depths, major_precision=0.1, major_format_str="{:.1f}",
+                     minor_precision=0.01, minor_format_str="{:.2f}"):
+    """The original row-by-row `make_depth_ticks` (before vectorized `local_min`), for reference."""
+    major_ticks, major_locs = [], []
+    minor_ticks, minor_locs = [], []
+
+    major_rmndr = np.insert(depths % major_precision, (0, depths.size), np.inf)
+    minor_rmndr = np.insert(depths % minor_precision, (0, depths.size), np.inf)
+
+    for i in np.arange(1, major_rmndr.size):
+
+        if local_min(major_rmndr, i):
+            major_ticks.append(major_format_str.format(depths[i - 1]))
+            major_locs.append(i)
+
+        elif local_min(minor_rmndr, i):
+            minor_ticks.append(minor_format_str.format(depths[i - 1]))
+            minor_locs.append(i)
+
+    last_depth = np.round(depths[-1], decimals=1)
+    if (last_depth % 1.0) == 0.0:
+        major_ticks.append(major_format_str.format(last_depth))
+        major_locs.append(depths.size - 1)
+
+    return major_ticks, major_locs, minor_ticks, minor_locs
+
+
+def timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - t0
+
+
+def main():
+    args = parser.parse_args()
+
+    depths = np.linspace(args.top, args.top + args.length, args.rows)
+    window = (args.top + 0.4 * args.length, args.top + 0.45 * args.length)
+
+    expected, loop_time = timed(loop_depth_ticks, depths)
+    result, vec_time = timed(make_depth_ticks, depths)
+    windowed, window_time = timed(make_depth_ticks, depths, top=window[0], base=window[1])
+
+    assert tuple(result) == tuple(expected), 'Vectorized ticks must match the original.'
+
+    print(f'{args.rows} rows, {len(result[1])} major and {len(result[3])} minor ticks')
+    print(f'row loop:   {loop_time:8.3f} s')
+    print(f'vectorized: {vec_time:8.3f} s  ({loop_time / vec_time:.0f}x)')
+    print(f'windowed:   {window_time:8.3f} s  (depths {window[0]:.1f} - {window[1]:.1f})')
+
+
+if __name__ == '__main__':
+    main()
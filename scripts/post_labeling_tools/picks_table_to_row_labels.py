@@ -9,6 +9,8 @@ from pathlib import Path
 import numpy as np
 import pandas as pd
 
+from corebreakout.labels import LabelTrack
+
 
 # Set columns to use from PICKS csv
 TOP_COL = 'top'
@@ -36,22 +38,14 @@ def common_path(path_list):
 def picks_to_rows(picks_file, depth_file):
     """
     Take a picks and depth file, save the row-wise labels .npy file.
+
+    Rows outside of every pick's [top, base] interval are given empty labels.
     """
     picks = pd.read_csv(picks_file, usecols=[TOP_COL, BASE_COL, LABEL_COL])
+    track = LabelTrack.from_picks(picks, top_col=TOP_COL, base_col=BASE_COL, label_col=LABEL_COL)
 
     depth = np.load(depth_file)
-    row_labels = np.zeros_like(depth, dtype=LABEL_DTYPE)
-
-    current_idx = 0
-    current_pick = picks.iloc[idx]
-
-    for i in range(row_labels.size):
-
-        if depth[i] > current_pick[BASE_COL]:
-            current_idx += 1
-            current_pick = picks.iloc[current_idx]
-
-        row_labels[i] = current_pick[LABEL_COL]
+    row_labels = track.labels_at(depth, fill='', dtype=LABEL_DTYPE)
 
     save_path = common_path([picks_file, depth_file])+'labels.npy'
 
@@ -71,11 +65,8 @@ if __name__ == '__main__':
 
     args = parser.parse_args()
 
-    picks_path = Path(args.dir) / args.well_prefix
-    depths_path = Path(args.dir) / args.well_prefix
-
-    picks_files = sorted(picks_path.glob('*_picks.npy'))
-    depths_files = sorted(depths_path.glob('*_depth.npy'))
+    picks_files = sorted(Path(args.dir).glob(args.wells_prefix + '*_picks.csv'))
+    depth_files = sorted(Path(args.dir).glob(args.wells_prefix + '*_depth.npy'))
 
     assert len(picks_files) > 0, 'Must be at least one pair of picks + depth files'
     assert len(picks_files) == len(depth_files), 'Must be same # of picks and depths files'
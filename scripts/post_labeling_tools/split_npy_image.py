@@ -3,7 +3,9 @@ import os
 import pathlib
 
 import numpy as np
-from skimage import io
+
+from corebreakout import CoreColumn
+from corebreakout.column import STRIP_MAX_ROWS
 
 
 parser = argparse.ArgumentParser('Split .npy files into jpegs for labeling.')
@@ -14,38 +16,35 @@ parser.add_argument('--dst', type=str, help='Path to write jpeg files to.',
                     default='/home/'+os.environ['USER']+'/Dropbox/core_data/facies/label/')
 parser.add_argument('--with_depth', dest='with_depth', action='store_true',
                     help='Flag to concurrently split+save depth arrays.')
+parser.add_argument('--max_rows', type=int, default=STRIP_MAX_ROWS,
+                    help='Max number of rows in each image.')
+parser.add_argument('--fmt', type=str, default='jpeg',
+                    help='Image format to save, one of {jpeg, png, tiff}.')
+parser.add_argument('--n_jobs', type=int, default=None,
+                    help='Number of threads to encode images with, default uses all cores.')
 
 
-def split_npy_image(well, src_path, dst_path, with_depth=False, max_rows=65000):
+def split_npy_image(well, src_path, dst_path, with_depth=False, max_rows=STRIP_MAX_ROWS,
+                    fmt='jpeg', n_jobs=None):
     """
+    Split memory-mapped `<well>_image.npy` into strips under `<dst_path>/<well>/`,
+    with a 'manifest.json' of strip depth ranges. See `CoreColumn.export_strips`.
     """
-    img_arr = np.load(src_path / (well + '_image.npy'))
+    img_arr = np.load(src_path / (well + '_image.npy'), mmap_mode='r')
     depth_arr = np.load(src_path / (well + '_depth.npy'))
 
     assert img_arr.shape[0] == depth_arr.size, 'Image and depths must have same number of rows'
 
-    height = depth_arr.size
-    n_imgs = height // max_rows + 1
-
-    tops = [i*max_rows for i in range(n_imgs)]
-    bottoms = tops[1:] + [height]
+    column = CoreColumn(img_arr, depths=depth_arr)
 
     save_dir = dst_path / pathlib.Path(well)
-    if not save_dir.exists():
-        save_dir.mkdir()
-
-    for t, b in zip(tops, bottoms):
-        top = '{:.1f}'.format(depth_arr[t])
-        bot = '_{:.1f}'.format(depth_arr[b-1])
+    print(f'Saving strips to {str(save_dir)}')
 
-        img_fname = save_dir / (top + bot + '.jpeg')
-        print(f'Saving... {str(img_fname)}')
-        io.imsave(str(img_fname), img_arr[t:b], quality=100)
+    manifest = column.export_strips(save_dir, max_rows=max_rows, fmt=fmt,
+                                    depths=with_depth, n_jobs=n_jobs)
 
-        if with_depth:
-            depth_fname = save_dir / (top + bot + '_depth.npy')
-            print(f'Saving... {str(depth_fname)}')
-            np.save(depth_fname, depth_arr[t:b])
+    for strip in manifest['strips']:
+        print(f'Saved... {strip["file"]}')
 
 
 if __name__ == '__main__':
@@ -60,4 +59,5 @@ if __name__ == '__main__':
     assert src_path.is_dir() and src_path.exists(), 'Check src_path'
     assert dst_path.is_dir() and dst_path.exists(), 'Check dst_path'
 
-    split_npy_image(args.well, src_path, dst_path, with_depth=args.with_depth)
+    split_npy_image(args.well, src_path, dst_path, with_depth=args.with_depth,
+                    max_rows=args.max_rows, fmt=args.fmt, n_jobs=args.n_jobs)
@@ -22,11 +22,8 @@ import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 
-from functools import reduce
-from operator import add
-
 from corebreakout import defaults
-from corebreakout import CoreSegmenter, CoreColumn
+from corebreakout import CoreSegmenter, CoreColumnBuilder
 
 # Change Config selection manually
 model_config = defaults.DefaultConfig()
@@ -129,9 +126,11 @@ def main():
 
     segment = lambda f, t, b : segmenter.segment(f, [t, b], add_tol=args.add_tol, add_mode=args.add_mode)
 
-    cols = [segment(f, t, b) for f, t, b in zip(run_img_paths, tops, bottoms)]
+    builder = CoreColumnBuilder()
+    for f, t, b in zip(run_img_paths, tops, bottoms):
+        builder.append(segment(f, t, b))
 
-    full_column = reduce(add, cols)
+    full_column = builder.build()
 
     print(f'Created CoreColumn with depth_range={full_column.depth_range}')
 
@@ -0,0 +1,80 @@
+"""
+Define a suite of tests for the `corebreakout.CoreCatalog` class.
+"""
+import os
+import tempfile
+from pathlib import Path
+
+from skimage import io
+
+from corebreakout import CoreColumn, CoreCatalog
+from corebreakout.catalog import IntervalIndex
+
+
+img1 = io.imread("tests/data/column1.jpeg")[::4]
+
+
+def test_interval_index():
+    index = IntervalIndex([5.0, 0.0, 2.0, 8.0], [6.0, 10.0, 3.0, 9.0])
+
+    assert index.overlapping(2.5, 4.0).tolist() == [1, 2]
+    assert index.overlapping(6.0, 7.0).tolist() == [0, 1]
+    assert index.overlapping(10.5, 11.0).tolist() == []
+
+
+def test_catalog():
+    """Test scanning, querying, and incrementally updating a catalog of saved columns."""
+
+    with tempfile.TemporaryDirectory() as TEMP_PATH:
+        root = Path(TEMP_PATH)
+        save_kwargs = [
+            dict(pickle=True),
+            dict(pickle=False, image=True, depths=True),
+            dict(pickle=False, container=True),
+            dict(pickle=False, hdf5=True),
+        ]
+
+        columns = {}
+        for well, kwargs in zip("ABCD", save_kwargs):
+            (root / well).mkdir()
+            for top in [1500.0, 1510.0]:
+                column = CoreColumn(img1, top=top, base=top + 5.0)
+                column.save(root / well, name=f"col_{top:.0f}", **kwargs)
+                columns[(well, top)] = column
+
+        catalog = CoreCatalog.scan(root, n_jobs=2)
+        assert len(catalog) == 8 and catalog.wells == ["A", "B", "C", "D"]
+        assert set(e.fmt for e in catalog.entries) == {"pkl", "npy", "cbc", "h5"}
+
+        handles = catalog.query(1502.3, 1512.0, wells=["A", "B", "C"])
+        assert [(h.well, h.entry.top) for h in handles] == [
+            ("A", 1500.0), ("A", 1510.0), ("B", 1500.0), ("B", 1510.0), ("C", 1500.0), ("C", 1510.0)
+        ]
+        assert len(catalog.query(1502.3, 1510.0)) == 4, "Touching columns are not included"
+
+        # Handles load only the queried interval
+        for handle in handles:
+            loaded = handle.load()
+            expected = columns[(handle.well, handle.entry.top)].slice_depth(handle.top, handle.base)
+            assert loaded == expected
+
+        # Only new and modified columns are re-read, removed ones are dropped
+        (root / "E").mkdir()
+        CoreColumn(img1, top=1520.0, base=1525.0).save(root / "E", name="new")
+        os.remove(root / "A" / "col_1510.pkl")
+        assert catalog.update() == (1, 1)
+        assert catalog.update() == (0, 0)
+        assert [h.well for h in catalog.query(1519.0, 1530.0)] == ["E"]
+
+        catalog.save(root / "catalog.json")
+        reloaded = CoreCatalog.load(root / "catalog.json")
+        assert [e.to_dict() for e in reloaded.entries] == [e.to_dict() for e in catalog.entries]
+        assert reloaded.update() == (0, 0)
+
+        # '.npy' entries use the saved `top` and `base`, not the first and last row depths
+        sliced = CoreColumn(img1, top=1530.0, base=1535.0).slice_depth(1531.0001, 1533.0001)
+        sliced.save(root / "E", name="sliced", pickle=False, image=True, depths=True)
+        catalog.update()
+        entry = [e for e in catalog.entries if e.name == "sliced"][0]
+        assert (entry.top, entry.base) == (sliced.top, sliced.base)
+        assert entry.top < sliced.depths[0] and entry.load() == sliced
@@ -1,13 +1,15 @@
 """
 Define a suite of tests for the `corebreakout.CoreColumn` class.
 """
+import json
 import tempfile
+from pathlib import Path
 
 import pytest
 import numpy as np
 from skimage import io, color
 
-from corebreakout import CoreColumn
+from corebreakout import CoreColumn, CoreColumnBuilder
 
 
 # Example (unmasked) single-column images
@@ -45,6 +47,245 @@ def test_construction():
     assert gray_column.channels == 1, "Grayscale image should have 1 channel"
 
 
+def test_depth_metadata():
+    """Test analytic depths and cached depth metadata."""
+
+    column = CoreColumn(img1, top=1.0, base=2.0)
+    assert column.depth_axis is not None and column.is_uniform
+    assert np.array_equal(column.depths, np.linspace(1.0, 2.0, num=height1))
+    assert np.isclose(column.dd, 1.0 / (height1 - 1))
+
+    # Slices and concatenations of analytic columns stay analytic
+    assert column.slice_depth(1.25, 1.5).depth_axis is not None
+    stacked = column + CoreColumn(img2, top=2.0, base=3.0)
+    assert stacked.depth_axis is not None and not stacked.is_uniform
+
+    # Reassigning `depths` should reset the cache
+    column.depths = np.linspace(1.0, 1.5, num=height1)
+    assert column.depth_axis is None
+    assert np.isclose(column.dd, 0.5 / (height1 - 1))
+
+    with pytest.raises(AssertionError):
+        column.depths = np.linspace(1.5, 1.0, num=height1)
+
+
+def test_row_depth_index():
+    """Test fractional depth <-> row lookups."""
+
+    column = CoreColumn(img1, top=1.0, base=2.0)
+    dd = 1.0 / (height1 - 1)
+
+    assert column.rows_at(1.0) == 0.0 and np.isclose(column.rows_at(2.0), height1 - 1)
+    assert np.isclose(column.rows_at(1.0 + 10.5 * dd), 10.5)
+    assert np.isnan(column.rows_at(0.5)) and np.isnan(column.rows_at(2.5))
+
+    rows = np.array([0.0, 0.25, 100.5, height1 - 1])
+    assert np.allclose(column.depths_at(rows), 1.0 + rows * dd)
+    assert np.allclose(column.rows_at(column.depths_at(rows)), rows)
+    assert np.isnan(column.depths_at(-1.0))
+
+    # Array-backed depths should give the same answers as analytic ones
+    array_column = CoreColumn(img1, depths=np.linspace(1.0, 2.0, num=height1))
+    depths = np.random.uniform(1.0, 2.0, size=100)
+    assert np.allclose(array_column.rows_at(depths), column.rows_at(depths))
+    assert np.allclose(array_column.depths_at(rows), column.depths_at(rows))
+
+    # Across a filled gap
+    column.add_tol = 0.1
+    stacked = CoreColumn.concat([column, CoreColumn(img2, top=2.01, base=3.0)])
+    assert np.allclose(stacked.depths_at(stacked.rows_at(depths + 0.5)), depths + 0.5)
+
+
+def test_resample():
+    """Test resampling to uniform and explicit depth grids."""
+
+    column = CoreColumn(img1, top=1.0, base=2.0)
+
+    # Same grid should reproduce the image
+    same = column.resample(depths=column.depths, block_rows=1000)
+    assert same == column
+
+    # Coarser uniform grid, for both methods
+    for method in ["linear", "area"]:
+        coarse = column.resample(dd=0.001, method=method, block_rows=128, n_jobs=2)
+        assert coarse.height == 1001 and coarse.is_uniform and np.isclose(coarse.dd, 0.001)
+        assert coarse.img.dtype == img1.dtype
+        assert np.allclose(coarse.img.mean(), img1.mean(), atol=1.0)
+
+    # float64 images are interpolated in double precision
+    floats = CoreColumn(np.random.RandomState(0).rand(500, 4, 3), top=1.0, base=2.0)
+    assert np.array_equal(floats.resample(depths=floats.depths).img, floats.img)
+
+    # 'area' should average over each interval
+    gray = CoreColumn(np.repeat(np.arange(6, dtype=float), 2)[:, None], top=0.0, base=11.0)
+    halved = gray.resample(depths=np.array([0.5, 2.5, 4.5, 6.5, 8.5, 10.5]), method="area")
+    assert np.allclose(halved.img.ravel(), np.arange(6))
+
+    with pytest.raises(AssertionError):
+        _ = column.resample(dd=0.001, method="cubic")
+
+
+def test_depth_windows():
+    """Test depth-unit windowing with overlap."""
+
+    column = CoreColumn(img1, top=1.0, base=2.0)
+
+    tops, starts, stops = column.depth_windows(0.25, step=0.1)
+    assert np.allclose(tops, [1.0, 1.1, 1.2, 1.3, 1.4, 1.5, 1.6, 1.7])
+    assert starts[0] == 0 and np.all(stops > starts)
+
+    windows = list(column.iter_depth_windows(0.25, step=0.1))
+    assert len(windows) == 8
+    for (img, depths), top in zip(windows, tops):
+        assert np.shares_memory(img, column.img)
+        assert depths[0] >= top and depths[-1] < top + 0.25
+
+    resized = list(column.iter_depth_windows(0.25, step=0.1, num_rows=100, depths=False))
+    assert all(img.shape == (100, 782, 3) for img in resized)
+    assert np.array_equal(resized[0][0], img1[0])
+
+    # Shards should partition the windows
+    sharded = [list(column.iter_depth_windows(0.25, 0.1, shard=(i, 3))) for i in range(3)]
+    assert sum(len(s) for s in sharded) == 8
+    assert np.array_equal(sharded[1][1][0], windows[4][0])
+
+
+def test_plot_pyramid():
+    """Test downsampled plotting from an image pyramid."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    column = CoreColumn(img1, top=1.0, base=2.0)
+
+    pyramid = column.pyramid()
+    assert pyramid.factors == [4, 8]
+    assert pyramid.imgs[0].shape == (1518, 196, 3) and pyramid.imgs[0].dtype == img1.dtype
+    assert np.allclose(pyramid.depths[0][0], column.depths[:4].mean())
+
+    # Coarsest level with at least `max_rows` rows in the window
+    factor, img, depths = pyramid.select(0, column.height, 1000)
+    assert factor == 4 and img.shape[0] == depths.size == 1518
+    assert pyramid.select(0, 1000, 1000)[0] == 1
+
+    fig, ax = column.plot(figsize=(2, 4), dpi=100)
+    assert ax.get_images()[0].get_array().shape[0] == 759
+    plt.close(fig)
+
+    fig, ax = column.plot(figsize=(2, 4), dpi=100, top=1.25, base=1.5, pyramid=False)
+    start, stop = column.rows_between(1.25, 1.5)
+    assert ax.get_images()[0].get_array().shape[0] == stop - start
+    plt.close(fig)
+
+    # Reassigning the image or depths discards the pyramid
+    column.img = img1[:3000]
+    assert column._pyramid is None
+    column.pyramid()
+    column.depths = np.linspace(5.0, 6.0, num=3000)
+    assert column._pyramid is None and np.isclose(column.pyramid().depths[0][0], 5.0, atol=0.01)
+
+    save_column = CoreColumn(img1, top=1.0, base=2.0)
+    save_column.pyramid()
+    with tempfile.TemporaryDirectory() as TEMP_PATH:
+        save_column.save(TEMP_PATH, name='testcol', pickle=False, image=True, depths=True)
+        load_column = CoreColumn.load(TEMP_PATH, 'testcol')
+
+    assert load_column._pyramid.factors == [4, 8]
+    assert np.array_equal(load_column._pyramid.imgs[1], save_column._pyramid.imgs[1])
+
+    with tempfile.TemporaryDirectory() as TEMP_PATH:
+        save_column.save(TEMP_PATH, name='testcol', pickle=False, image=True)
+        # loading with other depths drops the mismatched pyramid
+        assert CoreColumn.load(TEMP_PATH, 'testcol', top=3.0, base=4.0)._pyramid is None
+        assert CoreColumn.load(TEMP_PATH, 'testcol', top=1.0, base=2.0)._pyramid is not None
+
+        # saving without a pyramid removes the stale one
+        CoreColumn(img1[:2000], top=1.0, base=2.0).save(
+            TEMP_PATH, name='testcol', pickle=False, image=True
+        )
+        assert not (Path(TEMP_PATH) / 'testcol_pyramid.npz').exists()
+
+    # Quantized columns are plotted, and downsampled, from their values rather than codes
+    quantized = CoreColumn(img1 / 255.0, top=1.0, base=2.0).quantize("uint8")
+    pyramid = quantized.pyramid()
+    expected = CoreColumn(np.asarray(quantized.values), top=1.0, base=2.0).pyramid()
+    assert pyramid.imgs[0].dtype == np.float32 and np.allclose(pyramid.imgs[1], expected.imgs[1])
+    fig, ax = quantized.plot(figsize=(2, 4), dpi=100, top=1.25, base=1.5, pyramid=False)
+    assert np.allclose(ax.get_images()[0].get_array(), quantized.values[start:stop])
+    plt.close(fig)
+
+    with tempfile.TemporaryDirectory() as TEMP_PATH:
+        quantized.save(TEMP_PATH, name='quantcol', pickle=False, image=True, depths=True)
+        assert CoreColumn.load(TEMP_PATH, 'quantcol')._pyramid.imgs[0].dtype == np.float32
+
+
+def test_fingerprint_diff():
+    """Test chunked fingerprints, fingerprint-aware equality, and `diff`."""
+
+    column = CoreColumn(img1, top=1.0, base=2.0)
+    fp = column.fingerprint(chunk_rows=1000)
+    assert len(fp) == 7 and column.fingerprint(chunk_rows=1000) is fp, "Should be cached"
+
+    changed_img = img1.copy()
+    changed_img[2500:2510] = 0
+    changed_img[6050] += 1
+    changed = CoreColumn(changed_img, top=1.0, base=2.0)
+
+    assert changed.fingerprint(chunk_rows=1000).changed_chunks(fp).tolist() == [
+        False, False, True, False, False, False, True
+    ]
+    assert CoreColumn(img1.copy(), top=1.0, base=2.0).cache_key() == column.cache_key()
+    assert changed.cache_key() != column.cache_key()
+
+    assert changed != column
+    intervals = column.diff(changed)
+    assert len(intervals) == 2
+    assert intervals[0] == (column.depths[2500], column.depths[2509])
+    assert intervals[1][0] == intervals[1][1] == column.depths[6050]
+    assert column.diff(column.slice_depth(copy=True)) == []
+
+    # Reassigning the image resets the fingerprint
+    changed.img = img1
+    assert changed._fingerprint is None and changed == column
+
+
+def test_quantize():
+    """Test compact quantized storage of float images."""
+
+    gray = color.rgb2gray(img1)
+    column = CoreColumn(gray, top=1.0, base=2.0)
+
+    compact = column.quantize("uint8", block_rows=1000)
+    assert compact.img.dtype == np.uint8 and compact.is_quantized
+    scale, offset = compact.quant
+    assert np.isclose(offset, gray.min()) and np.isclose(scale * 255 + offset, gray.max())
+    assert np.abs(compact.values[100:200, :, 0] - gray[100:200]).max() <= scale / 2 + 1e-6
+
+    half = column.quantize("float16")
+    assert half.quant == (1.0, 0.0) and np.allclose(np.asarray(half.values)[..., 0], gray, atol=1e-3)
+
+    # Slicing, resampling and concatenation keep the compact form
+    sliced = compact.slice_depth(top=1.25, base=1.5)
+    assert sliced.img.dtype == np.uint8 and sliced.quant == compact.quant
+    assert compact.resample(dd=0.001).quant == compact.quant
+
+    lower = CoreColumn(color.rgb2gray(img2), top=2.0, base=3.0)
+    stacked = compact + lower.quantize("uint8", scale=scale, offset=offset)
+    assert stacked.img.dtype == np.uint8 and stacked.quant == compact.quant
+
+    mixed = compact + lower
+    assert mixed.img.dtype == np.uint8 and mixed.is_quantized
+    assert np.abs(mixed.values[height1:, :779, 0] - lower.img[..., 0]).max() <= mixed.quant[0]
+
+    restored = compact.dequantize()
+    assert restored.img.dtype == np.float32 and not restored.is_quantized
+
+    with tempfile.TemporaryDirectory() as TEMP_PATH:
+        compact.save(TEMP_PATH, name='testcol', pickle=False, image=True, depths=True)
+        assert CoreColumn.load(TEMP_PATH, 'testcol') == compact
+        assert CoreColumn.load(TEMP_PATH, 'testcol', mmap_mode='r').quant == compact.quant
+
+
 def test_addition():
     """Test various column combination possibilities."""
 
@@ -77,6 +318,44 @@ def test_addition():
         height1 + height3
     ), "`fill` should have filled something"
 
+    # A gap of between one and two `dd` gets exactly one fill row, at `LHS` base + `dd`
+    small1 = CoreColumn(np.ones((10, 2, 3), np.uint8), top=100.0, base=101.0, add_tol=1.0)
+    small2 = CoreColumn(np.ones((10, 2, 3), np.uint8), top=101.15, base=102.15)
+    one_fill = small1 + small2
+    assert one_fill.img.shape == (21, 2, 3)
+    assert np.isclose(one_fill.depths[10], 101.0 + (small1.dd + small2.dd) / 2)
+    assert np.all(np.diff(one_fill.depths) > 0)
+
+
+def test_concat():
+    """Test n-ary concatenation and the incremental builder."""
+
+    column1 = CoreColumn(img1, top=1.0, base=2.0, add_tol=2.0)
+    column2 = CoreColumn(img2, top=2.0, base=3.0)
+    column3 = CoreColumn(img3, top=3.5, base=4.5)
+
+    # Should match pairwise addition
+    assert CoreColumn.concat([column1, column2]) == column1 + column2
+
+    # Adding should not modify the operands
+    one_plus_three = column1 + column3
+    assert column1.height == height1, "`fill` should not change LHS"
+
+    stacked = CoreColumn.concat([column1, column2, column3])
+    assert stacked.width == 803, "Narrower columns are padded"
+    assert stacked.depth_range == (1.0, 4.5)
+    assert stacked.height > (height1 + height2 + height3), "`fill` should have filled gap"
+    assert np.all(np.diff(stacked.depths) >= 0), "Filled depths should be monotonic"
+
+    builder = CoreColumnBuilder([column1])
+    builder.append(column2).append(column3)
+    assert len(builder) == 3 and builder.height == stacked.height
+    assert builder.build() == stacked
+
+    # Order violations are caught on `append`, before anything is built
+    with pytest.raises(UserWarning):
+        builder.append(column1)
+
 
 def test_slicing():
     """Test the `slice_depth` method."""
@@ -95,6 +374,16 @@ def test_slicing():
     slice2 = column.slice_depth(top=1.5)
     assert slice2.height < column.height
 
+    # Slices should be views, unless a copy is requested
+    slice3 = column.slice_depth(top=1.25, base=1.75)
+    mask = np.logical_and(column.depths >= 1.25, column.depths <= 1.75)
+    assert np.array_equal(slice3.img, img1[mask]) and slice3.depth_range == (1.25, 1.75)
+    assert np.shares_memory(slice3.img, column.img)
+
+    slice4 = column.slice_depth(top=1.25, base=1.75, copy=True)
+    assert slice4 == slice3 and not np.shares_memory(slice4.img, column.img)
+    assert not np.shares_memory(column.slice_depth(copy=True).img, column.img)
+
     # These should not be allowed
     with pytest.raises(AssertionError):
         _ = column.slice_depth(top=1.75, base=1.25)
@@ -105,6 +394,10 @@ def test_slicing():
     with pytest.raises(AssertionError):
         _ = column.slice_depth(base=0.5)
 
+    # A window between two row depths has no rows
+    with pytest.raises(ValueError):
+        _ = column.slice_depth(top=1.0 + 10.25 * column.dd, base=1.0 + 10.75 * column.dd)
+
 
 def test_pickle_save_load():
     """Test saving as a single pickle file."""
@@ -149,3 +442,49 @@ def test_image_only_save_load():
         load_column = CoreColumn.load(TEMP_PATH, 'testcol', top=1.0, base=2.0)
 
     assert load_column == save_column, 'Loaded should match saved.'
+
+
+def test_mmap_save_load():
+    """Test memory-mapped loading of numpy image + depths."""
+
+    save_column = CoreColumn(img1, top=1.0, base=2.0)
+
+    with tempfile.TemporaryDirectory() as TEMP_PATH:
+
+        save_column.save(TEMP_PATH, name='testcol',
+                        pickle=True, image=True, depths=True)
+
+        load_column = CoreColumn.load(TEMP_PATH, 'testcol', mmap_mode='r')
+
+        assert isinstance(load_column.img, np.memmap), 'Should not load pickle.'
+        assert load_column.img.flags['C_CONTIGUOUS'], 'Saved image is contiguous.'
+        assert load_column == save_column, 'Loaded should match saved.'
+
+        # Slicing should only read the needed rows into memory
+        sliced = load_column.slice_depth(top=1.25, base=1.5)
+        assert sliced == save_column.slice_depth(top=1.25, base=1.5)
+
+        del load_column, sliced
+
+
+def test_export_strips():
+    """Test threaded export of image strips with a depth manifest."""
+
+    column = CoreColumn(img1, top=1.0, base=2.0)
+
+    with tempfile.TemporaryDirectory() as TEMP_PATH:
+
+        manifest = column.export_strips(TEMP_PATH + '/strips', max_rows=2500, fmt='png',
+                                        depths=True, n_jobs=2)
+
+        strips = manifest['strips']
+        assert [s['stop_row'] - s['start_row'] for s in strips] == [2500, 2500, 1070]
+        assert manifest == json.load(open(TEMP_PATH + '/strips/manifest.json'))
+
+        # Lossless strips should stack back into the original image
+        imgs = [io.imread(TEMP_PATH + '/strips/' + s['file']) for s in strips]
+        assert np.array_equal(np.concatenate(imgs), img1)
+
+        depths = np.load(TEMP_PATH + '/strips/' + strips[1]['file'][:-4] + '_depth.npy')
+        assert np.array_equal(depths, column.depths[2500:5000])
+        assert strips[1]['top_depth'] == depths[0]
@@ -0,0 +1,94 @@
+"""
+Define a suite of tests for the `corebreakout.CompositeCoreColumn` class.
+"""
+import tempfile
+
+import numpy as np
+from skimage import io
+
+from corebreakout import CoreColumn, CompositeCoreColumn
+from corebreakout.composite import ColumnSegment
+from corebreakout.labels import LabelTrack
+
+
+img1, img2, img3 = (io.imread(f'tests/data/column{i}.jpeg') for i in [1,2,3])
+
+column1 = CoreColumn(img1, top=1.0, base=2.0, add_tol=1.0)
+column2 = CoreColumn(img2, top=2.0, base=3.0)
+column3 = CoreColumn(img3, top=3.5, base=4.5)
+
+columns = [column1, column2, column3]
+
+
+def test_composite_matches_concat():
+    """Lazily gathered data should match the materialized concatenation."""
+
+    composite = CompositeCoreColumn(columns)
+    stacked = CoreColumn.concat(columns)
+
+    assert composite.img.shape == stacked.img.shape
+    assert composite.depth_range == stacked.depth_range
+    assert composite.to_column() == stacked
+
+    # Row indexing across segment and fill boundaries
+    for a, b in [(0, 10), (6000, 6100), (11980, 12600), (stacked.height - 5, stacked.height)]:
+        assert np.array_equal(composite.img[a:b], stacked.img[a:b])
+        assert np.allclose(composite.depths[a:b], stacked.depths[a:b])
+
+    assert np.array_equal(composite.img[-1], stacked.img[-1])
+
+    # Slices within one segment, across segments, and starting inside a fill gap
+    for top, base in [(1.2, 1.4), (1.9, 2.1), (3.2, 3.7), (1.5, 4.0)]:
+        assert composite.slice_depth(top, base) == stacked.slice_depth(top, base)
+
+    for (c_img, c_depths), (s_img, s_depths) in zip(
+        composite.iter_chunks(2000), stacked.iter_chunks(2000)
+    ):
+        assert np.array_equal(c_img, s_img) and np.allclose(c_depths, s_depths)
+
+
+def test_composite_saved_segments():
+    """Segments saved as `.npy` (memory-mapped) or pickles (loaded on demand)."""
+
+    stacked = CoreColumn.concat(columns)
+
+    with tempfile.TemporaryDirectory() as TEMP_PATH:
+
+        column1.save(TEMP_PATH, name='col1', pickle=False, image=True, depths=True)
+        column2.save(TEMP_PATH, name='col2', pickle=True)
+
+        segments = [
+            ColumnSegment(TEMP_PATH, 'col1', add_tol=1.0),
+            ColumnSegment(TEMP_PATH, 'col2'),
+            column3,
+        ]
+        assert segments[0].is_loaded and not segments[1].is_loaded
+
+        composite = CompositeCoreColumn(segments)
+
+        assert composite.slice_depth(1.5, 2.5) == stacked.slice_depth(1.5, 2.5)
+        assert composite.slice_depth(2.5, 4.0) == stacked.slice_depth(2.5, 4.0)
+
+        del composite, segments
+
+
+def test_composite_quant_and_labels():
+    """Gathered columns keep the segments' `quant` and label tracks, like `concat`."""
+
+    quant = dict(scale=1.0, offset=-10.0)
+    upper = CoreColumn(img2, top=2.0, base=3.0, add_tol=1.0).quantize("uint8", **quant)
+    lower = column3.quantize("uint8", **quant)
+    upper.add_labels("lithology", LabelTrack([2.0], [2.5], ["sh"]))
+    lower.add_labels("lithology", LabelTrack([3.6], [4.5], ["ss"]))
+
+    composite = CompositeCoreColumn([upper, lower])
+    stacked = CoreColumn.concat([upper, lower])
+
+    # Fill rows take the code of zero
+    assert composite.to_column() == stacked and composite.to_column().quant == stacked.quant
+    assert composite.img[upper.height][0, 0] == stacked.img.fill_value == 10
+    assert composite.to_column().labels["lithology"] == stacked.labels["lithology"]
+
+    sliced = composite.slice_depth(2.2, 4.0)
+    assert sliced == stacked.slice_depth(2.2, 4.0) and sliced.quant == stacked.quant
+    assert sliced.labels["lithology"] == stacked.slice_depth(2.2, 4.0).labels["lithology"]
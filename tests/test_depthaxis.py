@@ -0,0 +1,48 @@
+"""
+Define a suite of tests for the `corebreakout.depthaxis.DepthAxis` class.
+"""
+import pytest
+import numpy as np
+
+from corebreakout.depthaxis import DepthAxis
+
+
+# Three runs: evenly spaced, a single depth, and a run starting at the previous stop
+axis = DepthAxis([1.0, 2.5, 2.5], [2.0, 2.5, 3.0], [101, 1, 17])
+
+values = np.concatenate([
+    np.linspace(1.0, 2.0, num=101), [2.5], np.linspace(2.5, 3.0, num=17)
+])
+
+
+def test_construction():
+    assert axis.size == len(axis) == 119
+    assert np.array_equal(axis.values, values), "Runs should match `np.linspace`"
+
+    assert DepthAxis.uniform(1.0, 2.0, 101).is_uniform
+    assert not axis.is_uniform
+
+    with pytest.raises(AssertionError):
+        _ = DepthAxis([2.0, 1.0], [3.0, 1.5], [10, 10])
+
+
+def test_indexing():
+    assert axis[0] == 1.0 and axis[-1] == 3.0
+    assert np.array_equal(axis.value_at(np.arange(axis.size)), values)
+
+    for a, b in [(0, 119), (10, 20), (100, 102), (50, 110)]:
+        sliced = axis[a:b]
+        assert isinstance(sliced, DepthAxis) and sliced.size == b - a
+        assert np.allclose(sliced.values, values[a:b])
+
+
+def test_searchsorted():
+    queries = np.concatenate([values, values + 1e-12, values - 1e-12, [0.0, 2.2, 5.0]])
+
+    for side in ["left", "right"]:
+        expected = np.searchsorted(values, queries, side=side)
+        assert np.array_equal(axis.searchsorted(queries, side=side), expected)
+
+
+def test_median_step():
+    assert np.isclose(axis.median_step(), np.median(np.diff(values)))
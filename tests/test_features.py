@@ -0,0 +1,62 @@
+"""
+Define a suite of tests for per-row features in the `corebreakout.features` module.
+"""
+import tempfile
+
+import pytest
+import numpy as np
+from skimage import io
+
+from corebreakout import CoreColumn, features
+
+
+img1 = io.imread("tests/data/column1.jpeg")[:2000]
+
+# Zero background on the right half of the first 500 rows
+masked = img1.copy()
+masked[:500, 391:] = 0
+
+
+def test_row_features():
+    column = CoreColumn(masked, top=1.0, base=2.0)
+    result = column.row_features(
+        ["mean", "median", "var", "valid_fraction", "histogram"], bins=8, block_rows=300, n_jobs=3
+    )
+
+    assert np.array_equal(result["depth"], column.depths)
+    assert result["mean"].shape == (2000, 3) and result["histogram"].shape == (2000, 3, 8)
+
+    # Zero pixels are ignored
+    valid = img1[10, :391].astype(float)
+    assert np.isclose(result["valid_fraction"][10], 391 / 782)
+    assert np.allclose(result["mean"][10], valid.mean(axis=0))
+    assert np.allclose(result["median"][10], np.median(valid, axis=0))
+    assert np.allclose(result["var"][10], valid.var(axis=0))
+    assert np.all(result["histogram"][10].sum(axis=1) == 391)
+    assert np.array_equal(result["histogram"][10, 0], np.histogram(valid[:, 0], 8, (0, 256))[0])
+
+    assert np.allclose(result["mean"][1500], img1[1500].mean(axis=0))
+
+    # Rows without valid pixels have NaN statistics
+    empty = CoreColumn(np.zeros((10, 5, 3), dtype=np.uint8), top=0.0, base=1.0)
+    empty_result = empty.row_features(["mean", "valid_fraction"])
+    assert np.all(np.isnan(empty_result["mean"])) and np.all(empty_result["valid_fraction"] == 0)
+
+
+def test_save_features():
+    column = CoreColumn(masked, top=1.0, base=2.0)
+
+    with tempfile.TemporaryDirectory() as TEMP_PATH:
+        result = column.row_features(fpath=TEMP_PATH + "/features.npz")
+        loaded = features.load_features(TEMP_PATH + "/features.npz")
+
+    assert set(loaded) == {"depth", "mean", "var", "valid_fraction"}
+    assert all(np.allclose(loaded[k], result[k], equal_nan=True) for k in result)
+
+    frame = features.to_dataframe(result)
+    assert list(frame.columns) == ["mean_0", "mean_1", "mean_2", "var_0", "var_1", "var_2",
+                                   "valid_fraction"]
+    assert frame.index.name == "depth" and len(frame) == 2000
+
+    with pytest.raises(ValueError):
+        features.save_features(result, "features.csv")
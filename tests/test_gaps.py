@@ -0,0 +1,93 @@
+"""
+Define a suite of tests for sparse 'fill' gaps and the `corebreakout.gaps.GappedImage` class.
+"""
+import tempfile
+
+import numpy as np
+from skimage import io
+
+from corebreakout import CoreColumn
+from corebreakout.gaps import GappedImage
+
+
+img1 = io.imread("tests/data/column1.jpeg")[::4]  # shape = (1518, 782, 3)
+img3 = io.imread("tests/data/column3.jpeg")[::4]  # shape = (1118, 803, 3)
+
+col1 = CoreColumn(img1, top=1.0, base=2.0, add_tol=2.0)
+col3 = CoreColumn(img3, top=3.5, base=4.5)
+
+
+def test_gapped_image():
+    values = np.arange(1, 13, dtype=np.uint8).reshape(6, 1, 2)
+    img = GappedImage(values, [[4, 5], [0, 2], [5, 6]], fill_value=99)
+
+    # Touching gaps are merged, and gap rows are filled
+    assert img.shape == (10, 1, 2) and img.gaps.tolist() == [[0, 2], [4, 6]]
+    dense = np.asarray(img)
+    assert (dense[[0, 1, 4, 5]] == 99).all()
+    assert np.array_equal(dense[[2, 3, 6, 7, 8, 9]], values)
+
+    assert np.array_equal(img[3:8], dense[3:8]) and np.array_equal(img[[8, 0], 0, 1], [10, 99])
+    assert np.array_equal(img[-1], dense[-1]) and np.array_equal(img[9:0:-2], dense[9:0:-2])
+    assert np.array_equal(img[dense[:, 0, 0] > 50], dense[dense[:, 0, 0] > 50])
+    assert img.is_gap(4, 6) and not img.is_gap(3, 5)
+    assert img.gap_mask(1, 5).tolist() == [True, False, False, True]
+
+    # Common ndarray operations work on the dense image
+    assert np.isclose(img.mean(), dense.mean()) and img.max(axis=0).tolist() == [[99, 99]]
+    assert np.array_equal(img * 2, dense * 2) and np.array_equal(img == 99, dense == 99)
+    assert np.array_equal(np.sqrt(img), np.sqrt(dense)) and (img + img).dtype == np.uint8
+    copied, floats = img.copy(), img.astype(np.float32)
+    assert isinstance(copied, GappedImage) and not np.shares_memory(copied.values, values)
+    assert floats.dtype == np.float32 and np.array_equal(np.asarray(floats), dense)
+
+    sliced = img.slice_rows(1, 7)
+    assert sliced.gaps.tolist() == [[0, 1], [3, 5]] and sliced.values.shape[0] == 3
+    assert np.array_equal(np.asarray(sliced), dense[1:7])
+
+
+def test_fill_gaps():
+    stacked = CoreColumn.concat([col1, col3])
+    dense = np.asarray(stacked.img)
+    fill_rows = stacked.height - col1.height - col3.height
+
+    # Only the source rows are stored
+    assert stacked.is_gapped and stacked.img.values.shape[0] == col1.height + col3.height
+    assert stacked.gaps.tolist() == [[col1.height, col1.height + fill_rows]]
+    assert not dense[col1.height:col1.height + fill_rows].any()
+    assert np.array_equal(dense[-col3.height:], img3)
+
+    # Slicing keeps the gap, and concatenating gapped columns carries their gaps through
+    sliced = stacked.slice_depth(1.5, 4.0)
+    assert sliced.is_gapped and np.array_equal(np.asarray(sliced.img), sliced.to_dense().img)
+    restacked = CoreColumn.concat([stacked, CoreColumn(img1[:200], top=5.0, base=5.1)])
+    assert len(restacked.gaps) == 2 and np.array_equal(restacked.gaps[0], stacked.gaps[0])
+    assert np.array_equal(restacked.img[:stacked.height], dense)
+
+    # Chunks inside the gap can be skipped, and row features don't read gap rows
+    chunks = list(stacked.iter_chunks(100, depths=False))
+    kept = list(stacked.iter_chunks(100, depths=False, skip_gaps=True))
+    num_gap_chunks = sum(stacked.is_gap(i, i + 100) for i in range(0, stacked.height, 100))
+    assert num_gap_chunks > 0 and len(chunks) - len(kept) == num_gap_chunks
+    assert all(c.any() for c in kept)
+
+    gapped_features = stacked.row_features(block_rows=64)
+    dense_features = stacked.to_dense().row_features(block_rows=64)
+    for name, arr in dense_features.items():
+        assert np.array_equal(gapped_features[name], arr, equal_nan=True), name
+
+    with tempfile.TemporaryDirectory() as path:
+        stacked.save(path, name="stacked", pickle=False, image=True, depths=True)
+        loaded = CoreColumn.load(path, "stacked")
+        assert not loaded.is_gapped and np.array_equal(loaded.img, dense)
+
+
+def test_quantized_fill_gaps():
+    quantized = CoreColumn.concat([col1.quantize("uint8", scale=1.0, offset=-1.0), col3])
+
+    # Gaps take the code of zero
+    assert quantized.is_gapped and quantized.is_quantized
+    zero_code = quantized.img.fill_value
+    start, stop = quantized.gaps[0]
+    assert zero_code != 0 and (quantized.img[start:stop] == zero_code).all()
+    assert np.allclose(quantized.values[start:stop], 0.0, atol=quantized.quant[0])
@@ -0,0 +1,86 @@
+"""
+Define a suite of tests for depth-registered label tracks.
+"""
+import tempfile
+
+import numpy as np
+
+from corebreakout import CoreColumn
+from corebreakout.labels import LabelTrack
+
+
+picks = {
+    "top": [100.0, 101.0, 103.0],
+    "base": [101.0, 102.5, 104.0],
+    "lithology": ["sh", "ss", "ls"],
+}
+
+XML = """<annotation>
+    <size><width>10</width><height>100</height><depth>3</depth></size>
+    <object><name>ss</name><bndbox><xmin>0</xmin><ymin>40</ymin><xmax>10</xmax><ymax>90</ymax></bndbox></object>
+    <object><name>sh</name><bndbox><xmin>0</xmin><ymin>3</ymin><xmax>10</xmax><ymax>35</ymax></bndbox></object>
+</annotation>
+"""
+
+
+def test_label_track():
+    track = LabelTrack.from_picks(picks, label_col="lithology")
+    depths = np.linspace(100.0, 104.0, 401)
+
+    labels = track.labels_at(depths)
+    assert labels[0] == "sh" and labels[150] == "ss" and labels[-1] == "ls"
+    assert labels[100] == "ss", "Deeper interval should win at a shared boundary"
+    assert labels[275] == "", "Gaps between picks should be unlabeled"
+    assert track.labels_at(depths, fill="na", dtype="a2")[275] == b"na"
+
+    # Run-length encoding of rows round trips, and labels between rows after resampling
+    rows = LabelTrack.from_rows(labels, depths)
+    assert len(rows) == 4 and np.array_equal(rows.labels_at(depths), labels)
+    assert rows.labels_at([102.504])[0] == "ss"
+
+    # Slices are clipped
+    sliced = track.slice(100.5, 101.5)
+    assert len(sliced) == 2 and sliced.tops[0] == 100.5 and sliced.bases[-1] == 101.5
+
+    with tempfile.NamedTemporaryFile(suffix=".xml", mode="w") as f:
+        f.write(XML)
+        f.flush()
+        xml_track = LabelTrack.from_xml(f.name, np.arange(100))
+
+    assert xml_track.labels.tolist() == ["sh", "ss"]
+    assert np.array_equal(xml_track.labels_at(np.arange(100)), ["sh"] * 40 + ["ss"] * 60)
+
+    assert LabelTrack.from_dict(track.to_dict()) == track
+
+
+def test_column_labels():
+    img = np.random.RandomState(0).randint(0, 255, size=(400, 10, 3), dtype=np.uint8)
+    column = CoreColumn(img, top=100.0, base=104.0, add_tol=1.0)
+    column.add_labels("lithology", LabelTrack.from_picks(picks, label_col="lithology"))
+
+    labels = column.row_labels("lithology")
+    assert labels.shape == (400,) and labels[0] == "sh" and labels[-1] == "ls"
+
+    sliced = column.slice_depth(101.2, 103.5)
+    start, stop = column.rows_between(101.2, 103.5)
+    assert np.array_equal(sliced.row_labels("lithology"), labels[start:stop])
+
+    resampled = column.resample(dd=0.02)
+    assert resampled.row_labels("lithology")[60] == "ss"
+
+    # Concatenation combines tracks, and per-row labels survive
+    other = CoreColumn(img, top=104.5, base=108.0, add_tol=1.0)
+    other.add_labels("lithology", ["sh"] * 200 + ["ls"] * 200)
+    joined = column + other
+    joined_labels = joined.row_labels("lithology")
+    assert joined_labels[0] == "sh" and joined_labels[-1] == "ls"
+    assert np.array_equal(joined_labels[-400:], other.row_labels("lithology"))
+
+    with tempfile.TemporaryDirectory() as path:
+        column.save(path, name="labeled", pickle=False, image=True, depths=True, container=True)
+        loaded = CoreColumn.load(path, "labeled", mmap_mode="r")
+        assert loaded.labels["lithology"] == column.labels["lithology"]
+
+        from corebreakout.storage import load_container
+        from_container = load_container(f"{path}/labeled.cbc", top=101.0, base=102.0)
+        assert from_container.labels["lithology"].labels.tolist() == ["sh", "ss"]
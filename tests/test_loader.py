@@ -0,0 +1,77 @@
+"""
+Define a suite of tests for the `corebreakout.loader.ChunkLoader` class.
+"""
+import time
+
+import numpy as np
+from skimage import io
+
+from corebreakout import CoreColumn
+from corebreakout.loader import ChunkLoader
+
+
+img1, img2 = (io.imread(f'tests/data/column{i}.jpeg') for i in [1,2])
+
+column1 = CoreColumn(img1, top=1.0, base=2.0)  # shape = (6070, 782, 3)
+column2 = CoreColumn(img2, top=2.0, base=3.0)  # shape = (5917, 779, 3)
+
+
+def test_padded_iter_chunks():
+    """The last chunk of `iter_chunks` should be padded if requested."""
+
+    chunks = list(column1.iter_chunks(1000, pad=True))
+    assert all(img.shape == (1000, 782, 3) and d.size == 1000 for img, d in chunks)
+
+    last_img, last_depths = chunks[-1]
+    assert np.all(last_img[70:] == 0) and np.all(np.diff(last_depths) > 0)
+
+
+def test_loader_batches():
+    """Batches should have fixed shapes and match the column data."""
+
+    loader = ChunkLoader([column1, column2], chunk_size=1000, batch_size=4, depths=True)
+    assert len(loader) == 4, "7 + 6 chunks in batches of 4"
+
+    batches = [(imgs.copy(), depths.copy()) for imgs, depths in loader]
+    assert len(batches) == 4
+    assert batches[0][0].shape == (4, 1000, 782, 3) and batches[-1][0].shape == (1, 1000, 782, 3)
+
+    # second chunk of column1, first chunk of column2 (narrower, so padded)
+    imgs, depths = batches[0][0][1], batches[0][1][1]
+    assert np.array_equal(imgs, img1[1000:2000]) and np.allclose(depths, column1.depths[1000:2000])
+    imgs = batches[1][0][3]
+    assert np.array_equal(imgs[:, :779], img2[:1000]) and np.all(imgs[:, 779:] == 0)
+
+    # partial last chunk of column1 is padded, with NaN depths
+    imgs, depths = batches[1][0][2], batches[1][1][2]
+    assert np.array_equal(imgs[:70], img1[6000:]) and np.all(imgs[70:] == 0)
+    assert np.all(np.isnan(depths[70:]))
+
+
+def test_loader_shuffle():
+    """Shuffled epochs should cover every chunk exactly once."""
+
+    loader = ChunkLoader(column1, chunk_size=500, batch_size=5, shuffle=True, drop_last=True, seed=0)
+    means = np.concatenate([imgs.mean(axis=(1, 2, 3)) for imgs in loader])
+    expected = [img.mean() for img in column1.iter_chunks(500, depths=False, pad=True)][:len(means)]
+
+    assert len(loader) == 2 and means.size == 10
+    assert not np.allclose(means, expected), "Should be shuffled"
+
+
+def test_loader_buffer_window():
+    """A yielded batch should stay intact until `prefetch + 1` further batches are requested."""
+
+    loader = ChunkLoader(column1, chunk_size=100, batch_size=2, prefetch=2)
+    batches = iter(loader)
+
+    first = next(batches)
+    expected = first.copy()
+    assert np.array_equal(expected, np.stack([img1[:100], img1[100:200]]))
+
+    for _ in range(loader.prefetch):
+        next(batches)
+        time.sleep(0.2)  # let the background thread run as far ahead as it can
+        assert np.array_equal(first, expected), "Batch overwritten inside the documented window"
+
+    batches.close()
@@ -0,0 +1,61 @@
+"""
+Define a suite of tests for sharded patch export.
+"""
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from skimage import io
+
+from corebreakout import CoreColumn
+from corebreakout.labels import LabelTrack
+from corebreakout.patches import export_patches, PatchDataset
+
+
+img1 = io.imread("tests/data/column1.jpeg")[::4]  # shape = (1518, 782, 3)
+
+col1 = CoreColumn(img1, top=100.0, base=115.17)
+col1.add_labels("lithology", LabelTrack([100.0, 105.0], [105.0, 110.0], ["sh", "ss"]))
+
+col2 = CoreColumn(img1[:600, :500], top=200.0, base=205.99)
+col2.add_labels("lithology", LabelTrack([200.0], [206.0], ["ls"]))
+
+
+def test_export_patches():
+    columns = {"A": col1, "B": col2}
+
+    with tempfile.TemporaryDirectory() as path:
+        index = export_patches(
+            columns, path, length=1.0, num_rows=64, step=0.5, labels=["lithology"],
+            shard_size=10, n_jobs=3,
+        )
+        assert index["categories"] == {"lithology": ["ls", "sh", "ss"]}
+        assert [s["count"] for s in index["shards"]] == [10, 10, 9, 10]
+
+        dataset = PatchDataset(path)
+        assert len(dataset) == 39 and dataset.num_shards == 4
+        assert dataset.well.tolist() == [0] * 29 + [1] * 10
+        assert np.allclose(dataset.depths[29], [200.0, 201.0])
+
+        # Records match resampled depth windows, zero-padded to the widest column
+        patch, codes = dataset[30]
+        windows = list(col2.iter_depth_windows(1.0, 0.5, depths=False, num_rows=64))
+        assert patch.shape == (64, 782, 3) and not patch[:, 500:].any()
+        assert np.array_equal(patch[:, :500], windows[1])
+        assert (codes == 0).all()
+
+        _, codes = dataset[9]  # window 104.5 - 105.5 crosses the 'sh'/'ss' boundary
+        assert codes[0, 0] == 1 and codes[0, -1] == 2
+        _, codes = dataset[28]  # below the labeled intervals
+        assert (codes == -1).all()
+
+        # Resuming only rewrites missing shards
+        shard = Path(path) / "A_00001_patches.npy"
+        mtime = (Path(path) / "A_00000_patches.npy").stat().st_mtime
+        os.remove(shard)
+        export_patches(columns, path, length=1.0, num_rows=64, step=0.5, labels=["lithology"],
+                       shard_size=10)
+        assert shard.is_file()
+        assert (Path(path) / "A_00000_patches.npy").stat().st_mtime == mtime
+        assert np.array_equal(PatchDataset(path)[15][0], dataset[15][0])
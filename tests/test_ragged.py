@@ -0,0 +1,67 @@
+"""
+Define a suite of tests for ragged (mask-aware) column images.
+"""
+import tempfile
+
+import numpy as np
+from skimage import io
+
+from corebreakout import CoreColumn
+from corebreakout.ragged import RaggedImage
+
+
+img1 = io.imread("tests/data/column1.jpeg")  # shape = (6070, 782, 3)
+
+# Mask out a ragged background, like a segmented, zero-padded column
+random = np.random.RandomState(0)
+lefts = random.randint(0, 100, size=img1.shape[0])
+rights = random.randint(600, 782, size=img1.shape[0])
+cols = np.arange(img1.shape[1])
+mask = (cols >= lefts[:, np.newaxis]) & (cols < rights[:, np.newaxis])
+mask[1000:1010] = False
+masked = img1 * mask[:, :, np.newaxis]
+
+
+def test_ragged_image():
+    ragged = RaggedImage.from_dense(masked, mask=mask, block_rows=1000)
+
+    assert ragged.shape == masked.shape and ragged.dtype == masked.dtype
+    assert ragged.nbytes < 0.85 * masked.nbytes
+    assert np.array_equal(ragged.starts[:5], lefts[:5]) and ragged.lengths[1005] == 0
+
+    assert np.array_equal(np.asarray(ragged), masked)
+    assert np.array_equal(ragged[990:1020], masked[990:1020])
+    assert np.array_equal(ragged[[5, 3, 1005]], masked[[5, 3, 1005]])
+    assert np.array_equal(ragged[-1, 10:20], masked[-1, 10:20])
+    assert np.array_equal(ragged[[-1, 2], 5:9, 0], masked[[-1, 2], 5:9, 0])
+    assert np.array_equal(ragged[10:20, :5], masked[10:20, :5])
+    assert np.array_equal(ragged[100:90:-3], masked[100:90:-3])
+    assert np.array_equal(ragged[mask.any(axis=1)], masked[mask.any(axis=1)])
+    assert np.array_equal(ragged.slice_rows(100, 200)[:], masked[100:200])
+
+    # Row statistics skip the background
+    means = ragged.row_means()
+    assert np.allclose(means[7], img1[7, lefts[7]:rights[7]].mean(axis=0))
+    assert np.all(np.isnan(means[1000:1010]))
+
+
+def test_ragged_column():
+    column = CoreColumn(masked, top=1.0, base=2.0, add_tol=1.0)
+    ragged = column.to_ragged(mask=mask)
+
+    assert ragged.is_ragged and ragged == column
+    assert ragged.slice_depth(top=1.25, base=1.5).is_ragged
+    assert ragged.slice_depth(top=1.25, base=1.5) == column.slice_depth(top=1.25, base=1.5)
+    assert not ragged.to_dense().is_ragged and ragged.to_dense() == column
+
+    # Concatenation keeps packed rows, with empty fill rows
+    lower = CoreColumn(masked, top=2.5, base=3.5, add_tol=1.0).to_ragged(mask=mask)
+    stacked = ragged + lower
+    assert stacked.is_ragged and stacked.height > 2 * column.height
+    assert stacked == column.to_dense() + lower.to_dense()
+
+    with tempfile.TemporaryDirectory() as TEMP_PATH:
+        ragged.save(TEMP_PATH, name='testcol', pickle=False, image=True, depths=True)
+        loaded = CoreColumn.load(TEMP_PATH, 'testcol')
+
+    assert loaded.is_ragged and np.array_equal(np.asarray(loaded.img), masked)
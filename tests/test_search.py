@@ -0,0 +1,46 @@
+"""
+Define a suite of tests for window similarity search.
+"""
+import tempfile
+
+import numpy as np
+from skimage import io
+
+from corebreakout import CoreColumn
+from corebreakout.search import WindowIndex, color_histogram, texture_histogram
+
+
+img1 = io.imread("tests/data/column1.jpeg")[::4]  # shape = (1518, 782, 3)
+
+col1 = CoreColumn(img1[:800], top=100.0, base=107.99)
+col2 = CoreColumn(img1[800:], top=200.0, base=207.17)
+
+
+def test_descriptors():
+    window = img1[:100]
+    hist = color_histogram(window, bins=4)
+    assert hist.shape == (12,) and np.allclose(hist.reshape(3, 4).sum(axis=1), 1.0)
+
+    assert texture_histogram(window).shape == (8,)
+    assert not color_histogram(np.zeros((10, 10, 3), dtype=np.uint8)).any()
+
+
+def test_window_index():
+    index = WindowIndex()
+    index.add("A", col1, chunk_size=50, n_jobs=2).add("B", col2, chunk_size=50, step_size=25)
+    assert len(index) == 16 + 29 and index.vectors.shape[1] == 32
+
+    # A window that was indexed is its own nearest neighbour
+    exact = index.query_interval(col2, 201.0, 201.49, k=3)
+    assert exact[0][:3] == ("B", 201.0, 201.49) and np.isclose(exact[0][3], 0.0)
+    assert index.query(col2.img[100:150], k=1, exclude_well="B")[0][0] == "A"
+
+    index.build(n_lists=4)
+    assert index.is_built and index.offsets[-1] == len(index)
+    assert index.query(col2.img[100:150], k=1, n_probe=1)[0][:3] == exact[0][:3]
+
+    with tempfile.TemporaryDirectory() as path:
+        index.save(path + "/index.npz")
+        loaded = WindowIndex.load(path + "/index.npz")
+        assert loaded.is_built and loaded.descriptor == "color_texture"
+        assert loaded.query(col2.img[100:150], k=3) == index.query(col2.img[100:150], k=3)
@@ -0,0 +1,56 @@
+"""
+Define a suite of tests for the `corebreakout.WellStack` class.
+"""
+import tempfile
+
+import numpy as np
+from skimage import io
+
+from corebreakout import CoreColumn, WellStack
+
+
+img1 = io.imread("tests/data/column1.jpeg")[::4]  # shape = (1518, 782, 3)
+
+col1 = CoreColumn(img1, top=100.0, base=115.17)
+col2 = CoreColumn(img1[:500, :600], top=105.0, base=109.99)
+col3 = CoreColumn(img1[:300], top=120.0, base=122.99)
+
+
+def test_well_stack():
+    columns = {"A": col1, "B": [col2, col3]}
+
+    with tempfile.TemporaryDirectory() as path:
+        stack = WellStack.build(columns, dd=0.01, path=path, n_jobs=3)
+
+        assert stack.shape == (2, 2300, 782, 3) and stack.img.dtype == img1.dtype
+        assert isinstance(stack.img, np.memmap)
+
+        # Rows without core are masked and zero
+        assert stack.mask[0, :1517].all() and not stack.mask[0, 1518:].any()
+        assert not stack.mask[1, :500].any() and stack.mask[1, 500:1000].all()
+        assert not stack.mask[1, 1000:2000].any() and stack.mask[1, 2000:].all()
+        assert not stack.img[1, 1000:2000].any() and not stack.img[1, 500:1000, 600:].any()
+
+        # Each well matches resampling it on its own
+        expected = col2.resample(depths=stack.depths[500:1000])
+        assert np.array_equal(stack.img[1, 500:1000, :600], expected.img)
+
+        loaded = WellStack.load(path)
+        assert loaded.wells == ["A", "B"] and np.array_equal(loaded.mask, stack.mask)
+        assert np.array_equal(loaded.img[0], stack.img[0])
+
+    sliced = stack.slice_depth(104.0, 106.0)
+    assert sliced.shape == (2, 201, 782, 3) and sliced.mask[1, 100:].all()
+
+    column = stack.column("B")
+    assert column.top == 105.0 and column.height == 1800
+
+
+def test_well_stack_fill_gaps():
+    filled = CoreColumn.concat([CoreColumn(col2.img, top=105.0, base=109.99, add_tol=20.0), col3])
+    stack = WellStack.build({"A": filled, "B": [col2, col3]}, dd=0.01)
+
+    # Depths in the gap of a 'fill' column are masked, like the gap between separate columns
+    assert filled.is_gapped and np.array_equal(stack.mask[0], stack.mask[1])
+    assert not stack.mask[0, 500:1500].any() and stack.mask[0, 1500:].all()
+    assert np.array_equal(stack.img[0][stack.mask[0]], stack.img[1][stack.mask[1]])
@@ -0,0 +1,150 @@
+"""
+Define a suite of tests for the `corebreakout.storage` backends.
+"""
+import gc
+import tempfile
+from pathlib import Path
+from concurrent.futures import wait
+
+import pytest
+import numpy as np
+from skimage import io
+
+from corebreakout import CoreColumn
+from corebreakout.storage import HDF5Column, save_hdf5
+from corebreakout.storage import save_container, load_container, read_header
+from corebreakout.storage import TiledImage, save_tiles, load_tiles
+
+
+img1 = io.imread("tests/data/column1.jpeg")  # shape = (6070, 782, 3)
+
+
+def test_hdf5_save_load():
+    """Test saving and loading a column through `CoreColumn.save(hdf5=True)`."""
+
+    save_column = CoreColumn(img1, top=1.0, base=2.0)
+
+    with tempfile.TemporaryDirectory() as TEMP_PATH:
+
+        save_column.save(TEMP_PATH, name='testcol', pickle=False, hdf5=True)
+
+        load_column = CoreColumn.load(TEMP_PATH, 'testcol')
+
+    assert load_column == save_column, 'Loaded should match saved.'
+
+
+def test_hdf5_slice_and_chunks():
+    """Test depth slicing and chunk iteration of a stored column."""
+
+    column = CoreColumn(img1, top=1.0, base=2.0)
+
+    with tempfile.TemporaryDirectory() as TEMP_PATH:
+
+        fpath = Path(TEMP_PATH) / 'testcol.h5'
+        save_hdf5(column, fpath, chunk_rows=100)
+
+        with HDF5Column(fpath) as stored:
+            assert stored.chunk_index.shape == (61, 2), 'One index row per chunk.'
+
+            for top, base in [(1.25, 1.5), (1.0, 1.001), (1.999, 2.0), (1.3, 3.0)]:
+                assert stored.slice_depth(top, base) == column.slice_depth(top, base)
+
+            stored_chunks = list(stored.iter_chunks(500, step_size=400))
+            column_chunks = list(column.iter_chunks(500, step_size=400))
+            assert len(stored_chunks) == len(column_chunks)
+
+            for (s_img, s_depths), (c_img, c_depths) in zip(stored_chunks, column_chunks):
+                assert np.array_equal(s_img, c_img)
+                assert np.array_equal(s_depths, c_depths)
+
+
+def test_container_save_load():
+    """Test the block-compressed container format, header reads, and partial loads."""
+
+    column = CoreColumn(img1, top=1.0, base=2.0)
+    array_column = CoreColumn(img1, depths=np.linspace(1.0, 2.0, num=img1.shape[0]))
+
+    with tempfile.TemporaryDirectory() as TEMP_PATH:
+
+        column.save(TEMP_PATH, name='testcol', pickle=False, container=True)
+
+        header = CoreColumn.load(TEMP_PATH, 'testcol', header_only=True)
+        assert header['shape'] == [6070, 782, 3] and header['top'] == 1.0
+        assert header == read_header(Path(TEMP_PATH) / 'testcol.cbc', use_sidecar=False)
+
+        assert CoreColumn.load(TEMP_PATH, 'testcol') == column
+
+        fpath = Path(TEMP_PATH) / 'arraycol.cbc'
+        save_container(array_column, fpath, block_rows=500, n_jobs=3)
+        assert load_container(fpath, n_jobs=2) == array_column
+
+        for top, base in [(1.25, 1.5), (1.9, None), (None, 1.01)]:
+            expected = array_column.slice_depth(top, base)
+            assert load_container(fpath, top=top, base=base) == expected
+
+        # Corrupt a block and make sure it is caught
+        offset = read_header(fpath)['blocks'][3][0]
+        with open(fpath, 'r+b') as f:
+            f.seek(offset + 10)
+            f.write(b'\x00\x00\x00\x00')
+
+        with pytest.raises(Exception):
+            _ = load_container(fpath)
+
+
+def test_tiles_save_load():
+    """Test lossy tiles, lazy reads through the tile cache, and sequential read-ahead."""
+
+    masked = img1.copy()
+    masked[:, :100] = 0
+    column = CoreColumn(masked, top=1.0, base=2.0)
+
+    with tempfile.TemporaryDirectory() as TEMP_PATH:
+
+        fpath = Path(TEMP_PATH) / 'testcol.cbt'
+        save_tiles(column, fpath, tile_shape=(256, 300), quality=90, n_jobs=3)
+        assert fpath.stat().st_size < masked.nbytes / 10
+
+        loaded = load_tiles(fpath, cache_bytes=20 * 256 * 300 * 3, read_ahead=2)
+        assert isinstance(loaded.img, TiledImage) and loaded.img.shape == masked.shape
+        assert np.allclose(loaded.depths, column.depths)
+
+        # Lossy pixels, but exactly zero background
+        rows = loaded.img[1000:1600]
+        assert np.abs(rows.astype(float) - masked[1000:1600]).mean() < 4.0
+        assert not rows[:, :100].any()
+
+        # Slices stay lazy, and share the cache
+        sliced = loaded.slice_depth(1.5, 1.6)
+        assert isinstance(sliced.img, TiledImage)
+        start, stop = column.rows_between(1.5, 1.6)
+        assert np.array_equal(sliced.img[:], loaded.img[start:stop])
+        assert np.array_equal(loaded.img[[5, 3000, 5]], loaded.img[:3001][[5, 3000, 5]])
+        assert np.array_equal(loaded.img[[-1, 5], 200:210], loaded.img[:][[-1, 5], 200:210])
+        assert np.array_equal(loaded.img[10:0:-3], loaded.img[:11][10:0:-3])
+
+        # Sequential reads hit tiles decoded ahead, and the cache stays bounded
+        cache = loaded.img.cache
+        hits = cache.hits
+        for chunk in loaded.iter_chunks(256, depths=False):
+            pass
+        assert cache.hits > hits and cache.nbytes <= cache.max_bytes
+        cache.close()
+        assert cache._pool is None
+
+        # An unclosed column's read-ahead pool is shut down once the column is collected
+        unclosed = load_tiles(fpath, read_ahead=2)
+        for chunk in unclosed.iter_chunks(256, depths=False):
+            pass
+        pool = unclosed.img.cache._pool
+        assert pool is not None
+        wait(list(unclosed.img.cache._pending.values()))
+        del unclosed, chunk
+        gc.collect()
+        assert pool._shutdown
+
+        column.save(TEMP_PATH, name='tiled', pickle=False, tiles=True)
+        from_save = CoreColumn.load(TEMP_PATH, 'tiled')
+        assert isinstance(from_save.img, TiledImage)
+        from_container = load_container(Path(TEMP_PATH) / 'tiled.cbt')
+        assert np.array_equal(from_container.img[:10], from_save.img[:10])
@@ -0,0 +1,60 @@
+"""
+Define a suite of tests for functions in the `corebreakout.viz` module.
+"""
+import numpy as np
+
+from corebreakout import viz
+
+
+def loop_depth_ticks(depths):
+    """Row-by-row reference version of `make_depth_ticks` (with default arguments)."""
+    major_ticks, major_locs, minor_ticks, minor_locs = [], [], [], []
+
+    major_rmndr = np.insert(depths % 0.1, (0, depths.size), np.inf)
+    minor_rmndr = np.insert(depths % 0.01, (0, depths.size), np.inf)
+
+    for i in np.arange(1, major_rmndr.size):
+        if viz.local_min(major_rmndr, i):
+            major_ticks.append("{:.1f}".format(depths[i - 1]))
+            major_locs.append(i)
+        elif viz.local_min(minor_rmndr, i):
+            minor_ticks.append("{:.2f}".format(depths[i - 1]))
+            minor_locs.append(i)
+
+    last_depth = np.round(depths[-1], decimals=1)
+    if (last_depth % 1.0) == 0.0:
+        major_ticks.append("{:.1f}".format(last_depth))
+        major_locs.append(depths.size - 1)
+
+    return major_ticks, major_locs, minor_ticks, minor_locs
+
+
+def test_local_minima():
+    arr = np.array([np.inf, 0.5, 0.2, 0.2, 0.7, np.nan, 0.1, np.inf])
+    expected = [viz.local_min(arr, i) for i in range(1, arr.size - 1)]
+    assert viz.local_minima(arr).tolist() == expected
+
+
+def test_make_depth_ticks():
+    random = np.random.RandomState(0)
+    depth_arrays = [
+        np.linspace(1.0, 2.0, 6070),
+        np.linspace(1000.0, 1003.0, 5000).astype(np.float32),
+        np.sort(random.uniform(0.0, 5.0, 3000)),
+        np.array([1.0, 1.0, 1.05, 1.1, 1.1, 1.2]),
+    ]
+
+    for depths in depth_arrays:
+        expected = loop_depth_ticks(depths)
+        assert viz.make_depth_ticks(depths) == expected, "Must match row-by-row version"
+
+        # Windowed ticks should be the subset of rows inside the window
+        top, base = depths[depths.size // 4], depths[3 * depths.size // 4]
+        start, stop = np.searchsorted(depths, top), np.searchsorted(depths, base, side="right")
+        inside = lambda locs: [start <= loc - 1 < stop for loc in locs]
+
+        major_ticks, major_locs, minor_ticks, minor_locs = viz.make_depth_ticks(
+            depths, top=top, base=base
+        )
+        assert major_locs == [l for l, keep in zip(expected[1], inside(expected[1])) if keep]
+        assert minor_ticks == [t for t, keep in zip(expected[2], inside(expected[3])) if keep]